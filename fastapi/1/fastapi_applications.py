@@ -8,12 +8,13 @@ from fastapi.exception_handlers import (
     request_validation_exception_handler,
 )
 from fastapi.exceptions import RequestValidationError
+from fastapi.executors import SyncExecutor
 from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
-from fastapi.openapi.utils import get_openapi
+from fastapi.openapi.utils import OpenAPIBuilder
 from fastapi.params import Depends
 from fastapi.utils import warning_response_model_skip_defaults_deprecated
 from starlette.applications import Starlette
@@ -42,6 +43,8 @@ class FastAPI(Starlette):
         redoc_url: Optional[str] = "/redoc",
         swagger_ui_oauth2_redirect_url: Optional[str] = "/docs/oauth2-redirect",
         swagger_ui_init_oauth: Optional[dict] = None,
+        openapi_gzip: bool = False,
+        executor: SyncExecutor = None,
         middleware: Sequence[Middleware] = None,
         exception_handlers: Dict[Union[int, Type[Exception]], Callable] = None,
         on_startup: Sequence[Callable] = None,
@@ -56,6 +59,7 @@ class FastAPI(Starlette):
             dependency_overrides_provider=self,
             on_startup=on_startup,
             on_shutdown=on_shutdown,
+            executor=executor,
         )
         self.exception_handlers = (
             {} if exception_handlers is None else dict(exception_handlers)
@@ -73,6 +77,7 @@ class FastAPI(Starlette):
         self.redoc_url = redoc_url
         self.swagger_ui_oauth2_redirect_url = swagger_ui_oauth2_redirect_url
         self.swagger_ui_init_oauth = swagger_ui_init_oauth
+        self.openapi_gzip = openapi_gzip
         self.extra = extra
         self.dependency_overrides: Dict[Callable, Callable] = {}
 
@@ -84,12 +89,29 @@ class FastAPI(Starlette):
 
         if self.docs_url or self.redoc_url:
             assert self.openapi_url, "The openapi_url is required for the docs"
-        self.openapi_schema: Optional[Dict[str, Any]] = None
+        self.openapi_builder = OpenAPIBuilder()
+        self.openapi_schema = None
         self.setup()
 
+    @property
+    def openapi_schema(self) -> Optional[Dict[str, Any]]:
+        return self._openapi_schema
+
+    @openapi_schema.setter
+    def openapi_schema(self, openapi_schema: Optional[Dict[str, Any]]) -> None:
+        # The schema is served from a copy rendered on first use. Changes made
+        # to the schema in place are only served once it's assigned again.
+        self._openapi_schema = openapi_schema
+        self.openapi_builder.rendered = None
+
     def openapi(self) -> Dict:
-        if not self.openapi_schema:
-            self.openapi_schema = get_openapi(
+        # A schema made by the builder is updated when routes are added later,
+        # e.g. with include_router(). A schema set by the user is kept as is.
+        if not self.openapi_schema or (
+            self.openapi_schema is self.openapi_builder.schema
+            and self.openapi_builder.is_outdated(self.routes)
+        ):
+            self.openapi_schema = self.openapi_builder.build(
                 title=self.title,
                 version=self.version,
                 openapi_version=self.openapi_version,
@@ -102,8 +124,22 @@ class FastAPI(Starlette):
     def setup(self) -> None:
         if self.openapi_url:
 
-            async def openapi(req: Request) -> JSONResponse:
-                return JSONResponse(self.openapi())
+            async def openapi(req: Request) -> Response:
+                rendered = self.openapi_builder.render(self.openapi())
+                headers = {"etag": rendered.etag}
+                if self.openapi_gzip:
+                    headers["vary"] = "Accept-Encoding"
+                if_none_match = req.headers.get("if-none-match", "")
+                etags = [tag.strip() for tag in if_none_match.split(",")]
+                if rendered.etag in etags or "W/" + rendered.etag in etags:
+                    return Response(status_code=304, headers=headers)
+                body = rendered.body
+                if self.openapi_gzip and "gzip" in req.headers.get(
+                    "accept-encoding", ""
+                ):
+                    headers["content-encoding"] = "gzip"
+                    body = rendered.gzip_body
+                return Response(body, media_type="application/json", headers=headers)
 
             self.add_route(self.openapi_url, openapi, include_in_schema=False)
             openapi_url = self.openapi_prefix + self.openapi_url
@@ -173,6 +209,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -201,6 +238,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -228,6 +266,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -258,6 +297,7 @@ class FastAPI(Starlette):
                 ),
                 response_model_exclude_defaults=response_model_exclude_defaults,
                 response_model_exclude_none=response_model_exclude_none,
+                response_model_compiled=response_model_compiled,
                 include_in_schema=include_in_schema,
                 response_class=response_class or self.default_response_class,
                 name=name,
@@ -319,6 +359,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -346,6 +387,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -373,6 +415,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -400,6 +443,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -427,6 +471,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -454,6 +499,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -481,6 +527,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -508,6 +555,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -535,6 +583,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -562,6 +611,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -589,6 +639,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -616,6 +667,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -643,6 +695,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -670,6 +723,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -697,6 +751,7 @@ class FastAPI(Starlette):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -724,6 +779,7 @@ class FastAPI(Starlette):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
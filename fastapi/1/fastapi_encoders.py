@@ -1,12 +1,23 @@
 from enum import Enum
 from pathlib import PurePath
 from types import GeneratorType
-from typing import Any, Callable, Dict, List, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
 
 from fastapi.logger import logger
 from fastapi.utils import PYDANTIC_1
 from pydantic import BaseModel
 from pydantic.json import ENCODERS_BY_TYPE
+from pydantic.utils import lenient_issubclass
+
+try:
+    from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+except ImportError:  # pragma: nocover
+    # TODO: remove when removing support for Pydantic < 1.0.0
+    from pydantic.fields import Field as ModelField  # type: ignore
+    from pydantic.fields import Shape  # type: ignore
+
+    SHAPE_LIST = Shape.LIST
+    SHAPE_SINGLETON = Shape.SINGLETON
 
 SetIntStr = Set[Union[int, str]]
 DictIntStrAny = Dict[Union[int, str], Any]
@@ -165,3 +176,189 @@ def jsonable_encoder(
         custom_encoder=custom_encoder,
         sqlalchemy_safe=sqlalchemy_safe,
     )
+
+
+SCALAR_TYPES = {str, int, float, bool, type(None)}
+SEQUENCE_TYPES = (list, set, frozenset, GeneratorType, tuple)
+
+
+def _get_leaf_encoder(type_: Type[Any], custom_encoder: dict) -> Optional[Callable]:
+    # The same lookup as the end of jsonable_encoder(), which only depends on the
+    # type. None means the value has to go through jsonable_encoder().
+    if type_ in custom_encoder:
+        return custom_encoder[type_]
+    for encoder_type, encoder in custom_encoder.items():
+        if issubclass(type_, encoder_type):
+            return encoder
+    if type_ in ENCODERS_BY_TYPE:
+        return ENCODERS_BY_TYPE[type_]
+    for encoder, classes_tuple in encoders_by_class_tuples.items():
+        if issubclass(type_, classes_tuple):
+            return encoder
+    return None
+
+
+def compile_response_serializer(
+    field: ModelField,
+    *,
+    by_alias: bool = True,
+    exclude_unset: bool = False,
+    exclude_none: bool = False,
+) -> Callable[[Any], Any]:
+    """
+    Build a function that returns the same result as:
+
+        jsonable_encoder(
+            value,
+            by_alias=by_alias,
+            exclude_unset=exclude_unset,
+            exclude_none=exclude_none,
+        )
+
+    It is meant for values validated by `field`. Output keys and field encoders
+    are resolved once per model class: up front for the response model, and
+    the first time any other model class is seen. Instances are then encoded
+    directly from their values in a single pass. There is no call to `.dict()`
+    followed by a second walk over the result.
+
+    `include`, `exclude` and `exclude_defaults` are not supported.
+    """
+    # Keyed by (model class, class whose Config.json_encoders applies). Like
+    # jsonable_encoder(), sub-models use the encoders of the outermost model.
+    model_encoders: Dict[Tuple[Type[BaseModel], Type[BaseModel]], Callable] = {}
+    leaf_encoders: Dict[Tuple[Type[Any], Optional[Type[BaseModel]]], Any] = {}
+
+    def get_custom_encoder(owner: Optional[Type[BaseModel]]) -> dict:
+        if owner is None:
+            return {}
+        return getattr(owner.Config, "json_encoders", {})
+
+    def encode_leaf(obj: Any, owner: Optional[Type[BaseModel]]) -> Any:
+        key = (type(obj), owner)
+        try:
+            encoder = leaf_encoders[key]
+        except KeyError:
+            encoder = leaf_encoders[key] = _get_leaf_encoder(
+                type(obj), get_custom_encoder(owner)
+            )
+        if encoder is not None:
+            return encoder(obj)
+        return jsonable_encoder(
+            obj,
+            by_alias=by_alias,
+            exclude_unset=exclude_unset,
+            exclude_none=exclude_none,
+            custom_encoder=get_custom_encoder(owner),
+        )
+
+    def encode_dict(obj: dict, owner: Optional[Type[BaseModel]]) -> dict:
+        encoded_dict = {}
+        for key, value in obj.items():
+            if value is None and exclude_none:
+                continue
+            if type(key) is not str:
+                key = encode_value(key, owner)
+            elif key.startswith("_sa"):
+                continue
+            encoded_dict[key] = encode_value(value, owner)
+        return encoded_dict
+
+    def encode_value(obj: Any, owner: Optional[Type[BaseModel]]) -> Any:
+        type_ = type(obj)
+        if type_ in SCALAR_TYPES:
+            return obj
+        if isinstance(obj, BaseModel):
+            return encode_model(obj, owner or type_)
+        if isinstance(obj, Enum):
+            return obj.value
+        if isinstance(obj, PurePath):
+            return str(obj)
+        if isinstance(obj, (str, int, float)):
+            return obj
+        if isinstance(obj, dict):
+            return encode_dict(obj, owner)
+        if isinstance(obj, SEQUENCE_TYPES):
+            return [encode_value(item, owner) for item in obj]
+        return encode_leaf(obj, owner)
+
+    def encode_model(obj: BaseModel, owner: Type[BaseModel]) -> Any:
+        key = (type(obj), owner)
+        try:
+            encoder = model_encoders[key]
+        except KeyError:
+            encoder = model_encoders[key] = compile_model(type(obj), owner)
+        return encoder(obj)
+
+    def compile_field(
+        field: ModelField, owner: Optional[Type[BaseModel]]
+    ) -> Callable:
+        type_ = field.type_
+        if not field.sub_fields and lenient_issubclass(type_, BaseModel):
+            model_owner = owner or type_
+            if field.shape == SHAPE_SINGLETON:
+
+                def encode_field(value: Any) -> Any:
+                    if type(value) is type_:
+                        return encode_model(value, model_owner)
+                    return encode_value(value, owner)
+
+                return encode_field
+            if field.shape == SHAPE_LIST:
+
+                def encode_field(value: Any) -> Any:
+                    if type(value) is not list:
+                        return encode_value(value, owner)
+                    return [
+                        encode_model(item, model_owner)
+                        if type(item) is type_
+                        else encode_value(item, owner)
+                        for item in value
+                    ]
+
+                return encode_field
+
+        def encode_field(value: Any) -> Any:
+            if type(value) in SCALAR_TYPES:
+                return value
+            return encode_value(value, owner)
+
+        return encode_field
+
+    def compile_model(model: Type[BaseModel], owner: Type[BaseModel]) -> Callable:
+        # Field name -> (output key, encoder), or None if the key is dropped
+        fields: Dict[str, Optional[Tuple[str, Callable]]] = {}
+        for name, model_field in model.__fields__.items():
+            key = model_field.alias if by_alias else name
+            if key.startswith("_sa"):
+                fields[name] = None
+            else:
+                fields[name] = (key, compile_field(model_field, owner))
+
+        def encode(obj: BaseModel) -> dict:
+            fields_set = obj.__fields_set__
+            encoded_dict = {}
+            for name, value in obj.__dict__.items():
+                if exclude_unset and name not in fields_set:
+                    continue
+                if value is None and exclude_none:
+                    continue
+                try:
+                    field_spec = fields[name]
+                except KeyError:
+                    # Extra attributes, allowed by the model config
+                    if name.startswith("_sa"):
+                        continue
+                    encoded_dict[name] = encode_value(value, owner)
+                    continue
+                if field_spec is not None:
+                    key, encode_field = field_spec
+                    encoded_dict[key] = encode_field(value)
+            return encoded_dict
+
+        return encode
+
+    if lenient_issubclass(field.type_, BaseModel):
+        model_encoders[field.type_, field.type_] = compile_model(
+            field.type_, field.type_
+        )
+    return compile_field(field, None)
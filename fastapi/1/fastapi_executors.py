@@ -0,0 +1,115 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+try:
+    import contextvars  # Python 3.7+ only.
+except ImportError:  # pragma: nocover
+    contextvars = None  # type: ignore
+
+T = TypeVar("T")
+
+
+class SyncExecutor:
+    """
+    A thread pool of its own for sync path operations and dependencies.
+
+    By default they are run with Starlette's `run_in_threadpool()`, in the
+    default executor of the event loop, shared with everything else that
+    uses it, e.g. `FileResponse`. Pass a `SyncExecutor` as `executor` to
+    `FastAPI` or `APIRouter` to size it separately and to get its load with
+    `stats()`.
+
+    With `run_endpoint_with_dependencies`, a sync endpoint is called in the
+    same worker thread as the sync dependencies solved right before it,
+    instead of in a thread hop of its own.
+
+    The threads are started when first needed. Call `shutdown()` to stop them,
+    e.g. in a shutdown event handler.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        *,
+        run_endpoint_with_dependencies: bool = False,
+        thread_name_prefix: str = "fastapi-sync",
+    ) -> None:
+        self.max_workers = max_workers
+        self.run_endpoint_with_dependencies = run_endpoint_with_dependencies
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.max_queued = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.thread_name_prefix,
+                    )
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        return self.submitted - self.started
+
+    @property
+    def running(self) -> int:
+        return self.started - self.completed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            # Not through the `executor` property, which takes the lock too, so
+            # that the pool is not started just to report it
+            executor = self._executor
+            return {
+                "max_workers": (
+                    self.max_workers if executor is None else executor._max_workers
+                ),
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "max_queued": self.max_queued,
+            }
+
+    def _call(self, func: Callable[..., T], args: Tuple[Any, ...]) -> T:
+        with self._lock:
+            self.started += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.completed += 1
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        The same as `run_in_threadpool()`, but in this executor.
+        """
+        loop = asyncio.get_event_loop()
+        if contextvars is not None:  # pragma: no cover
+            # Ensure we run in the same context
+            child = functools.partial(func, *args, **kwargs)
+            context = contextvars.copy_context()
+            func = context.run
+            args = (child,)
+        elif kwargs:  # pragma: no cover
+            func = functools.partial(func, **kwargs)
+        with self._lock:
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        return await loop.run_in_executor(self.executor, self._call, func, args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
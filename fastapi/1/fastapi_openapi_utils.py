@@ -1,5 +1,7 @@
+import gzip
+import hashlib
 import http.client
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, cast
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Type, cast
 
 from fastapi import routing
 from fastapi.dependencies.models import Dependant
@@ -10,7 +12,7 @@ from fastapi.openapi.constants import (
     REF_PREFIX,
     STATUS_CODES_WITH_NO_BODY,
 )
-from fastapi.openapi.models import OpenAPI
+from fastapi.openapi.models import Components, OpenAPI, PathItem
 from fastapi.params import Body, Param
 from fastapi.utils import (
     generate_operation_id_for_path,
@@ -19,6 +21,7 @@ from fastapi.utils import (
     get_model_definitions,
 )
 from pydantic import BaseModel
+from pydantic.error_wrappers import ValidationError
 from pydantic.schema import field_schema, get_model_name_map
 from pydantic.utils import lenient_issubclass
 from starlette.responses import JSONResponse
@@ -270,6 +273,192 @@ def get_openapi_path(
     return path, security_schemes, definitions
 
 
+class RenderedOpenAPI:
+    """
+    An OpenAPI schema serialized the same way `JSONResponse` would, with an
+    ETag and a gzip-compressed copy made on first use.
+    """
+
+    def __init__(self, schema: Dict[str, Any]) -> None:
+        self.schema = schema
+        self.body = JSONResponse(schema).body
+        self.etag = '"{}"'.format(hashlib.md5(self.body).hexdigest())
+        self._gzip_body: Optional[bytes] = None
+
+    @property
+    def gzip_body(self) -> bytes:
+        if self._gzip_body is None:
+            self._gzip_body = gzip.compress(self.body)
+        return self._gzip_body
+
+
+def encode_openapi_value(model: Type[BaseModel], name: str, value: Any) -> Any:
+    """
+    Validate and encode `value` as field `name` of `model`, exactly as it would
+    be as part of a whole `model`.
+    """
+    field = model.__fields__[name]
+    validated, errors = field.validate(value, {}, loc=name)
+    if errors:
+        raise ValidationError([errors], model)
+    return jsonable_encoder(validated, by_alias=True, exclude_none=True)
+
+
+path_item_keys = [field.alias for field in PathItem.__fields__.values()]
+
+
+class OpenAPIBuilder:
+    """
+    Build OpenAPI schemas like `get_openapi()`, reusing the encoded parts of
+    routes and models that were already in the previous schema.
+
+    Parts are cached by route identity, so a route is expected not to change
+    once it has been added. Adding or removing routes, e.g. with
+    `include_router()`, only generates the parts for the new routes. The
+    exception is when a new model's name clashes with a model that's already in
+    the schema: model names and references change, and everything is
+    generated again.
+    """
+
+    def __init__(self) -> None:
+        self.schema: Optional[Dict[str, Any]] = None
+        self.routes_key: Optional[Tuple[int, ...]] = None
+        self.model_name_map: Dict[Type[BaseModel], str] = {}
+        # Keyed by id(route), with the route kept so that the id stays unique
+        self.route_models: Dict[int, Tuple[BaseRoute, Set[Type[BaseModel]]]] = {}
+        self.route_paths: Dict[int, Tuple[BaseRoute, Tuple[Dict, Dict, Dict]]] = {}
+        self.model_definitions: Dict[Type[BaseModel], Dict[str, Any]] = {}
+        self.rendered: Optional[RenderedOpenAPI] = None
+
+    def is_outdated(self, routes: Sequence[BaseRoute]) -> bool:
+        return self.routes_key != tuple(id(route) for route in routes)
+
+    def get_route_models(self, route: BaseRoute) -> Set[Type[BaseModel]]:
+        cached = self.route_models.get(id(route))
+        if cached is None:
+            cached = (route, get_flat_models_from_routes([route]))
+        self.route_models[id(route)] = cached
+        return cached[1]
+
+    def get_route_path(self, route: routing.APIRoute) -> Tuple[Dict, Dict, Dict]:
+        cached = self.route_paths.get(id(route))
+        if cached is None:
+            path, security_schemes, path_definitions = get_openapi_path(
+                route=route, model_name_map=self.model_name_map
+            )
+            if path:
+                path = encode_openapi_value(OpenAPI, "paths", {"": path})[""]
+            cached = (route, (path, security_schemes, path_definitions))
+        self.route_paths[id(route)] = cached
+        return cached[1]
+
+    def get_model_definitions(self, model: Type[BaseModel]) -> Dict[str, Any]:
+        definitions = self.model_definitions.get(model)
+        if definitions is None:
+            definitions = encode_openapi_value(
+                Components,
+                "schemas",
+                get_model_definitions(
+                    flat_models={model}, model_name_map=self.model_name_map
+                ),
+            )
+            self.model_definitions[model] = definitions
+        return definitions
+
+    def build(
+        self,
+        *,
+        title: str,
+        version: str,
+        openapi_version: str = "3.0.2",
+        description: str = None,
+        routes: Sequence[BaseRoute],
+        openapi_prefix: str = ""
+    ) -> Dict:
+        route_models = self.route_models
+        self.route_models = {}
+        flat_models: Set[Type[BaseModel]] = set()
+        for route in routes:
+            if id(route) in route_models:
+                self.route_models[id(route)] = route_models[id(route)]
+            flat_models |= self.get_route_models(route)
+        model_name_map = get_model_name_map(flat_models)
+        if any(
+            self.model_name_map.get(model, name) != name
+            for model, name in model_name_map.items()
+        ):
+            self.route_paths.clear()
+            self.model_definitions.clear()
+        self.model_name_map = model_name_map
+
+        definitions: Dict[str, Any] = {}
+        self.model_definitions = {
+            model: model_definitions
+            for model, model_definitions in self.model_definitions.items()
+            if model in flat_models
+        }
+        for model in flat_models:
+            definitions.update(self.get_model_definitions(model))
+
+        info = {"title": title, "version": version}
+        if description:
+            info["description"] = description
+        output = {"openapi": openapi_version, "info": info}
+        components: Dict[str, Dict] = {}
+        paths: Dict[str, Dict] = {}
+        # Mostly the same few validation error schemas, encoded once below
+        routes_definitions: Dict[str, Any] = {}
+        route_paths = self.route_paths
+        self.route_paths = {}
+        for route in routes:
+            if isinstance(route, routing.APIRoute):
+                if id(route) in route_paths:
+                    self.route_paths[id(route)] = route_paths[id(route)]
+                path, security_schemes, path_definitions = self.get_route_path(route)
+                if path:
+                    paths.setdefault(openapi_prefix + route.path_format, {}).update(
+                        path
+                    )
+                if security_schemes:
+                    components.setdefault("securitySchemes", {}).update(
+                        security_schemes
+                    )
+                if path_definitions:
+                    routes_definitions.update(path_definitions)
+        if routes_definitions:
+            definitions.update(
+                encode_openapi_value(Components, "schemas", routes_definitions)
+            )
+        if definitions:
+            # Already encoded, filled in below
+            components["schemas"] = {}
+        if components:
+            output["components"] = components
+        output["paths"] = {}
+        schema = jsonable_encoder(OpenAPI(**output), by_alias=True, exclude_none=True)
+        schema["paths"] = {
+            path: {key: operations[key] for key in path_item_keys if key in operations}
+            for path, operations in paths.items()
+        }
+        if definitions:
+            schema["components"]["schemas"] = {
+                k: definitions[k] for k in sorted(definitions)
+            }
+        self.schema = schema
+        self.routes_key = tuple(id(route) for route in routes)
+        return schema
+
+    def render(self, schema: Dict[str, Any]) -> RenderedOpenAPI:
+        """
+        Serialize `schema`, reusing the previous result for the same schema
+        object. Changes made to a schema in place after it was rendered are not
+        picked up until `rendered` is reset to `None`.
+        """
+        if self.rendered is None or self.rendered.schema is not schema:
+            self.rendered = RenderedOpenAPI(schema)
+        return self.rendered
+
+
 def get_openapi(
     *,
     title: str,
@@ -279,35 +468,11 @@ def get_openapi(
     routes: Sequence[BaseRoute],
     openapi_prefix: str = ""
 ) -> Dict:
-    info = {"title": title, "version": version}
-    if description:
-        info["description"] = description
-    output = {"openapi": openapi_version, "info": info}
-    components: Dict[str, Dict] = {}
-    paths: Dict[str, Dict] = {}
-    flat_models = get_flat_models_from_routes(routes)
-    model_name_map = get_model_name_map(flat_models)
-    definitions = get_model_definitions(
-        flat_models=flat_models, model_name_map=model_name_map
+    return OpenAPIBuilder().build(
+        title=title,
+        version=version,
+        openapi_version=openapi_version,
+        description=description,
+        routes=routes,
+        openapi_prefix=openapi_prefix,
     )
-    for route in routes:
-        if isinstance(route, routing.APIRoute):
-            result = get_openapi_path(route=route, model_name_map=model_name_map)
-            if result:
-                path, security_schemes, path_definitions = result
-                if path:
-                    paths.setdefault(openapi_prefix + route.path_format, {}).update(
-                        path
-                    )
-                if security_schemes:
-                    components.setdefault("securitySchemes", {}).update(
-                        security_schemes
-                    )
-                if path_definitions:
-                    definitions.update(path_definitions)
-    if definitions:
-        components["schemas"] = {k: definitions[k] for k in sorted(definitions)}
-    if components:
-        output["components"] = components
-    output["paths"] = paths
-    return jsonable_encoder(OpenAPI(**output), by_alias=True, exclude_none=True)
@@ -9,9 +9,16 @@ from fastapi.dependencies.utils import (
     get_dependant,
     get_parameterless_sub_dependant,
     solve_dependencies,
+    solve_dependencies_and_call,
+)
+from fastapi.encoders import (
+    DictIntStrAny,
+    SetIntStr,
+    compile_response_serializer,
+    jsonable_encoder,
 )
-from fastapi.encoders import DictIntStrAny, SetIntStr, jsonable_encoder
 from fastapi.exceptions import RequestValidationError, WebSocketRequestValidationError
+from fastapi.executors import SyncExecutor
 from fastapi.logger import logger
 from fastapi.openapi.constants import STATUS_CODES_WITH_NO_BODY
 from fastapi.utils import (
@@ -102,6 +109,8 @@ async def serialize_response(
     exclude_defaults: bool = False,
     exclude_none: bool = False,
     is_coroutine: bool = True,
+    serializer: Callable[[Any], Any] = None,
+    executor: SyncExecutor = None,
 ) -> Any:
     if field:
         errors = []
@@ -114,6 +123,10 @@ async def serialize_response(
         )
         if is_coroutine:
             value, errors_ = field.validate(response_content, {}, loc=("response",))
+        elif executor is not None:
+            value, errors_ = await executor.run(
+                field.validate, response_content, {}, loc=("response",)
+            )
         else:
             value, errors_ = await run_in_threadpool(
                 field.validate, response_content, {}, loc=("response",)
@@ -124,6 +137,8 @@ async def serialize_response(
             errors.extend(errors_)
         if errors:
             raise ValidationError(errors, field.type_)
+        if serializer:
+            return serializer(value)
         return jsonable_encoder(
             value,
             include=include,
@@ -138,7 +153,11 @@ async def serialize_response(
 
 
 async def run_endpoint_function(
-    *, dependant: Dependant, values: Dict[str, Any], is_coroutine: bool
+    *,
+    dependant: Dependant,
+    values: Dict[str, Any],
+    is_coroutine: bool,
+    executor: SyncExecutor = None,
 ) -> Any:
     # Only called by get_request_handler. Has been split into its own function to
     # facilitate profiling endpoints, since inner functions are harder to profile.
@@ -146,6 +165,8 @@ async def run_endpoint_function(
 
     if is_coroutine:
         return await dependant.call(**values)
+    elif executor is not None:
+        return await executor.run(dependant.call, **values)
     else:
         return await run_in_threadpool(dependant.call, **values)
 
@@ -162,11 +183,31 @@ def get_request_handler(
     response_model_exclude_unset: bool = False,
     response_model_exclude_defaults: bool = False,
     response_model_exclude_none: bool = False,
+    response_model_compiled: bool = False,
     dependency_overrides_provider: Any = None,
+    executor: SyncExecutor = None,
 ) -> Callable:
     assert dependant.call is not None, "dependant.call must be a function"
     is_coroutine = asyncio.iscoroutinefunction(dependant.call)
+    call_with_dependencies = bool(
+        executor and executor.run_endpoint_with_dependencies and not is_coroutine
+    )
     is_body_form = body_field and isinstance(get_field_info(body_field), params.Form)
+    response_serializer = None
+    if (
+        response_field
+        and response_model_compiled
+        and PYDANTIC_1
+        and response_model_include is None
+        and not response_model_exclude
+        and not response_model_exclude_defaults
+    ):
+        response_serializer = compile_response_serializer(
+            response_field,
+            by_alias=response_model_by_alias,
+            exclude_unset=response_model_exclude_unset,
+            exclude_none=response_model_exclude_none,
+        )
 
     async def app(request: Request) -> Response:
         try:
@@ -183,19 +224,34 @@ def get_request_handler(
             raise HTTPException(
                 status_code=400, detail="There was an error parsing the body"
             ) from e
-        solved_result = await solve_dependencies(
-            request=request,
-            dependant=dependant,
-            body=body,
-            dependency_overrides_provider=dependency_overrides_provider,
-        )
-        values, errors, background_tasks, sub_response, _ = solved_result
+        if call_with_dependencies:
+            solved_result = await solve_dependencies_and_call(
+                request=request,
+                dependant=dependant,
+                body=body,
+                dependency_overrides_provider=dependency_overrides_provider,
+                executor=executor,
+            )
+            values, errors, background_tasks, sub_response, raw_response = solved_result
+        else:
+            solved_result = await solve_dependencies(
+                request=request,
+                dependant=dependant,
+                body=body,
+                dependency_overrides_provider=dependency_overrides_provider,
+                executor=executor,
+            )
+            values, errors, background_tasks, sub_response, _ = solved_result
         if errors:
             raise RequestValidationError(errors, body=body)
         else:
-            raw_response = await run_endpoint_function(
-                dependant=dependant, values=values, is_coroutine=is_coroutine
-            )
+            if not call_with_dependencies:
+                raw_response = await run_endpoint_function(
+                    dependant=dependant,
+                    values=values,
+                    is_coroutine=is_coroutine,
+                    executor=executor,
+                )
 
             if isinstance(raw_response, Response):
                 if raw_response.background is None:
@@ -211,6 +267,8 @@ def get_request_handler(
                 exclude_defaults=response_model_exclude_defaults,
                 exclude_none=response_model_exclude_none,
                 is_coroutine=is_coroutine,
+                serializer=response_serializer,
+                executor=executor,
             )
             response = response_class(
                 content=response_data,
@@ -290,10 +348,12 @@ class APIRoute(routing.Route):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Optional[Type[Response]] = None,
         dependency_overrides_provider: Any = None,
         callbacks: Optional[List["APIRoute"]] = None,
+        executor: Optional[SyncExecutor] = None,
     ) -> None:
         self.path = path
         self.endpoint = endpoint
@@ -363,6 +423,7 @@ class APIRoute(routing.Route):
         self.response_model_exclude_unset = response_model_exclude_unset
         self.response_model_exclude_defaults = response_model_exclude_defaults
         self.response_model_exclude_none = response_model_exclude_none
+        self.response_model_compiled = response_model_compiled
         self.include_in_schema = include_in_schema
         self.response_class = response_class
 
@@ -376,6 +437,7 @@ class APIRoute(routing.Route):
         self.body_field = get_body_field(dependant=self.dependant, name=self.unique_id)
         self.dependency_overrides_provider = dependency_overrides_provider
         self.callbacks = callbacks
+        self.executor = executor
         self.app = request_response(self.get_route_handler())
 
     def get_route_handler(self) -> Callable:
@@ -391,7 +453,9 @@ class APIRoute(routing.Route):
             response_model_exclude_unset=self.response_model_exclude_unset,
             response_model_exclude_defaults=self.response_model_exclude_defaults,
             response_model_exclude_none=self.response_model_exclude_none,
+            response_model_compiled=self.response_model_compiled,
             dependency_overrides_provider=self.dependency_overrides_provider,
+            executor=self.executor,
         )
 
 
@@ -406,6 +470,7 @@ class APIRouter(routing.Router):
         default_response_class: Type[Response] = None,
         on_startup: Sequence[Callable] = None,
         on_shutdown: Sequence[Callable] = None,
+        executor: Optional[SyncExecutor] = None,
     ) -> None:
         super().__init__(
             routes=routes,
@@ -417,6 +482,7 @@ class APIRouter(routing.Router):
         self.dependency_overrides_provider = dependency_overrides_provider
         self.route_class = route_class
         self.default_response_class = default_response_class
+        self.executor = executor
 
     def add_api_route(
         self,
@@ -441,11 +507,13 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
         route_class_override: Optional[Type[APIRoute]] = None,
         callbacks: List[APIRoute] = None,
+        executor: Optional[SyncExecutor] = None,
     ) -> None:
         if response_model_skip_defaults is not None:
             warning_response_model_skip_defaults_deprecated()  # pragma: nocover
@@ -472,11 +540,13 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
             dependency_overrides_provider=self.dependency_overrides_provider,
             callbacks=callbacks,
+            executor=executor or self.executor,
         )
         self.routes.append(route)
 
@@ -502,6 +572,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -533,6 +604,7 @@ class APIRouter(routing.Router):
                 ),
                 response_model_exclude_defaults=response_model_exclude_defaults,
                 response_model_exclude_none=response_model_exclude_none,
+                response_model_compiled=response_model_compiled,
                 include_in_schema=include_in_schema,
                 response_class=response_class or self.default_response_class,
                 name=name,
@@ -609,11 +681,13 @@ class APIRouter(routing.Router):
                     response_model_exclude_unset=route.response_model_exclude_unset,
                     response_model_exclude_defaults=route.response_model_exclude_defaults,
                     response_model_exclude_none=route.response_model_exclude_none,
+                    response_model_compiled=route.response_model_compiled,
                     include_in_schema=route.include_in_schema,
                     response_class=route.response_class or default_response_class,
                     name=route.name,
                     route_class_override=type(route),
                     callbacks=route.callbacks,
+                    executor=route.executor,
                 )
             elif isinstance(route, routing.Route):
                 self.add_route(
@@ -657,6 +731,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -685,6 +760,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -712,6 +788,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -740,6 +817,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -767,6 +845,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -795,6 +874,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -822,6 +902,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -850,6 +931,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -877,6 +959,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -905,6 +988,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -932,6 +1016,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -960,6 +1045,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -987,6 +1073,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -1015,6 +1102,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -1042,6 +1130,7 @@ class APIRouter(routing.Router):
         response_model_exclude_unset: bool = False,
         response_model_exclude_defaults: bool = False,
         response_model_exclude_none: bool = False,
+        response_model_compiled: bool = False,
         include_in_schema: bool = True,
         response_class: Type[Response] = None,
         name: str = None,
@@ -1070,6 +1159,7 @@ class APIRouter(routing.Router):
             ),
             response_model_exclude_defaults=response_model_exclude_defaults,
             response_model_exclude_none=response_model_exclude_none,
+            response_model_compiled=response_model_compiled,
             include_in_schema=include_in_schema,
             response_class=response_class or self.default_response_class,
             name=name,
@@ -0,0 +1,126 @@
+import gzip
+
+from fastapi import APIRouter, FastAPI
+from fastapi.openapi.utils import get_openapi
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+
+class Item(BaseModel):
+    name: str
+
+
+class User(BaseModel):
+    username: str
+
+
+def make_app(**kwargs):
+    app = FastAPI(**kwargs)
+
+    @app.get("/items/{item_id}", response_model=Item)
+    def read_item(item_id: int):
+        pass  # pragma: no cover
+
+    return app
+
+
+def make_router():
+    router = APIRouter()
+
+    @router.post("/users", response_model=User)
+    def create_user(user: User):
+        pass  # pragma: no cover
+
+    return router
+
+
+def full_openapi(app):
+    return get_openapi(
+        title=app.title,
+        version=app.version,
+        openapi_version=app.openapi_version,
+        description=app.description,
+        routes=app.routes,
+    )
+
+
+def test_incremental_build_after_include_router():
+    app = make_app()
+    client = TestClient(app)
+    assert client.get("/openapi.json").json() == full_openapi(app)
+    item_route = app.routes[-1]
+    item_path = app.openapi_builder.route_paths[id(item_route)]
+
+    app.include_router(make_router())
+    schema = client.get("/openapi.json").json()
+    assert schema == full_openapi(app)
+    assert set(schema["paths"]) == {"/items/{item_id}", "/users"}
+    assert "User" in schema["components"]["schemas"]
+    # The part of the route that was already there is reused
+    assert app.openapi_builder.route_paths[id(item_route)] is item_path
+
+
+def test_etag():
+    app = make_app()
+    client = TestClient(app)
+    response = client.get("/openapi.json")
+    etag = response.headers["etag"]
+
+    for if_none_match in [etag, "W/" + etag, '"other", ' + etag]:
+        response = client.get("/openapi.json", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    response = client.get("/openapi.json", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.json() == full_openapi(app)
+
+    app.include_router(make_router())
+    response = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "/users" in response.json()["paths"]
+
+
+def test_gzip():
+    app = make_app(openapi_gzip=True)
+    client = TestClient(app)
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    body = response.content
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == body
+    assert gzip.decompress(app.openapi_builder.rendered.gzip_body) == body
+
+
+def test_no_gzip_by_default():
+    client = TestClient(make_app())
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_reassigned_schema():
+    app = make_app()
+    client = TestClient(app)
+    etag = client.get("/openapi.json").headers["etag"]
+
+    # Changes made in place are served once the schema is assigned again
+    schema = app.openapi()
+    schema["info"]["x-logo"] = {"url": "https://example.com/logo.png"}
+    app.openapi_schema = schema
+    response = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["info"]["x-logo"] == {
+        "url": "https://example.com/logo.png"
+    }
+
+    # A schema set by the user is kept as is, even when routes are added
+    app.openapi_schema = {"openapi": "3.0.2", "info": {}, "paths": {}}
+    app.include_router(make_router())
+    assert client.get("/openapi.json").json() == app.openapi_schema
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional, Union
+from uuid import UUID
+
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import compile_response_serializer, jsonable_encoder
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+from pydantic import BaseModel, Field
+
+
+class Color(str, Enum):
+    red = "red"
+    blue = "blue"
+
+
+class Tag(BaseModel):
+    name: str
+    color: Optional[Color] = None
+    created: Optional[datetime] = None
+
+
+class Item(BaseModel):
+    id: int
+    name: str = Field(..., alias="itemName")
+    price: Optional[Decimal] = None
+    tags: List[Tag] = []
+    owner: Optional[Tag] = None
+    attributes: Dict[str, Union[int, str, None]] = {}
+    uid: Optional[UUID] = None
+    ttl: timedelta = timedelta(seconds=30)
+
+    class Config:
+        json_encoders = {datetime: lambda dt: dt.strftime("%Y")}
+
+
+class Extra(BaseModel):
+    a: int = 1
+
+    class Config:
+        extra = "allow"
+
+
+def make_items(count: int) -> List[Item]:
+    return [
+        Item(
+            id=i,
+            itemName=f"item {i}",
+            price=Decimal("1.5") if i % 2 else None,
+            tags=[
+                {"name": "a", "color": Color.red, "created": datetime(2020, 1, 2)},
+                {"name": "b"},
+            ],
+            owner={"name": "o"} if i % 3 else None,
+            attributes={"x": i, "y": None, "_sa_state": "hidden"},
+            uid=UUID(int=i),
+        )
+        for i in range(count)
+    ]
+
+
+option_sets = [
+    {},
+    {"by_alias": False},
+    {"exclude_unset": True},
+    {"exclude_none": True},
+    {"exclude_unset": True, "exclude_none": True, "by_alias": False},
+]
+
+
+def assert_equivalent(type_, content, **options):
+    field = create_response_field(name="Response_test", type_=type_)
+    value, errors = field.validate(
+        jsonable_encoder(content, by_alias=True), {}, loc=("response",)
+    )
+    assert not errors
+    serializer = compile_response_serializer(field, **options)
+    expected = jsonable_encoder(value, **options)
+    assert serializer(value) == expected
+    # Compiled encoders are reused
+    assert serializer(value) == expected
+
+
+@pytest.mark.parametrize("options", option_sets)
+def test_model_list(options):
+    assert_equivalent(List[Item], make_items(5), **options)
+
+
+@pytest.mark.parametrize("options", option_sets)
+def test_model(options):
+    assert_equivalent(Item, make_items(2)[1], **options)
+
+
+@pytest.mark.parametrize("options", option_sets)
+def test_model_dict(options):
+    assert_equivalent(Dict[str, Item], {"a": make_items(1)[0]}, **options)
+
+
+@pytest.mark.parametrize("options", option_sets)
+def test_model_union(options):
+    assert_equivalent(
+        List[Union[Tag, Extra]], [{"name": "t"}, {"a": 2, "b": None}], **options
+    )
+
+
+@pytest.mark.parametrize("options", option_sets)
+def test_plain_types(options):
+    content = {"a": [1, 2.5, "x", None], "b": {"c": None}}
+    assert_equivalent(
+        Dict[str, Union[List[Union[int, str, None]], dict]], content, **options
+    )
+    assert_equivalent(List[Color], ["red", Color.blue], **options)
+
+
+app = FastAPI()
+
+
+@app.get("/items", response_model=List[Item], response_model_compiled=True)
+def get_items():
+    return make_items(3)
+
+
+@app.get("/items/raw", response_model=List[Item])
+def get_items_raw():
+    return make_items(3)
+
+
+@app.get(
+    "/items/exclude",
+    response_model=List[Item],
+    response_model_exclude={"tags"},
+    response_model_compiled=True,
+)
+def get_items_exclude():
+    return make_items(3)
+
+
+client = TestClient(app)
+
+
+def test_compiled_route():
+    response = client.get("/items")
+    assert response.status_code == 200
+    assert response.json() == client.get("/items/raw").json()
+
+
+def test_compiled_route_unsupported_options():
+    response = client.get("/items/exclude")
+    assert response.status_code == 200
+    assert all("tags" not in item for item in response.json())
@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Header, Response
+from fastapi.executors import SyncExecutor
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+calls = []
+
+
+def record(name: str) -> None:
+    calls.append((name, threading.current_thread().name))
+
+
+def first(x: int = 1):
+    record("first")
+    return x
+
+
+async def second(a: int = Depends(first)):
+    record("second")
+    return a + 1
+
+
+def third(b: int = Depends(second), h: str = Header("h"), response: Response = None):
+    record("third")
+    response.headers["x-third"] = h
+    return b + 1
+
+
+class Item(BaseModel):
+    name: str
+
+
+def make_app(executor):
+    app = FastAPI(executor=executor)
+
+    @app.post("/items", response_model=Item)
+    def create_item(item: Item, value: int = Depends(third), q: int = 0):
+        record("endpoint")
+        return {"name": f"{item.name}-{value}-{q}"}
+
+    router = APIRouter(executor=SyncExecutor(1, thread_name_prefix="router"))
+
+    @router.get("/router")
+    def read_router(value: int = Depends(first)):
+        record("router")
+        return value
+
+    app.include_router(router)
+    return app
+
+
+request_cases = [
+    ("/items?q=3", {"name": "a"}),
+    ("/items?q=x", {"name": "a"}),
+    ("/items?x=y", {"other": "a"}),
+    ("/items", None),
+    ("/router?x=5", None),
+    ("/router?x=y", None),
+]
+
+
+def get_responses(client):
+    responses = []
+    for url, json in request_cases:
+        if url.startswith("/router"):
+            response = client.get(url)
+        else:
+            response = client.post(url, json=json)
+        responses.append(
+            (response.status_code, response.json(), response.headers.get("x-third"))
+        )
+    return responses
+
+
+@pytest.fixture(scope="module")
+def expected_responses():
+    return get_responses(TestClient(make_app(None)))
+
+
+@pytest.mark.parametrize("run_endpoint_with_dependencies", [False, True])
+def test_executor(run_endpoint_with_dependencies, expected_responses):
+    executor = SyncExecutor(
+        2, run_endpoint_with_dependencies=run_endpoint_with_dependencies
+    )
+    calls.clear()
+    client = TestClient(make_app(executor))
+    assert get_responses(client) == expected_responses
+    threads = {name: set() for name, _ in calls}
+    for name, thread in calls:
+        threads[name].add(thread.split("_")[0])
+    assert threads == {
+        "first": {"fastapi-sync", "router"},
+        "second": {"MainThread"},
+        "third": {"fastapi-sync"},
+        "endpoint": {"fastapi-sync"},
+        "router": {"router"},
+    }
+    stats = executor.stats()
+    assert stats["max_workers"] == 2
+    assert stats["queued"] == stats["running"] == 0
+    assert stats["completed"] > 0
+    executor.shutdown()
+
+
+def test_endpoint_with_dependencies_thread_hops():
+    def dependency(x: int = 1):
+        return x
+
+    counts = {}
+    for run_endpoint_with_dependencies in [False, True]:
+        executor = SyncExecutor(
+            run_endpoint_with_dependencies=run_endpoint_with_dependencies
+        )
+        app = FastAPI(executor=executor)
+
+        @app.get("/")
+        def read_root(value: int = Depends(dependency)):
+            return value
+
+        response = TestClient(app).get("/?x=2")
+        assert response.json() == 2
+        counts[run_endpoint_with_dependencies] = executor.completed
+    assert counts == {False: 2, True: 1}
+
+
+def test_stats_before_first_use_and_after_shutdown():
+    executor = SyncExecutor(3)
+    assert executor.stats() == {
+        "max_workers": 3,
+        "queued": 0,
+        "running": 0,
+        "completed": 0,
+        "max_queued": 0,
+    }
+    assert executor._executor is None
+
+    app = FastAPI(executor=executor)
+
+    @app.get("/")
+    def read_root():
+        return 1
+
+    assert TestClient(app).get("/").json() == 1
+    executor.shutdown()
+    stats = executor.stats()
+    assert stats["max_workers"] == 3
+    assert stats["completed"] == 1
+    assert executor._executor is None
@@ -15,6 +15,12 @@ from typing import (
     Union,
     cast,
 )
+from weakref import WeakKeyDictionary
+
+try:
+    import contextvars  # Python 3.7+ only.
+except ImportError:  # pragma: nocover
+    contextvars = None  # type: ignore
 
 from fastapi import params
 from fastapi.concurrency import (
@@ -24,6 +30,7 @@ from fastapi.concurrency import (
     contextmanager_in_threadpool,
 )
 from fastapi.dependencies.models import Dependant, SecurityRequirement
+from fastapi.executors import SyncExecutor
 from fastapi.security.base import SecurityBase
 from fastapi.security.oauth2 import OAuth2, SecurityScopes
 from fastapi.security.open_id_connect_url import OpenIdConnect
@@ -430,6 +437,398 @@ async def solve_generator(
     return await stack.enter_async_context(cm)
 
 
+ParamExtractor = Callable[[Any], Tuple[Dict[str, Any], List[ErrorWrapper]]]
+
+
+def get_param_extractor(
+    fields: Sequence[ModelField], *, in_: params.ParamTypes
+) -> ParamExtractor:
+    """
+    Precompute what `request_params_to_args()` works out for each field on every
+    request, and return a function that reads the fields from the request
+    parameters for `in_`.
+    """
+    multi_value = in_ in (params.ParamTypes.query, params.ParamTypes.header)
+    specs = []
+    for field in fields:
+        field_info = get_field_info(field)
+        assert isinstance(
+            field_info, params.Param
+        ), "Params must be subclasses of Param"
+        getlist = multi_value and is_scalar_sequence_field(field)
+        specs.append((field, getlist, (field_info.in_.value, field.alias)))
+
+    def extract(
+        received_params: Union[Mapping[str, Any], QueryParams, Headers]
+    ) -> Tuple[Dict[str, Any], List[ErrorWrapper]]:
+        values: Dict[str, Any] = {}
+        errors: List[ErrorWrapper] = []
+        for field, getlist, loc in specs:
+            if getlist:
+                value = received_params.getlist(field.alias) or field.default
+            else:
+                value = received_params.get(field.alias)
+            if value is None:
+                if field.required:
+                    if PYDANTIC_1:
+                        errors.append(ErrorWrapper(MissingError(), loc=loc))
+                    else:  # pragma: nocover
+                        errors.append(
+                            ErrorWrapper(  # type: ignore
+                                MissingError(), loc=loc, config=BaseConfig
+                            )
+                        )
+                else:
+                    values[field.name] = deepcopy(field.default)
+                continue
+            v_, errors_ = field.validate(value, values, loc=loc)
+            if isinstance(errors_, ErrorWrapper):
+                errors.append(errors_)
+            elif isinstance(errors_, list):
+                errors.extend(errors_)
+            else:
+                values[field.name] = v_
+        return values, errors
+
+    return extract
+
+
+class DependencyStep:
+    """
+    A dependency (or the endpoint itself, for the last step of a plan) with
+    everything needed to solve it precomputed.
+    """
+
+    def __init__(
+        self,
+        *,
+        dependant: Dependant,
+        name: Optional[str] = None,
+        cache_key: Optional[CacheKey] = None,
+        use_cache: bool = True,
+    ) -> None:
+        self.dependant = dependant
+        self.call = dependant.call
+        self.name = name
+        self.cache_key = cache_key
+        self.use_cache = use_cache
+        self.num_dependencies = len(dependant.dependencies)
+        self.param_extractors = [
+            (in_, get_param_extractor(fields, in_=in_))
+            for in_, fields in (
+                (params.ParamTypes.path, dependant.path_params),
+                (params.ParamTypes.query, dependant.query_params),
+                (params.ParamTypes.header, dependant.header_params),
+                (params.ParamTypes.cookie, dependant.cookie_params),
+            )
+            if fields
+        ]
+        self.is_generator = inspect.isgeneratorfunction(
+            self.call
+        ) or inspect.isasyncgenfunction(self.call)
+        self.is_coroutine = not self.is_generator and is_coroutine_callable(
+            self.call
+        )
+        # Plain functions without body parameters can be solved entirely in a
+        # worker thread, together with their neighbours in the plan
+        self.is_sync = not (
+            self.is_generator or self.is_coroutine or dependant.body_params
+        )
+
+
+class DependencyPlan:
+    """
+    The dependency tree of a `Dependant`, with `dependency_overrides` applied,
+    flattened into the order `solve_dependencies()` solves it in: each
+    dependency comes right after its own sub-dependencies, and the endpoint
+    comes last.
+    """
+
+    def __init__(
+        self, dependant: Dependant, dependency_overrides: Dict[Callable, Callable]
+    ) -> None:
+        self.dependency_overrides = dependency_overrides.copy()
+        self.steps: List[DependencyStep] = []
+        self.add_steps(dependant)
+        self.steps.append(DependencyStep(dependant=dependant))
+        # Index of the end of each run of steps that can share a threadpool hop
+        self.sync_run_ends = [0] * len(self.steps)
+        run_end = len(self.steps)
+        for index in range(len(self.steps) - 1, -1, -1):
+            if not self.steps[index].is_sync:
+                run_end = index
+            self.sync_run_ends[index] = run_end
+        # Start of the run of sync steps right before the endpoint
+        self.endpoint_run_start = len(self.steps) - 1
+        while (
+            self.endpoint_run_start > 0
+            and self.steps[self.endpoint_run_start - 1].is_sync
+        ):
+            self.endpoint_run_start -= 1
+
+    def add_steps(self, dependant: Dependant) -> None:
+        for sub_dependant in dependant.dependencies:
+            use_sub_dependant = sub_dependant
+            if self.dependency_overrides:
+                original_call = cast(Callable, sub_dependant.call)
+                call = self.dependency_overrides.get(original_call, original_call)
+                use_path: str = sub_dependant.path  # type: ignore
+                use_sub_dependant = get_dependant(
+                    path=use_path,
+                    call=call,
+                    name=sub_dependant.name,
+                    security_scopes=sub_dependant.security_scopes,
+                )
+            self.add_steps(use_sub_dependant)
+            self.steps.append(
+                DependencyStep(
+                    dependant=use_sub_dependant,
+                    name=sub_dependant.name,
+                    cache_key=sub_dependant.cache_key,
+                    use_cache=sub_dependant.use_cache,
+                )
+            )
+
+
+dependency_plans: "WeakKeyDictionary[Dependant, DependencyPlan]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_dependency_plan(
+    dependant: Dependant, dependency_overrides_provider: Any = None
+) -> DependencyPlan:
+    dependency_overrides = (
+        getattr(dependency_overrides_provider, "dependency_overrides", None) or {}
+    )
+    plan = dependency_plans.get(dependant)
+    if plan is None or plan.dependency_overrides != dependency_overrides:
+        plan = DependencyPlan(dependant, dependency_overrides)
+        dependency_plans[dependant] = plan
+    return plan
+
+
+# Marks a dependency that wasn't called because it or its own sub-dependencies
+# had errors
+_unsolved = object()
+
+
+class DependencySolver:
+    """
+    Solve the steps of a `DependencyPlan` for one request.
+    """
+
+    def __init__(
+        self,
+        *,
+        plan: DependencyPlan,
+        request: Union[Request, WebSocket],
+        body: Optional[Union[Dict[str, Any], FormData]],
+        background_tasks: Optional[BackgroundTasks],
+        response: Response,
+        dependency_cache: Dict[CacheKey, Any],
+        executor: Optional[SyncExecutor] = None,
+    ) -> None:
+        self.plan = plan
+        self.request = request
+        self.body = body
+        self.background_tasks = background_tasks
+        self.response = response
+        self.dependency_cache = dependency_cache
+        self.executor = executor
+        self.errors: List[ErrorWrapper] = []
+        # (name, solved value) of the steps not yet used by a later step
+        self.solved: List[Tuple[Optional[str], Any]] = []
+
+    async def solve(self) -> Dict[str, Any]:
+        last = len(self.plan.steps) - 1
+        await self.solve_steps(last)
+        return await self.get_values(self.plan.steps[last]) or {}
+
+    async def solve_and_call(self) -> Tuple[Dict[str, Any], Any]:
+        """
+        Solve the dependencies and call the endpoint, a sync function, in the
+        same worker thread as the sync dependencies right before it. The
+        endpoint is not called, and `None` is returned for it, if there are
+        errors.
+        """
+        steps = self.plan.steps
+        start = self.plan.endpoint_run_start
+        await self.solve_steps(start)
+        if start == len(steps) - 1:
+            # Nothing to share the thread hop with
+            values = await self.get_values(steps[-1])
+            if values is None or self.errors:
+                return values or {}, None
+            return values, await self.run_sync(steps[-1].call, **values)
+        body_values: Optional[Dict[str, Any]] = None
+        body_errors: List[ErrorWrapper] = []
+        if steps[-1].dependant.body_params:
+            body_values, body_errors = await request_body_to_args(
+                required_params=steps[-1].dependant.body_params,
+                received_body=self.body,
+            )
+        return await self.run_sync(
+            self.solve_sync_steps_and_call, steps[start:-1], body_values, body_errors
+        )
+
+    async def solve_steps(self, end: int) -> None:
+        steps = self.plan.steps
+        index = 0
+        while index < end:
+            run_end = min(self.plan.sync_run_ends[index], end)
+            if run_end > index:
+                await self.run_sync(self.solve_sync_steps, steps[index:run_end])
+                index = run_end
+                continue
+            step = steps[index]
+            values = await self.get_values(step)
+            self.add_solved(step, values, await self.call(step, values))
+            index += 1
+
+    async def run_sync(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        if self.executor is None:
+            return await run_in_threadpool(func, *args, **kwargs)
+        return await self.executor.run(func, *args, **kwargs)
+
+    def solve_sync_steps(self, steps: List[DependencyStep]) -> None:
+        for step in steps:
+            values = self.get_sync_values(step)
+            if values is None or (
+                step.use_cache and step.cache_key in self.dependency_cache
+            ):
+                self.add_solved(step, values, None)
+            else:
+                self.add_solved(step, values, self.call_sync(step, values))
+
+    def call_sync(self, step: DependencyStep, values: Dict[str, Any]) -> Any:
+        """
+        Call a step solved in a worker thread shared with other steps, in a
+        copy of the context of its own, as it would be in a thread hop of its
+        own, so that context variables set by one step aren't seen by the next.
+        """
+        call = cast(Callable, step.call)
+        if contextvars is None:  # pragma: no cover
+            return call(**values)
+        return contextvars.copy_context().run(call, **values)
+
+    def solve_sync_steps_and_call(
+        self,
+        steps: List[DependencyStep],
+        body_values: Optional[Dict[str, Any]],
+        body_errors: List[ErrorWrapper],
+    ) -> Tuple[Dict[str, Any], Any]:
+        self.solve_sync_steps(steps)
+        endpoint = self.plan.steps[-1]
+        values = self.get_sync_values(endpoint)
+        # The same as get_values(), with the body already validated
+        if body_errors:
+            self.errors.extend(body_errors)
+            values = None
+        elif values is not None and body_values:
+            values.update(body_values)
+        if values is None or self.errors:
+            return values or {}, None
+        return values, self.call_sync(endpoint, values)
+
+    async def call(
+        self, step: DependencyStep, values: Optional[Dict[str, Any]]
+    ) -> Any:
+        if values is None or (
+            step.use_cache and step.cache_key in self.dependency_cache
+        ):
+            return None
+        call = cast(Callable, step.call)
+        if step.is_generator:
+            stack = self.request.scope.get("fastapi_astack")
+            if stack is None:
+                raise RuntimeError(
+                    async_contextmanager_dependencies_error
+                )  # pragma: no cover
+            return await solve_generator(call=call, stack=stack, sub_values=values)
+        elif step.is_coroutine:
+            return await call(**values)
+        else:
+            return await self.run_sync(call, **values)
+
+    def add_solved(
+        self, step: DependencyStep, values: Optional[Dict[str, Any]], solved: Any
+    ) -> None:
+        if values is None:
+            self.solved.append((step.name, _unsolved))
+            return
+        if step.use_cache and step.cache_key in self.dependency_cache:
+            solved = self.dependency_cache[step.cache_key]
+        elif step.cache_key not in self.dependency_cache:
+            self.dependency_cache[step.cache_key] = solved
+        self.solved.append((step.name, solved))
+
+    async def get_values(self, step: DependencyStep) -> Optional[Dict[str, Any]]:
+        values = self.get_sync_values(step)
+        if step.dependant.body_params:
+            (
+                body_values,
+                body_errors,
+            ) = await request_body_to_args(  # body_params checked above
+                required_params=step.dependant.body_params, received_body=self.body
+            )
+            if body_errors:
+                self.errors.extend(body_errors)
+                values = None
+            elif values is not None:
+                values.update(body_values)
+        return values
+
+    def get_sync_values(self, step: DependencyStep) -> Optional[Dict[str, Any]]:
+        """
+        Collect the arguments for `step.call`, or return `None` if it can't be
+        called because of errors.
+        """
+        values: Dict[str, Any] = {}
+        has_errors = False
+        if step.num_dependencies:
+            sub_solved = self.solved[-step.num_dependencies :]
+            del self.solved[-step.num_dependencies :]
+            for name, solved in sub_solved:
+                if solved is _unsolved:
+                    has_errors = True
+                elif name is not None:
+                    values[name] = solved
+        request = self.request
+        for in_, extract in step.param_extractors:
+            if in_ == params.ParamTypes.path:
+                received_params: Any = request.path_params
+            elif in_ == params.ParamTypes.query:
+                received_params = request.query_params
+            elif in_ == params.ParamTypes.header:
+                received_params = request.headers
+            else:
+                received_params = request.cookies
+            param_values, param_errors = extract(received_params)
+            values.update(param_values)
+            if param_errors:
+                self.errors.extend(param_errors)
+                has_errors = True
+        dependant = step.dependant
+        if dependant.request_param_name and isinstance(request, Request):
+            values[dependant.request_param_name] = request
+        elif dependant.websocket_param_name and isinstance(request, WebSocket):
+            values[dependant.websocket_param_name] = request
+        if dependant.background_tasks_param_name:
+            if self.background_tasks is None:
+                self.background_tasks = BackgroundTasks()
+            values[dependant.background_tasks_param_name] = self.background_tasks
+        if dependant.response_param_name:
+            values[dependant.response_param_name] = self.response
+        if dependant.security_scopes_param_name:
+            values[dependant.security_scopes_param_name] = SecurityScopes(
+                scopes=dependant.security_scopes
+            )
+        if has_errors:
+            return None
+        return values
+
+
 async def solve_dependencies(
     *,
     request: Union[Request, WebSocket],
@@ -439,6 +838,7 @@ async def solve_dependencies(
     response: Response = None,
     dependency_overrides_provider: Any = None,
     dependency_cache: Dict[Tuple[Callable, Tuple[str]], Any] = None,
+    executor: SyncExecutor = None,
 ) -> Tuple[
     Dict[str, Any],
     List[ErrorWrapper],
@@ -446,8 +846,6 @@ async def solve_dependencies(
     Response,
     Dict[Tuple[Callable, Tuple[str]], Any],
 ]:
-    values: Dict[str, Any] = {}
-    errors: List[ErrorWrapper] = []
     response = response or Response(
         content=None,
         status_code=None,  # type: ignore
@@ -455,115 +853,59 @@ async def solve_dependencies(
         media_type=None,
         background=None,
     )
-    dependency_cache = dependency_cache or {}
-    sub_dependant: Dependant
-    for sub_dependant in dependant.dependencies:
-        sub_dependant.call = cast(Callable, sub_dependant.call)
-        sub_dependant.cache_key = cast(
-            Tuple[Callable, Tuple[str]], sub_dependant.cache_key
-        )
-        call = sub_dependant.call
-        use_sub_dependant = sub_dependant
-        if (
-            dependency_overrides_provider
-            and dependency_overrides_provider.dependency_overrides
-        ):
-            original_call = sub_dependant.call
-            call = getattr(
-                dependency_overrides_provider, "dependency_overrides", {}
-            ).get(original_call, original_call)
-            use_path: str = sub_dependant.path  # type: ignore
-            use_sub_dependant = get_dependant(
-                path=use_path,
-                call=call,
-                name=sub_dependant.name,
-                security_scopes=sub_dependant.security_scopes,
-            )
-
-        solved_result = await solve_dependencies(
-            request=request,
-            dependant=use_sub_dependant,
-            body=body,
-            background_tasks=background_tasks,
-            response=response,
-            dependency_overrides_provider=dependency_overrides_provider,
-            dependency_cache=dependency_cache,
-        )
-        (
-            sub_values,
-            sub_errors,
-            background_tasks,
-            sub_response,
-            sub_dependency_cache,
-        ) = solved_result
-        sub_response = cast(Response, sub_response)
-        response.headers.raw.extend(sub_response.headers.raw)
-        if sub_response.status_code:
-            response.status_code = sub_response.status_code
-        dependency_cache.update(sub_dependency_cache)
-        if sub_errors:
-            errors.extend(sub_errors)
-            continue
-        if sub_dependant.use_cache and sub_dependant.cache_key in dependency_cache:
-            solved = dependency_cache[sub_dependant.cache_key]
-        elif inspect.isgeneratorfunction(call) or inspect.isasyncgenfunction(call):
-            stack = request.scope.get("fastapi_astack")
-            if stack is None:
-                raise RuntimeError(
-                    async_contextmanager_dependencies_error
-                )  # pragma: no cover
-            solved = await solve_generator(
-                call=call, stack=stack, sub_values=sub_values
-            )
-        elif is_coroutine_callable(call):
-            solved = await call(**sub_values)
-        else:
-            solved = await run_in_threadpool(call, **sub_values)
-        if sub_dependant.name is not None:
-            values[sub_dependant.name] = solved
-        if sub_dependant.cache_key not in dependency_cache:
-            dependency_cache[sub_dependant.cache_key] = solved
-    path_values, path_errors = request_params_to_args(
-        dependant.path_params, request.path_params
+    solver = DependencySolver(
+        plan=get_dependency_plan(dependant, dependency_overrides_provider),
+        request=request,
+        body=body,
+        background_tasks=background_tasks,
+        response=response,
+        dependency_cache=dependency_cache or {},
+        executor=executor,
     )
-    query_values, query_errors = request_params_to_args(
-        dependant.query_params, request.query_params
+    values = await solver.solve()
+    return (
+        values,
+        solver.errors,
+        solver.background_tasks,
+        response,
+        solver.dependency_cache,  # type: ignore
     )
-    header_values, header_errors = request_params_to_args(
-        dependant.header_params, request.headers
+
+
+async def solve_dependencies_and_call(
+    *,
+    request: Request,
+    dependant: Dependant,
+    body: Optional[Union[Dict[str, Any], FormData]] = None,
+    dependency_overrides_provider: Any = None,
+    executor: SyncExecutor = None,
+) -> Tuple[
+    Dict[str, Any], List[ErrorWrapper], Optional[BackgroundTasks], Response, Any
+]:
+    """
+    Like `solve_dependencies()`, and then call `dependant.call`, a sync function,
+    in the same worker thread as the sync dependencies solved right before it.
+    The last item of the result is the return value of `dependant.call`, or
+    `None` if it wasn't called because of errors.
+    """
+    response = Response(
+        content=None,
+        status_code=None,  # type: ignore
+        headers=None,
+        media_type=None,
+        background=None,
     )
-    cookie_values, cookie_errors = request_params_to_args(
-        dependant.cookie_params, request.cookies
+    solver = DependencySolver(
+        plan=get_dependency_plan(dependant, dependency_overrides_provider),
+        request=request,
+        body=body,
+        background_tasks=None,
+        response=response,
+        dependency_cache={},
+        executor=executor,
     )
-    values.update(path_values)
-    values.update(query_values)
-    values.update(header_values)
-    values.update(cookie_values)
-    errors += path_errors + query_errors + header_errors + cookie_errors
-    if dependant.body_params:
-        (
-            body_values,
-            body_errors,
-        ) = await request_body_to_args(  # body_params checked above
-            required_params=dependant.body_params, received_body=body
-        )
-        values.update(body_values)
-        errors.extend(body_errors)
-    if dependant.request_param_name and isinstance(request, Request):
-        values[dependant.request_param_name] = request
-    elif dependant.websocket_param_name and isinstance(request, WebSocket):
-        values[dependant.websocket_param_name] = request
-    if dependant.background_tasks_param_name:
-        if background_tasks is None:
-            background_tasks = BackgroundTasks()
-        values[dependant.background_tasks_param_name] = background_tasks
-    if dependant.response_param_name:
-        values[dependant.response_param_name] = response
-    if dependant.security_scopes_param_name:
-        values[dependant.security_scopes_param_name] = SecurityScopes(
-            scopes=dependant.security_scopes
-        )
-    return values, errors, background_tasks, response, dependency_cache
+    values, result = await solver.solve_and_call()
+    return values, solver.errors, solver.background_tasks, response, result
 
 
 def request_params_to_args(
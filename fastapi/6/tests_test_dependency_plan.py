@@ -0,0 +1,172 @@
+from contextvars import ContextVar
+
+import pytest
+from fastapi import Depends, FastAPI, Header
+from fastapi.dependencies import utils
+from fastapi.testclient import TestClient
+
+calls = []
+current_user = ContextVar("current_user", default=None)
+
+
+def counter(n: int = 0):
+    calls.append("counter")
+    return n
+
+
+def sync_a(c: int = Depends(counter, use_cache=False), a: int = 1):
+    calls.append("sync_a")
+    return c + a
+
+
+async def async_b(a: int = Depends(sync_a), c: int = Depends(counter)):
+    calls.append("async_b")
+    return a + c
+
+
+def sync_c(
+    b: int = Depends(async_b),
+    c: int = Depends(counter, use_cache=False),
+    x_token: str = Header(...),
+):
+    calls.append("sync_c")
+    return f"{b}-{c}-{x_token}"
+
+
+def set_user(user: str = "alice"):
+    calls.append("set_user")
+    current_user.set(user)
+    return user
+
+
+def get_user():
+    calls.append("get_user")
+    return current_user.get()
+
+
+def override_counter(n: int = 10):
+    calls.append("override_counter")
+    return n
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/chain")
+    def read_chain(c: str = Depends(sync_c), d: int = Depends(counter)):
+        calls.append("endpoint")
+        return {"c": c, "d": d}
+
+    @app.get("/user")
+    def read_user(u: str = Depends(set_user), current: str = Depends(get_user)):
+        return {"set": u, "seen": current, "endpoint": current_user.get()}
+
+    return app
+
+
+request_cases = [
+    ("/chain", {"x-token": "t"}),
+    ("/chain?n=2&a=3", {"x-token": "t"}),
+    ("/chain?n=x&a=y", {"x-token": "t"}),
+    ("/chain?n=x", {}),
+    ("/chain?a=y", {}),
+    ("/user", {}),
+    ("/user?user=bob", {}),
+]
+
+
+def get_responses(client):
+    results = []
+    for url, headers in request_cases:
+        calls.clear()
+        response = client.get(url, headers=headers)
+        results.append((url, response.status_code, response.json(), list(calls)))
+    return results
+
+
+def solve_in_one_hop_per_step(monkeypatch):
+    """Make every sync step run in a threadpool hop of its own."""
+    init = utils.DependencyStep.__init__
+
+    def __init__(self, **kwargs):
+        init(self, **kwargs)
+        self.is_sync = False
+
+    monkeypatch.setattr(utils.DependencyStep, "__init__", __init__)
+    utils.dependency_plans.clear()
+
+
+@pytest.fixture(params=[True, False], ids=["batched", "one-hop-per-step"])
+def batched(request, monkeypatch):
+    if not request.param:
+        solve_in_one_hop_per_step(monkeypatch)
+    yield request.param
+    utils.dependency_plans.clear()
+
+
+@pytest.fixture
+def unbatched_responses(monkeypatch):
+    with monkeypatch.context() as m:
+        solve_in_one_hop_per_step(m)
+        app = make_app()
+        client = TestClient(app)
+        responses = get_responses(client)
+        app.dependency_overrides[counter] = override_counter
+        overridden = get_responses(client)
+    utils.dependency_plans.clear()
+    return responses, overridden
+
+
+def test_same_as_one_hop_per_step(unbatched_responses):
+    app = make_app()
+    client = TestClient(app)
+    responses, overridden = unbatched_responses
+    assert get_responses(client) == responses
+    app.dependency_overrides[counter] = override_counter
+    assert get_responses(client) == overridden
+    app.dependency_overrides.clear()
+    assert get_responses(client) == responses
+
+
+def test_use_cache_false(batched):
+    client = TestClient(make_app())
+    calls.clear()
+    response = client.get("/chain?n=2&a=3", headers={"x-token": "t"})
+    assert response.json() == {"c": "7-2-t", "d": 2}
+    assert calls == ["counter", "sync_a", "async_b", "counter", "sync_c", "endpoint"]
+
+
+def test_overrides_added_then_cleared(batched):
+    app = make_app()
+    client = TestClient(app)
+    headers = {"x-token": "t"}
+    assert client.get("/chain", headers=headers).json() == {"c": "1-0-t", "d": 0}
+    app.dependency_overrides[counter] = override_counter
+    assert client.get("/chain", headers=headers).json() == {
+        "c": "21-10-t",
+        "d": 10,
+    }
+    app.dependency_overrides.clear()
+    assert client.get("/chain", headers=headers).json() == {"c": "1-0-t", "d": 0}
+
+
+def test_error_order(batched):
+    client = TestClient(make_app())
+    calls.clear()
+    response = client.get("/chain?n=x&a=y")
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [
+        ["query", "n"],
+        ["query", "a"],
+        ["query", "n"],
+        ["query", "n"],
+        ["header", "x-token"],
+        ["query", "n"],
+    ]
+    assert calls == []
+
+
+def test_context_not_shared_between_steps(batched):
+    client = TestClient(make_app())
+    response = client.get("/user?user=bob")
+    assert response.json() == {"set": "bob", "seen": None, "endpoint": None}
@@ -7,12 +7,15 @@ from __future__ import division
 import os
 import re
 import sys
+import json
 import errno
 import mimetypes
 import threading
 from time import sleep, time
 from mailbox import Message
 
+import requests
+
 from httpie.output.streams import RawStream
 from httpie.models import HTTPResponse
 from httpie.utils import humanize_bytes
@@ -21,6 +24,11 @@ from httpie.compat import urlsplit
 
 PARTIAL_CONTENT = 206
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 64
+SEGMENT_CHUNK_SIZE = 1024 * 64
+SEGMENT_STATE_SUFFIX = '.segments'
+SEGMENT_STATE_SAVE_INTERVAL = 1
+
 
 CLEAR_LINE = '\r\033[K'
 PROGRESS = (
@@ -176,10 +184,230 @@ def get_unique_filename(filename, exists=os.path.exists):
         attempt += 1
 
 
+def split_into_segments(total_size, count):
+    """
+    Split `total_size` bytes into `count` contiguous byte ranges.
+
+    :return: a list of ``[first_byte_pos, last_byte_pos, downloaded]``
+
+    """
+    size, extra = divmod(total_size, count)
+    segments = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        segments.append([start, end - 1, 0])
+        start = end
+    return segments
+
+
+def get_validator(response):
+    """
+    Return a value for ``If-Range`` so that segments fetched later
+    are guaranteed to come from the same version of the resource.
+
+    """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+class SegmentState(object):
+    """
+    Progress of a segmented download, kept in a sidecar file next to the
+    output file so that an interrupted download resumes per segment.
+
+    """
+
+    def __init__(self, path, url, total_size, validator, segments):
+        self.path = path
+        self.url = url
+        self.total_size = total_size
+        self.validator = validator
+        self.segments = segments
+        self._saved_at = 0
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(path=path, **data)
+        except (IOError, OSError, ValueError, TypeError):
+            return None
+
+    @property
+    def downloaded(self):
+        return sum(segment[2] for segment in self.segments)
+
+    def matches(self, total_size, validator):
+        return (self.total_size == total_size
+                and self.validator == validator
+                and sum(last - first + 1
+                        for first, last, _ in self.segments) == total_size)
+
+    def save(self):
+        data = {
+            'url': self.url,
+            'total_size': self.total_size,
+            'validator': self.validator,
+            'segments': self.segments,
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        try:
+            os.rename(tmp_path, self.path)
+        except OSError:
+            # Windows doesn't replace existing files on rename.
+            os.remove(self.path)
+            os.rename(tmp_path, self.path)
+        self._saved_at = time()
+
+    def save_if_due(self):
+        if time() - self._saved_at >= SEGMENT_STATE_SAVE_INTERVAL:
+            self.save()
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class SegmentedDownload(object):
+    """
+    Fetches the unfinished segments of a `SegmentState` concurrently,
+    one ``Range`` request per segment, writing each at its own offset in
+    the preallocated output file.
+
+    It is iterated in place of the response body stream and yields
+    nothing, since the data is written by the segment threads.
+
+    """
+
+    def __init__(self, response, filename, state, on_downloaded,
+                 session=None, send_kwargs=None):
+        """
+        :param response: The initial response. It is used for the first
+                         segment when that one starts at byte 0, and closed
+                         otherwise.
+        :param on_downloaded: Called with each chunk of data written.
+        :param session: The `requests.Session` to send the segment requests
+                        through. A new one is used (and closed) if not given.
+        :param send_kwargs: Keyword arguments for ``session.send()``, such as
+                            ``verify``, ``cert``, ``proxies`` and ``timeout``.
+
+        """
+        self._response = response
+        self._filename = filename
+        self._state = state
+        self._on_downloaded = on_downloaded
+        self._session = session
+        self._send_kwargs = dict(send_kwargs or {}, stream=True)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._errors = []
+
+    def __iter__(self):
+        self.run()
+        return iter(())
+
+    def run(self):
+        if self._session is not None:
+            self._run()
+            return
+        self._session = requests.Session()
+        try:
+            self._run()
+        finally:
+            self._session.close()
+            self._session = None
+
+    def _run(self):
+        threads = []
+        response_used = False
+        for segment in self._state.segments:
+            first, last, downloaded = segment
+            if first + downloaded > last:
+                continue
+            response = None
+            if (first == 0 and downloaded == 0
+                    and self._response.status_code == 200):
+                response = self._response
+                response_used = True
+            thread = threading.Thread(target=self._fetch_segment,
+                                      args=(segment, response))
+            thread.daemon = True
+            threads.append(thread)
+        if not response_used:
+            self._response.close()
+
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(.1)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            with self._lock:
+                self._state.save()
+
+        if self._errors:
+            raise self._errors[0]
+        if self._state.downloaded == self._state.total_size:
+            self._state.remove()
+
+    def _fetch_segment(self, segment, response):
+        try:
+            if response is None:
+                response = self._request_segment(segment)
+            try:
+                with open(self._filename, 'r+b', 0) as f:
+                    first, last, downloaded = segment
+                    f.seek(first + downloaded)
+                    remaining = last - first + 1 - downloaded
+                    for chunk in response.iter_content(SEGMENT_CHUNK_SIZE):
+                        if self._stop.is_set():
+                            break
+                        chunk = chunk[:remaining]
+                        f.write(chunk)
+                        remaining -= len(chunk)
+                        with self._lock:
+                            segment[2] += len(chunk)
+                            self._on_downloaded(chunk)
+                            self._state.save_if_due()
+                        if not remaining:
+                            break
+            finally:
+                response.close()
+        except Exception as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _request_segment(self, segment):
+        first, last, downloaded = segment
+        request = self._response.request.copy()
+        request.headers['Range'] = 'bytes=%d-%d' % (first + downloaded, last)
+        if self._state.validator:
+            request.headers['If-Range'] = self._state.validator
+        response = self._session.send(request, **self._send_kwargs)
+        if response.status_code != PARTIAL_CONTENT:
+            response.close()
+            raise ContentRangeError(
+                'Unexpected status %d for the requested Range (%r)'
+                % (response.status_code, request.headers['Range']))
+        return response
+
+
 class Downloader(object):
 
     def __init__(self, output_file=None,
-                 resume=False, progress_file=sys.stderr):
+                 resume=False, progress_file=sys.stderr, segments=1):
         """
         :param resume: Should the download resume if partial download
                        already exists.
@@ -190,10 +418,15 @@ class Downloader(object):
 
         :param progress_file: Where to report download progress.
 
+        :param segments: The number of byte ranges to fetch concurrently
+                         when the server supports ``Range`` requests.
+        :type segments: int
+
         """
         self._output_file = output_file
         self._resume = resume
         self._resumed_from = 0
+        self._segments = segments
         self.finished = False
 
         self.status = Status()
@@ -212,6 +445,11 @@ class Downloader(object):
         """
         # Ask the server not to encode the content so that we can resume, etc.
         request_headers['Accept-Encoding'] = 'identity'
+        if self._resume and self._load_segment_state() is not None:
+            # The file is preallocated and its segments are resumed
+            # individually once the response headers are known, or it is
+            # downloaded again if they can't be.
+            return
         if self._resume:
             bytes_have = os.path.getsize(self._output_file.name)
             if bytes_have:
@@ -220,7 +458,7 @@ class Downloader(object):
                 request_headers['Range'] = 'bytes=%d-' % bytes_have
                 self._resumed_from = bytes_have
 
-    def start(self, response):
+    def start(self, response, session=None, send_kwargs=None):
         """
         Initiate and return a stream for `response` body  with progress
         callback attached. Can be called only once.
@@ -228,6 +466,15 @@ class Downloader(object):
         :param response: Initiated response object with headers already fetched
         :type response: requests.models.Response
 
+        :param session: The session `response` was sent with. Segmented
+                        downloads send their ``Range`` requests through it.
+        :type session: requests.Session
+
+        :param send_kwargs: The ``send()`` keyword arguments `response`
+                            was sent with (``verify``, ``cert``,
+                            ``proxies``, ``timeout``).
+        :type send_kwargs: dict
+
         :return: RawStream, output_file
 
         """
@@ -240,6 +487,7 @@ class Downloader(object):
         except (KeyError, ValueError, TypeError):
             total_size = None
 
+        segment_state = None
         if self._output_file:
             if self._resume and response.status_code == PARTIAL_CONTENT:
                 total_size = parse_content_range(
@@ -249,11 +497,18 @@ class Downloader(object):
 
             else:
                 self._resumed_from = 0
-                try:
-                    self._output_file.seek(0)
-                    self._output_file.truncate()
-                except IOError:
-                    pass  # stdout
+                if self._resume and self._can_segment(response, total_size):
+                    segment_state = self._load_segment_state()
+                    if (segment_state is not None
+                            and not segment_state.matches(
+                                total_size, get_validator(response))):
+                        segment_state = None
+                if segment_state is None:
+                    try:
+                        self._output_file.seek(0)
+                        self._output_file.truncate()
+                    except IOError:
+                        pass  # stdout
         else:
             # TODO: Should the filename be taken from response.history[0].url?
             # Output file not specified. Pick a name that doesn't exist yet.
@@ -268,19 +523,43 @@ class Downloader(object):
                 )
             self._output_file = open(get_unique_filename(filename), mode='a+b')
 
+        if segment_state is None and self._can_segment(response, total_size):
+            segment_state = SegmentState(
+                path=self._output_file.name + SEGMENT_STATE_SUFFIX,
+                url=response.url,
+                total_size=total_size,
+                validator=get_validator(response),
+                segments=split_into_segments(total_size, self._segments),
+            )
+            self._output_file.truncate(total_size)
+            segment_state.save()
+
+        if segment_state is not None:
+            self._resumed_from = segment_state.downloaded
+            stream = SegmentedDownload(
+                response=response,
+                filename=self._output_file.name,
+                state=segment_state,
+                on_downloaded=self.chunk_downloaded,
+                session=session,
+                send_kwargs=send_kwargs,
+            )
+        else:
+            # Left by an earlier download that can't be resumed per segment.
+            self._remove_segment_state()
+            stream = RawStream(
+                msg=HTTPResponse(response),
+                with_headers=False,
+                with_body=True,
+                on_body_chunk_downloaded=self.chunk_downloaded,
+                chunk_size=DOWNLOAD_CHUNK_SIZE
+            )
+
         self.status.started(
             resumed_from=self._resumed_from,
             total_size=total_size
         )
 
-        stream = RawStream(
-            msg=HTTPResponse(response),
-            with_headers=False,
-            with_body=True,
-            on_body_chunk_downloaded=self.chunk_downloaded,
-            chunk_size=1024 * 8
-        )
-
         self._progress_reporter.output.write(
             'Downloading %sto "%s"\n' % (
                 (humanize_bytes(total_size) + ' '
@@ -301,6 +580,30 @@ class Downloader(object):
     def failed(self):
         self._progress_reporter.stop()
 
+    def _can_segment(self, response, total_size):
+        return (
+            self._segments > 1
+            and response.status_code == 200
+            and 'bytes' in response.headers.get('Accept-Ranges', '')
+            and response.headers.get('Content-Encoding', 'identity') == 'identity'
+            and total_size is not None
+            and total_size >= self._segments
+            and os.path.isfile(getattr(self._output_file, 'name', ''))
+        )
+
+    def _load_segment_state(self):
+        # Also loaded with a single segment: the preallocated file of a
+        # segmented download can't be resumed from its size.
+        if not self._output_file:
+            return None
+        return SegmentState.load(self._output_file.name + SEGMENT_STATE_SUFFIX)
+
+    def _remove_segment_state(self):
+        try:
+            os.remove(self._output_file.name + SEGMENT_STATE_SUFFIX)
+        except (AttributeError, OSError):
+            pass
+
     @property
     def interrupted(self):
         return (
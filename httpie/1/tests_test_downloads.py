@@ -0,0 +1,173 @@
+import os
+import json
+import threading
+from io import StringIO
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import pytest
+import requests
+
+from httpie.downloads import (
+    Downloader, SEGMENT_STATE_SUFFIX, split_into_segments,
+)
+
+
+DATA = os.urandom(256 * 1024 + 7)
+ETAG = '"v1"'
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves `DATA`, honouring ``Range`` unless `accept_ranges` is off."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.headers.get('Range'),
+                                self.headers.get('If-Range')))
+        byte_range = self.headers.get('Range')
+        if byte_range and server.accept_ranges:
+            first, last = byte_range[len('bytes='):].split('-')
+            first = int(first)
+            last = int(last) if last else len(DATA) - 1
+            body = DATA[first:last + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d'
+                             % (first, last, len(DATA)))
+        else:
+            body = DATA
+            self.send_response(200)
+        if server.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    server.requests = []
+    server.accept_ranges = True
+    server.url = 'http://127.0.0.1:%d/file.bin' % server.server_port
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def output_path(tmpdir):
+    return str(tmpdir.join('file.bin'))
+
+
+def download(url, output_path, resume=False, segments=4):
+    with open(output_path, 'a+b') as output_file:
+        downloader = Downloader(output_file=output_file, resume=resume,
+                                progress_file=StringIO(), segments=segments)
+        headers = {}
+        downloader.pre_request(headers)
+        with requests.Session() as session:
+            response = session.get(url, headers=headers, stream=True)
+            stream, output_file = downloader.start(response, session=session)
+            for chunk in stream:
+                output_file.write(chunk)
+            output_file.flush()
+        downloader.finish()
+        downloader.failed()  # Stops the progress reporter.
+    return downloader
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class TestSegmentedDownloads:
+
+    def test_segments_requested_with_if_range(self, server, output_path):
+        downloader = download(server.url, output_path)
+        assert read(output_path) == DATA
+        assert not downloader.interrupted
+        assert not os.path.exists(output_path + SEGMENT_STATE_SUFFIX)
+        # The first segment is read from the initial response.
+        assert server.requests[0] == (None, None)
+        segments = split_into_segments(len(DATA), 4)
+        assert sorted(server.requests[1:]) == sorted(
+            ('bytes=%d-%d' % (first, last), ETAG)
+            for first, last, _ in segments[1:])
+
+    def test_single_segment_sends_no_range(self, server, output_path):
+        download(server.url, output_path, segments=1)
+        assert read(output_path) == DATA
+        assert server.requests == [(None, None)]
+        assert not os.path.exists(output_path + SEGMENT_STATE_SUFFIX)
+
+    def test_resumed_per_segment(self, server, output_path):
+        segments = split_into_segments(len(DATA), 4)
+        done = [1000, segments[1][1] - segments[1][0] + 1, 0, 50]
+        partial = bytearray(len(DATA))
+        for (first, last, _), downloaded in zip(segments, done):
+            partial[first:first + downloaded] = DATA[first:first + downloaded]
+        with open(output_path, 'wb') as f:
+            f.write(bytes(partial))
+        for segment, downloaded in zip(segments, done):
+            segment[2] = downloaded
+        with open(output_path + SEGMENT_STATE_SUFFIX, 'w') as f:
+            json.dump({'url': server.url, 'total_size': len(DATA),
+                       'validator': ETAG, 'segments': segments}, f)
+
+        downloader = download(server.url, output_path, resume=True)
+        assert read(output_path) == DATA
+        assert downloader.status.resumed_from == sum(done)
+        assert not os.path.exists(output_path + SEGMENT_STATE_SUFFIX)
+        # The initial request isn't ranged, the finished segment isn't
+        # requested again.
+        assert server.requests[0] == (None, None)
+        assert sorted(server.requests[1:]) == sorted(
+            ('bytes=%d-%d' % (first + downloaded, last), ETAG)
+            for (first, last, _), downloaded in zip(segments, done)
+            if first + downloaded <= last)
+
+    def test_stale_segment_state_discarded(self, server, output_path):
+        with open(output_path, 'wb') as f:
+            f.write(b'x' * len(DATA))
+        with open(output_path + SEGMENT_STATE_SUFFIX, 'w') as f:
+            json.dump({'url': server.url, 'total_size': len(DATA),
+                       'validator': '"v0"',
+                       'segments': split_into_segments(len(DATA), 4)}, f)
+        downloader = download(server.url, output_path, resume=True)
+        assert read(output_path) == DATA
+        assert downloader.status.resumed_from == 0
+        assert not os.path.exists(output_path + SEGMENT_STATE_SUFFIX)
+
+    def test_fallback_without_accept_ranges(self, server, output_path):
+        server.accept_ranges = False
+        # Left by an interrupted segmented download.
+        with open(output_path, 'wb') as f:
+            f.write(b'x' * len(DATA))
+        with open(output_path + SEGMENT_STATE_SUFFIX, 'w') as f:
+            json.dump({'url': server.url, 'total_size': len(DATA),
+                       'validator': ETAG,
+                       'segments': split_into_segments(len(DATA), 4)}, f)
+        downloader = download(server.url, output_path, resume=True)
+        assert read(output_path) == DATA
+        assert not downloader.interrupted
+        assert server.requests == [(None, None)]
+        assert not os.path.exists(output_path + SEGMENT_STATE_SUFFIX)
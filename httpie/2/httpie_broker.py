@@ -0,0 +1,334 @@
+"""An opt-in helper process that keeps connections warm between runs.
+
+Start it with ``python -m httpie.broker``. While it's running, `http` sends
+its requests through it over a Unix socket in the config directory, so
+repeated invocations against the same hosts reuse keep-alive (and TLS)
+connections instead of opening new ones every time. When it isn't running,
+requests are sent directly as usual.
+
+The broker only forwards single requests. Redirects, cookies, sessions
+and authentication are still handled by the CLI.
+
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.packages.urllib3.response import HTTPResponse
+from requests.packages.urllib3._collections import HTTPHeaderDict
+
+from httpie.compat import str, bytes
+from httpie.config import DEFAULT_CONFIG_DIR
+
+try:
+    from http.client import HTTPResponse as HTTPLibResponse
+    from http.server import BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn, UnixStreamServer
+except ImportError:
+    # Python 2
+    from httplib import HTTPResponse as HTTPLibResponse
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+
+
+BROKER_SOCKET_NAME = 'broker.sock'
+# Carries the `send()` arguments (verify, cert, ...) to the broker.
+OPTIONS_HEADER = 'X-HTTPie-Broker-Options'
+# Set by the broker when it couldn't get a response from the server.
+ERROR_HEADER = 'X-HTTPie-Broker-Error'
+DEFAULT_IDLE_TIMEOUT = 60 * 10
+CHUNK_SIZE = 1024 * 64
+
+
+def get_socket_path(config_dir):
+    return os.path.join(config_dir, BROKER_SOCKET_NAME)
+
+
+def get_adapter(config_dir):
+    """
+    Return a `BrokerAdapter` if a broker has been started for `config_dir`,
+    otherwise `None`.
+
+    """
+    socket_path = get_socket_path(config_dir)
+    if hasattr(socket, 'AF_UNIX') and os.path.exists(socket_path):
+        return BrokerAdapter(socket_path)
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return value.encode('utf8')
+    return value
+
+
+def _encode_error(e):
+    """
+    Encode `e` as the value of the `ERROR_HEADER`.
+
+    The message usually contains the URL, so it must not be able to end
+    the header or add others: with `ensure_ascii`, every character of
+    the message that isn't printable ASCII (CR and LF included) is
+    escaped as ``\\uXXXX``.
+
+    """
+    return json.dumps({'type': type(e).__name__, 'message': str(e)},
+                      ensure_ascii=True)
+
+
+class BrokerAdapter(HTTPAdapter):
+    """
+    Sends requests through the broker, or directly if it can't be reached.
+
+    """
+
+    def __init__(self, socket_path, **kwargs):
+        super(BrokerAdapter, self).__init__(**kwargs)
+        self.socket_path = socket_path
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        body = _to_bytes(request.body)
+        sock = None
+        if body is None or isinstance(body, bytes):
+            sock = self._connect()
+        if sock is None:
+            # Streamed uploads, or no broker listening.
+            return super(BrokerAdapter, self).send(
+                request, stream=stream, timeout=timeout, verify=verify,
+                cert=cert, proxies=proxies)
+
+        options = {
+            'timeout': timeout,
+            'verify': verify,
+            'cert': cert,
+            'proxies': proxies,
+        }
+        try:
+            if isinstance(timeout, tuple):
+                sock.settimeout(timeout[1])
+            else:
+                sock.settimeout(timeout)
+            sock.sendall(self._serialize(request, body, options))
+            httplib_response = HTTPLibResponse(sock, method=request.method)
+            httplib_response.begin()
+        finally:
+            # The response keeps its own reference to the connection.
+            sock.close()
+
+        error = httplib_response.getheader(ERROR_HEADER)
+        if error:
+            httplib_response.close()
+            error = json.loads(error)
+            exc_class = getattr(requests.exceptions, error['type'],
+                                requests.exceptions.ConnectionError)
+            raise exc_class(error['message'], request=request)
+
+        headers = HTTPHeaderDict()
+        for name, value in httplib_response.getheaders():
+            headers.add(name, value)
+        raw = HTTPResponse(
+            body=httplib_response,
+            headers=headers,
+            status=httplib_response.status,
+            version=httplib_response.version,
+            reason=httplib_response.reason,
+            preload_content=False,
+            decode_content=False,
+            original_response=httplib_response,
+            request_method=request.method,
+        )
+        response = self.build_response(request, raw)
+        if not stream:
+            response.content
+        return response
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except socket.error:
+            sock.close()
+            return None
+        return sock
+
+    def _serialize(self, request, body, options):
+        lines = [_to_bytes('%s %s HTTP/1.1' % (request.method, request.url))]
+        for name, value in request.headers.items():
+            if name.lower() != 'content-length':
+                lines.append(_to_bytes(name) + b': ' + _to_bytes(value))
+        if body is not None:
+            lines.append(_to_bytes('Content-Length: %d' % len(body)))
+        lines.append(_to_bytes('%s: %s' % (OPTIONS_HEADER,
+                                           json.dumps(options))))
+        return b'\r\n'.join(lines) + b'\r\n\r\n' + (body or b'')
+
+
+class BrokerRequestHandler(BaseHTTPRequestHandler):
+    """
+    Forwards one request (with an absolute URL, like a proxy would get)
+    using the broker's shared connection pools, and relays the response
+    with its original status line, headers and undecoded body.
+
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def __getattr__(self, name):
+        if name.startswith('do_'):
+            return self.forward
+        raise AttributeError(name)
+
+    def log_message(self, format, *args):
+        pass
+
+    def forward(self):
+        self.close_connection = True
+        self.server.request_started()
+        try:
+            self._forward()
+        finally:
+            self.server.request_finished()
+
+    def _forward(self):
+        options = json.loads(self.headers[OPTIONS_HEADER])
+        # JSON turns the (connect, read) and (cert, key) tuples into lists.
+        for name in ('timeout', 'cert'):
+            if isinstance(options[name], list):
+                options[name] = tuple(options[name])
+
+        body = None
+        if 'Content-Length' in self.headers:
+            body = self.rfile.read(int(self.headers['Content-Length']))
+
+        request = requests.PreparedRequest()
+        request.method = self.command
+        request.url = self.path
+        request.body = body
+        request.headers = CaseInsensitiveDict(
+            (name, value) for name, value in self.headers.items()
+            if name.lower() != OPTIONS_HEADER.lower()
+        )
+
+        try:
+            response = self.server.adapter.send(request, stream=True,
+                                                **options)
+        except requests.RequestException as e:
+            self.wfile.write(_to_bytes(
+                'HTTP/1.1 502 Bad Gateway\r\n%s: %s\r\n'
+                'Content-Length: 0\r\n\r\n' % (ERROR_HEADER,
+                                                 _encode_error(e))))
+            return
+
+        original = response.raw._original_response
+        try:
+            self._relay(original, response.raw)
+        finally:
+            response.close()
+
+    def _relay(self, original, raw):
+        version = {9: '0.9', 10: '1.0', 11: '1.1'}[original.version]
+        head = ['HTTP/%s %d %s' % (version, original.status, original.reason)]
+        try:
+            # `original.msg` is a `http.client.HTTPMessage` on Python 3
+            head.extend('%s: %s' % header for header in original.msg.items())
+        except AttributeError:
+            # and a `httplib.HTTPMessage` on Python 2.x
+            head.extend(h.strip() for h in original.msg.headers)
+        self.wfile.write(_to_bytes('\r\n'.join(head) + '\r\n\r\n'))
+
+        if self.command == 'HEAD':
+            return
+        chunked = original.chunked
+        for chunk in raw.stream(CHUNK_SIZE, decode_content=False):
+            if chunked:
+                chunk = _to_bytes('%x\r\n' % len(chunk)) + chunk + b'\r\n'
+            self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+
+
+class BrokerServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+    # How often the idle timeout is checked.
+    timeout = 1
+
+    def __init__(self, socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.adapter = HTTPAdapter()
+        self.idle_timeout = idle_timeout
+        self.last_active = time.time()
+        self._active = 0
+        self._lock = threading.Lock()
+        # Only the user may connect.
+        umask = os.umask(0o177)
+        try:
+            UnixStreamServer.__init__(self, socket_path, BrokerRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def request_started(self):
+        with self._lock:
+            self._active += 1
+
+    def request_finished(self):
+        with self._lock:
+            self._active -= 1
+            self.last_active = time.time()
+
+    @property
+    def is_idle(self):
+        with self._lock:
+            return (not self._active
+                    and time.time() - self.last_active >= self.idle_timeout)
+
+    def serve_until_idle(self):
+        try:
+            while not self.is_idle:
+                self.handle_request()
+        finally:
+            self.server_close()
+            self.adapter.close()
+            try:
+                os.remove(self.server_address)
+            except OSError:
+                pass
+
+
+def is_running(socket_path):
+    return BrokerAdapter(socket_path)._connect() is not None
+
+
+def main(args=sys.argv[1:]):
+    parser = argparse.ArgumentParser(
+        prog='python -m httpie.broker',
+        description='Keep connections warm for subsequent `http` runs.')
+    parser.add_argument('--config-dir', default=DEFAULT_CONFIG_DIR)
+    parser.add_argument(
+        '--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+        help='Exit after this many seconds without requests.')
+    args = parser.parse_args(args)
+
+    socket_path = get_socket_path(args.config_dir)
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            sys.stderr.write('http: broker already running at %s\n'
+                             % socket_path)
+            return 1
+        # Left behind by a broker that didn't exit cleanly.
+        os.remove(socket_path)
+
+    server = BrokerServer(socket_path, idle_timeout=args.idle_timeout)
+    try:
+        server.serve_until_idle()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,7 @@ from pprint import pformat
 import requests
 from requests.packages import urllib3
 
+from httpie import broker
 from httpie import sessions
 from httpie import __version__
 from httpie.compat import str
@@ -27,8 +28,12 @@ JSON = 'application/json'
 DEFAULT_UA = 'HTTPie/%s' % __version__
 
 
-def get_requests_session():
+def get_requests_session(config_dir=None):
     requests_session = requests.Session()
+    broker_adapter = config_dir and broker.get_adapter(config_dir)
+    if broker_adapter:
+        requests_session.mount('http://', broker_adapter)
+        requests_session.mount('https://', broker_adapter)
     for cls in plugin_manager.get_transport_plugins():
         transport_plugin = cls()
         requests_session.mount(prefix=transport_plugin.prefix,
@@ -36,10 +41,15 @@ def get_requests_session():
     return requests_session
 
 
-def get_response(args, config_dir):
-    """Send the request and return a `request.Response`."""
+def get_response(args, config_dir, requests_session=None):
+    """Send the request and return a `request.Response`.
 
-    requests_session = get_requests_session()
+    The request is sent with `requests_session` if given, so that
+    it can be reused for further requests (e.g., download segments).
+
+    """
+    if requests_session is None:
+        requests_session = get_requests_session(config_dir)
     requests_session.max_redirects = args.max_redirects
 
     if not args.session and not args.session_read_only:
@@ -120,29 +130,40 @@ def get_requests_kwargs(args, base_headers=None):
         auth_plugin = plugin_manager.get_auth_plugin(args.auth_type)()
         credentials = auth_plugin.get_auth(args.auth.key, args.auth.value)
 
-    cert = None
-    if args.cert:
-        cert = args.cert
-        if args.cert_key:
-            cert = cert, args.cert_key
-
     kwargs = {
         'stream': True,
         'method': args.method.lower(),
         'url': args.url,
         'headers': headers,
         'data': data,
+        'auth': credentials,
+        'files': args.files,
+        'allow_redirects': args.follow,
+        'params': args.params,
+    }
+    kwargs.update(get_send_kwargs(args))
+
+    return kwargs
+
+
+def get_send_kwargs(args):
+    """
+    Translate our `args` into the `requests.Session.send` keyword
+    arguments that apply to every request of a run.
+
+    """
+    cert = None
+    if args.cert:
+        cert = args.cert
+        if args.cert_key:
+            cert = cert, args.cert_key
+
+    return {
         'verify': {
             'yes': True,
             'no': False
         }.get(args.verify, args.verify),
         'cert': cert,
         'timeout': args.timeout,
-        'auth': credentials,
         'proxies': dict((p.key, p.value) for p in args.proxy),
-        'files': args.files,
-        'allow_redirects': args.follow,
-        'params': args.params,
     }
-
-    return kwargs
@@ -19,7 +19,7 @@ from pygments import __version__ as pygments_version
 
 from httpie import __version__ as httpie_version, ExitStatus
 from httpie.compat import str, bytes, is_py3
-from httpie.client import get_response
+from httpie.client import get_requests_session, get_response, get_send_kwargs
 from httpie.downloads import Download
 from httpie.context import Environment
 from httpie.plugins import plugin_manager
@@ -107,11 +107,14 @@ def main(args=sys.argv[1:], env=Environment(), error=None):
             download = Download(
                 output_file=args.output_file,
                 progress_file=env.stderr,
-                resume=args.download_resume
+                resume=args.download_resume,
+                segments=args.download_segments
             )
             download.pre_request(args.headers)
 
-        last_response = get_response(args, config_dir=env.config.directory)
+        requests_session = get_requests_session(env.config.directory)
+        last_response = get_response(args, config_dir=env.config.directory,
+                                     requests_session=requests_session)
 
         if args.show_redirects:
             responses = last_response.history + [last_response]
@@ -159,7 +162,12 @@ def main(args=sys.argv[1:], env=Environment(), error=None):
 
         if download and exit_status == ExitStatus.OK:
             # Last response body download.
-            download_stream, download_to = download.start(last_response)
+            # Segments are requested through the same session and settings.
+            download_stream, download_to = download.start(
+                last_response,
+                session=requests_session,
+                send_kwargs=get_send_kwargs(args)
+            )
             write(
                 stream=download_stream,
                 outfile=download_to,
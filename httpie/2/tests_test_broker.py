@@ -0,0 +1,169 @@
+import json
+import socket
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import pytest
+import requests
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from httpie import broker
+from httpie.client import get_requests_session
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'),
+                                reason='the broker needs Unix sockets')
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Responds with the client's port, to tell the connections apart."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if 'Content-Length' in self.headers:
+            self.server.bodies.append(
+                self.rfile.read(int(self.headers['Content-Length'])))
+        body = str(self.client_address[1]).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.requests = []
+    server.bodies = []
+    server.url = 'http://127.0.0.1:%d/' % server.server_port
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config_dir(tmpdir):
+    return str(tmpdir)
+
+
+@pytest.fixture
+def broker_server(config_dir):
+    server = broker.BrokerServer(broker.get_socket_path(config_dir))
+    thread = threading.Thread(target=server.serve_until_idle)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.idle_timeout = 0
+    thread.join(5)
+
+
+def get(config_dir, url, **kwargs):
+    """Send a request the way a separate `http` run would."""
+    session = get_requests_session(config_dir)
+    try:
+        return session.get(url, **kwargs)
+    finally:
+        session.close()
+
+
+class TestBroker:
+
+    def test_connection_reused_across_runs(self, server, broker_server,
+                                           config_dir):
+        ports = set(get(config_dir, server.url + str(i)).text
+                    for i in range(3))
+        assert server.requests == ['/0', '/1', '/2']
+        assert len(ports) == 1
+
+    def test_connection_not_reused_without_broker(self, server, config_dir):
+        ports = set(get(config_dir, server.url).text for _ in range(2))
+        assert len(ports) == 2
+
+    def test_request_body_forwarded(self, server, broker_server, config_dir):
+        session = get_requests_session(config_dir)
+        try:
+            response = session.post(server.url, data=b'body')
+        finally:
+            session.close()
+        assert response.status_code == 200
+        assert server.bodies == [b'body']
+
+    def test_stale_socket_falls_back(self, server, config_dir):
+        # Left behind by a broker that didn't exit cleanly.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(broker.get_socket_path(config_dir))
+        sock.close()
+        assert not broker.is_running(broker.get_socket_path(config_dir))
+        assert isinstance(broker.get_adapter(config_dir),
+                          broker.BrokerAdapter)
+        response = get(config_dir, server.url)
+        assert response.status_code == 200
+        assert server.requests == ['/']
+
+    def test_no_broker(self, config_dir):
+        assert broker.get_adapter(config_dir) is None
+
+    def test_error_relayed(self, broker_server, config_dir):
+        with pytest.raises(requests.ConnectionError):
+            # Nothing listens on the port once the socket is closed.
+            sock = socket.socket()
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+            sock.close()
+            get(config_dir, 'http://127.0.0.1:%d/' % port)
+
+    @pytest.mark.parametrize('message', [
+        'failed\r\nX-Injected: 1',
+        'failed\nX-Injected: 1',
+        'failed\x00\x1b\x7f\u00e9',
+    ])
+    def test_error_message_sanitized(self, broker_server, config_dir,
+                                     message):
+        error = requests.exceptions.SSLError(message)
+        with mock.patch.object(broker_server.adapter, 'send',
+                               side_effect=error):
+            sock = broker.BrokerAdapter(
+                broker.get_socket_path(config_dir))._connect()
+            request = requests.Request('GET', 'http://example.org/').prepare()
+            sock.sendall(broker.BrokerAdapter(None)._serialize(
+                request, None, {'timeout': None, 'verify': True,
+                                'cert': None, 'proxies': {}}))
+            head = b''
+            while not head.endswith(b'\r\n\r\n'):
+                head += sock.recv(1)
+            sock.close()
+
+            with pytest.raises(requests.exceptions.SSLError) as excinfo:
+                get(config_dir, 'http://example.org/')
+
+        lines = head.split(b'\r\n')[:-2]
+        assert len(lines) == 3
+        name, value = lines[1].split(b': ', 1)
+        assert name.decode('ascii') == broker.ERROR_HEADER
+        assert all(32 <= byte < 127 for byte in bytearray(value))
+        assert json.loads(value.decode('ascii'))['message'] == message
+        assert str(excinfo.value) == message
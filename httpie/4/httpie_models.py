@@ -1,6 +1,27 @@
 from httpie.compat import urlsplit, str
 
 
+def split_lines(chunks):
+    """
+    Split an iterator of `bytes` chunks into lines, the same way
+    :meth:`requests.models.Response.iter_lines` does.
+
+    """
+    pending = None
+    for chunk in chunks:
+        if pending is not None:
+            chunk = pending + chunk
+        lines = chunk.splitlines()
+        if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
+            pending = lines.pop()
+        else:
+            pending = None
+        for line in lines:
+            yield line
+    if pending is not None:
+        yield pending
+
+
 class HTTPMessage(object):
     """Abstract class for HTTP messages."""
 
@@ -39,14 +60,48 @@ class HTTPMessage(object):
         return ct
 
 
+# Upper bound for a single read when the body is read as it arrives.
+MAX_CHUNK_SIZE = 1024 * 256
+
+
 class HTTPResponse(HTTPMessage):
     """A :class:`requests.models.Response` wrapper."""
 
     def iter_body(self, chunk_size=1):
-        return self._orig.iter_content(chunk_size=chunk_size)
+        """
+        Yield the body as it arrives instead of `chunk_size` bytes at a
+        time, without costing one read per `chunk_size` bytes.
+
+        A chunked body is yielded a chunk at a time, split at
+        `MAX_CHUNK_SIZE`. Other bodies are read `chunk_size` bytes at
+        a time at first, and the size of the reads is doubled up to
+        `MAX_CHUNK_SIZE` with each one, since reads wait until they are
+        full. Such a body arriving slowly is then yielded with a delay.
+
+        """
+        transfer_encoding = self._orig.headers.get('Transfer-Encoding', '')
+        if ('chunked' in transfer_encoding.lower()
+                or getattr(self._orig.raw, 'closed', False)):
+            # Also when it has already been read, e.g., through `.content`.
+            return self._orig.iter_content(
+                chunk_size=max(chunk_size, MAX_CHUNK_SIZE))
+        return self._iter_growing(chunk_size)
 
     def iter_lines(self, chunk_size):
-        return ((line, b'\n') for line in self._orig.iter_lines(chunk_size))
+        return ((line, b'\n') for line in split_lines(self.iter_body(chunk_size)))
+
+    def _iter_growing(self, chunk_size):
+        size = chunk_size
+        while True:
+            # A new `iter_content()` for each read size, so that the
+            # content is still decoded and the response marked as
+            # consumed at the end.
+            try:
+                chunk = next(self._orig.iter_content(chunk_size=size))
+            except StopIteration:
+                break
+            yield chunk
+            size = max(size, min(size * 2, MAX_CHUNK_SIZE))
 
     #noinspection PyProtectedMember
     @property
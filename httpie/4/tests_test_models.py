@@ -0,0 +1,157 @@
+import gzip
+import os
+import threading
+from io import BytesIO
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+import pytest
+import requests
+
+from httpie.models import HTTPResponse, MAX_CHUNK_SIZE
+
+
+BODY = os.urandom(MAX_CHUNK_SIZE * 3 + 7)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_chunk(self, data):
+        self.wfile.write(('%x\r\n' % len(data)).encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_GET(self):
+        getattr(self, 'get_' + self.path.strip('/'))()
+
+    def get_body(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def get_gzip(self):
+        body = BytesIO()
+        with gzip.GzipFile(fileobj=body, mode='wb') as f:
+            f.write(BODY)
+        self.send_response(200)
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body.getvalue())))
+        self.end_headers()
+        self.wfile.write(body.getvalue())
+
+    def get_stream(self):
+        # The second chunk is only sent once the first one has been read.
+        self.send_response(200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.send_chunk(b'first\n')
+        self.server.first_read.wait(5)
+        self.send_chunk(b'second\n')
+        self.send_chunk(b'')
+
+    def get_truncated(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(BODY) + 100))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(BODY)
+        self.close_connection = True
+
+    def get_truncated_stream(self):
+        self.send_response(200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.send_chunk(b'first\n')
+        self.wfile.write(b'100\r\nsecond')
+        self.close_connection = True
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.first_read = threading.Event()
+    server.url = 'http://127.0.0.1:%d/' % server.server_port
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path):
+    return requests.get(server.url + path, stream=True)
+
+
+def read(chunks):
+    """Return the chunks read, and the type of the error that ended them."""
+    read_chunks = []
+    try:
+        for chunk in chunks:
+            read_chunks.append(chunk)
+    except Exception as e:
+        return read_chunks, type(e)
+    return read_chunks, None
+
+
+class TestIterBody:
+
+    def test_body(self, server):
+        response = get(server, 'body')
+        chunks = list(HTTPResponse(response).iter_body(1))
+        assert b''.join(chunks) == BODY
+        # The reads grow instead of being made a byte at a time.
+        assert len(chunks) < 30
+        assert max(map(len, chunks)) == MAX_CHUNK_SIZE
+
+    def test_content_decoded(self, server):
+        response = get(server, 'gzip')
+        assert b''.join(HTTPResponse(response).iter_body(1)) == BODY
+
+    def test_already_read(self, server):
+        response = get(server, 'body')
+        assert response.content == BODY
+        assert b''.join(HTTPResponse(response).iter_body(1)) == BODY
+
+    def test_streamed_body_yielded_as_it_arrives(self, server):
+        response = get(server, 'stream')
+        chunks = HTTPResponse(response).iter_body(1)
+        assert next(chunks) == b'first\n'
+        server.first_read.set()
+        assert list(chunks) == [b'second\n']
+
+    def test_streamed_lines(self, server):
+        response = get(server, 'stream')
+        lines = HTTPResponse(response).iter_lines(1)
+        assert next(lines) == (b'first', b'\n')
+        server.first_read.set()
+        assert list(lines) == [(b'second', b'\n')]
+
+    @pytest.mark.parametrize('path, sent', [
+        ('truncated', BODY),
+        ('truncated_stream', b'first\nsecond'),
+    ], ids=['content-length', 'chunked'])
+    def test_truncated_body_like_iter_content(self, server, path, sent):
+        chunks, error = read(HTTPResponse(get(server, path)).iter_body(1))
+        expected_chunks, expected_error = read(
+            get(server, path).iter_content(MAX_CHUNK_SIZE))
+        assert error is expected_error
+        # The data of the read that fails is lost, and the reads don't
+        # line up with those of `iter_content()`.
+        assert sent.startswith(b''.join(chunks))
+        assert b''.join(chunks)
@@ -45,6 +45,7 @@ import sys
 import time
 
 import pkg_resources
+import tornado.gen
 import tornado.httpserver
 import tornado.ioloop
 import tornado.netutil
@@ -95,6 +96,9 @@ class RPCHandler(tornado.web.RequestHandler):
     Handle remote scheduling calls using rpc.RemoteSchedulerResponder.
     """
 
+    # Large responses are sent in chunks of this size, letting other requests be served in between
+    response_chunk_size = 1024 * 1024
+
     def __init__(self, *args, **kwargs):
         super(RPCHandler, self).__init__(*args, **kwargs)
         self._cors_config = cors()
@@ -109,6 +113,7 @@ class RPCHandler(tornado.web.RequestHandler):
         self.set_status(204)
         self.finish()
 
+    @tornado.gen.coroutine
     def get(self, method):
         if method not in RPC_METHODS:
             self.send_error(404)
@@ -122,12 +127,28 @@ class RPCHandler(tornado.web.RequestHandler):
             if self._cors_config.enabled:
                 self._handle_cors()
 
-            self.write({"response": result})  # wrap all json response in a dictionary
+            yield self._write_response({"response": result})  # wrap all json response in a dictionary
         else:
             self.send_error(404)
 
     post = get
 
+    @tornado.gen.coroutine
+    def _write_response(self, response):
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        chunks, size = [], 0
+        for chunk in json.JSONEncoder().iterencode(response):
+            # like tornado.escape.json_encode, so "</script>" can't end an embedding script tag.
+            # Strings are encoded as single chunks, so "</" is never split between two of them
+            chunk = chunk.replace("</", "<\\/")
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.response_chunk_size:
+                self.write(''.join(chunks))
+                chunks, size = [], 0
+                yield self.flush()
+        self.write(''.join(chunks))
+
     def _handle_cors_preflight(self):
         origin = self.request.headers.get('Origin')
         if not origin:
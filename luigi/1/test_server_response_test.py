@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+
+import luigi.notifications
+import luigi.server
+from luigi.scheduler import Scheduler
+from luigi.six.moves.urllib.parse import urlencode
+
+from tornado.escape import json_encode
+from tornado.testing import AsyncHTTPTestCase
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+luigi.notifications.DEBUG = True
+WORKER = 'myworker'
+
+
+class RPCResponseTest(AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.sch = Scheduler()
+        return luigi.server.app(self.sch)
+
+    def rpc(self, method, **kwargs):
+        response = self.fetch('/api/' + method, method='POST',
+                              body=urlencode({'data': json.dumps(kwargs)}))
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.headers['Content-Type'], 'application/json; charset=UTF-8')
+        return response.body.decode('utf-8')
+
+    def add_tasks(self, n, family='Foo'):
+        for i in range(n):
+            self.sch.add_task(worker=WORKER, task_id='%s(i=%03d)' % (family, i), family=family,
+                              params={'i': str(i), 'html': '</script><b>'})
+
+    def test_same_as_json_encode(self):
+        self.add_tasks(10)
+        body = self.rpc('task_list', status='PENDING')
+        self.assertEqual(body, json_encode({'response': self.sch.task_list(status='PENDING')}))
+
+    def test_script_tag_escaped(self):
+        self.add_tasks(1)
+        body = self.rpc('task_list')
+        self.assertNotIn('</', body)
+        self.assertIn('<\\/script>', body)
+        self.assertEqual(json.loads(body)['response']['Foo(i=000)']['params']['html'], '</script><b>')
+
+    def test_chunked(self):
+        self.add_tasks(50)
+        expected = json_encode({'response': self.sch.task_list(status='PENDING')})
+        with mock.patch.object(luigi.server.RPCHandler, 'response_chunk_size', 100), \
+                mock.patch.object(luigi.server.RPCHandler, 'flush',
+                                  autospec=True, side_effect=luigi.server.RPCHandler.flush) as flush:
+            body = self.rpc('task_list', status='PENDING')
+        self.assertEqual(body, expected)
+        self.assertGreater(flush.call_count, 5)
+
+    def test_paginated_task_list(self):
+        self.add_tasks(25)
+        self.add_tasks(5, family='Bar')
+        seen = []
+        cursor = None
+        while True:
+            page = json.loads(self.rpc('task_list', family='Foo', page_size=10, cursor=cursor))['response']
+            self.assertLessEqual(len(page['tasks']), 10)
+            seen.extend(sorted(page['tasks']))
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, ['Foo(i=%03d)' % i for i in range(25)])
+
+    def test_dep_graph_max_depth(self):
+        for i in range(5):
+            self.sch.add_task(worker=WORKER, task_id='T%d' % i, family='T',
+                              deps=['T%d' % (i + 1)] if i < 4 else [])
+        graph = json.loads(self.rpc('dep_graph', task_id='T0', max_depth=2))['response']
+        self.assertEqual(sorted(graph), ['T0', 'T1', 'T2'])
+        graph = json.loads(self.rpc('inverse_dep_graph', task_id='T4', max_depth=1))['response']
+        self.assertEqual(sorted(graph), ['T3', 'T4'])
@@ -29,6 +29,7 @@ import collections
 import getpass
 import logging
 import multiprocessing  # Note: this seems to have some stability issues: https://github.com/spotify/luigi/pull/438
+from multiprocessing.pool import ThreadPool
 import os
 try:
     import Queue
@@ -48,7 +49,7 @@ from luigi import notifications
 from luigi.event import Event
 from luigi.task_register import load_task
 from luigi.scheduler import DISABLED, DONE, FAILED, PENDING, RUNNING, SUSPENDED, CentralPlannerScheduler
-from luigi.target import Target
+from luigi.target import Target, FileSystemTarget
 from luigi.task import Task, flatten, getpaths, TaskClassException, Config
 from luigi.parameter import FloatParameter, IntParameter, BoolParameter
 
@@ -288,6 +289,17 @@ class worker(Config):
                            config_path=dict(section='core', name='worker-timeout'))
     task_limit = IntParameter(default=None,
                               config_path=dict(section='core', name='worker-task-limit'))
+    check_complete_threads = IntParameter(default=0,
+                                          description='If set, check the completeness of tasks '
+                                          'in a pool of this many threads while adding them, '
+                                          'unless multiprocess scheduling is used')
+    cache_task_completion = BoolParameter(default=False,
+                                          description='Remember the tasks found complete, and '
+                                          'do not check them again in later calls to add()')
+    add_task_batch_size = IntParameter(default=1,
+                                       description='Number of add_task calls sent to the '
+                                       'scheduler in a single batch request while adding tasks. '
+                                       'The scheduler must support batch requests if more than 1')
 
 
 class KeepAliveThread(threading.Thread):
@@ -349,6 +361,8 @@ class Worker(object):
         self._suspended_tasks = {}
 
         self._first_task = None
+        self._add_task_calls = []
+        self._completion_cache = set()
 
         self.add_succeeded = True
         self.run_succeeded = True
@@ -444,26 +458,32 @@ class Worker(object):
         if multiprocess:
             queue = multiprocessing.Manager().Queue()
             pool = multiprocessing.Pool()
+        elif self._config.check_complete_threads > 0:
+            queue = Queue.Queue()
+            pool = ThreadPool(self._config.check_complete_threads)
         else:
             queue = DequeQueue()
             pool = SingleProcessPool()
         self._validate_task(task)
-        pool.apply_async(check_complete, [task, queue])
 
-        # we track queue size ourselves because len(queue) won't work for multiprocessing
-        queue_size = 1
         try:
             seen = set([task.task_id])
+            # we track queue size ourselves because len(queue) won't work for multiprocessing
+            queue_size = self._check_complete_async([task], pool, queue)
             while queue_size:
                 current = queue.get()
                 queue_size -= 1
                 item, is_complete = current
+                if is_complete is True and self._config.cache_task_completion:
+                    self._completion_cache.add(item.task_id)
+                new_tasks = []
                 for next in self._add(item, is_complete):
                     if next.task_id not in seen:
                         self._validate_task(next)
                         seen.add(next.task_id)
-                        pool.apply_async(check_complete, [next, queue])
-                        queue_size += 1
+                        new_tasks.append(next)
+                queue_size += self._check_complete_async(new_tasks, pool, queue)
+            self._flush_add_task_calls()
         except (KeyboardInterrupt, TaskException):
             raise
         except Exception as ex:
@@ -472,8 +492,102 @@ class Worker(object):
             self._log_unexpected_error(task)
             task.trigger_event(Event.BROKEN_TASK, task, ex)
             self._email_unexpected_error(task, formatted_traceback)
+            # the tasks scheduled before the error are still sent, like without batching
+            try:
+                self._flush_add_task_calls()
+            except Exception:
+                logger.exception('Failed sending the tasks scheduled before the error to the scheduler')
+        finally:
+            if isinstance(pool, ThreadPool):
+                pool.close()
+                pool.join()
         return self.add_succeeded
 
+    def _check_complete_async(self, tasks, pool, queue):
+        """
+        Check if tasks are complete using pool, results are put to queue.
+
+        Tasks found complete earlier (if ``cache_task_completion`` is set) or whose completeness
+        can be determined in bulk are not checked individually.
+
+        Returns the number of results that will be put to queue.
+        """
+        known = {}
+        if self._config.cache_task_completion:
+            known.update((t.task_id, True) for t in tasks if t.task_id in self._completion_cache)
+        known.update(self._bulk_complete([t for t in tasks if t.task_id not in known]))
+        for t in tasks:
+            if t.task_id in known:
+                queue.put((t, known[t.task_id]))
+            else:
+                pool.apply_async(check_complete, [t, queue])
+        return len(tasks)
+
+    def _bulk_complete(self, tasks):
+        """
+        Determine the completeness of tasks with few file system calls.
+
+        This applies to tasks using the default :py:meth:`~luigi.task.Task.complete` whose
+        outputs are all :py:class:`~luigi.target.FileSystemTarget` using the default
+        :py:meth:`~luigi.target.FileSystemTarget.exists`, with a ``fs`` file system
+        implementing the optional ``bulk_exists(paths)`` method, which returns the subset of
+        paths that exist (typically from a single listing). Outputs are grouped by file system
+        instance, so ``bulk_exists`` is called once per file system. Other tasks are checked
+        one by one, with the ``exists()`` of their outputs.
+
+        Returns a dict mapping the task ids of those tasks to whether they are complete.
+        """
+        task_outputs = []
+        paths = collections.defaultdict(set)
+        default_complete = six.get_unbound_function(Task.complete)
+        default_exists = six.get_unbound_function(FileSystemTarget.exists)
+
+        def bulk_checkable(output):
+            return (isinstance(output, FileSystemTarget) and
+                    six.get_unbound_function(type(output).exists) is default_exists and
+                    hasattr(getattr(output, 'fs', None), 'bulk_exists'))
+
+        for task in tasks:
+            if six.get_unbound_function(type(task).complete) is not default_complete:
+                continue
+            try:
+                outputs = flatten(task.output())
+            except Exception:
+                continue  # reported by the regular completeness check
+            if not outputs or not all(bulk_checkable(o) for o in outputs):
+                continue
+            for output in outputs:
+                paths[output.fs].add(output.path)
+            task_outputs.append((task, outputs))
+        if not task_outputs:
+            return {}
+
+        try:
+            existing = dict((fs, set(fs.bulk_exists(sorted(fs_paths))))
+                            for fs, fs_paths in six.iteritems(paths))
+        except Exception:
+            logger.warning('Bulk existence check failed, checking tasks one by one', exc_info=True)
+            return {}
+        return dict((task.task_id, all(o.path in existing[o.fs] for o in outputs))
+                    for task, outputs in task_outputs)
+
+    def _add_task(self, **kwargs):
+        """
+        Send an add_task call to the scheduler, or buffer it to be sent in a batch request
+        if ``add_task_batch_size`` is larger than 1.
+        """
+        if self._config.add_task_batch_size <= 1:
+            self._scheduler.add_task(**kwargs)
+            return
+        self._add_task_calls.append({'name': 'add_task', 'kwargs': kwargs})
+        if len(self._add_task_calls) >= self._config.add_task_batch_size:
+            self._flush_add_task_calls()
+
+    def _flush_add_task_calls(self):
+        calls, self._add_task_calls = self._add_task_calls, []
+        if calls:
+            self._scheduler.batch(calls=calls)
+
     def _add(self, task, is_complete):
         if self._config.task_limit is not None and len(self._scheduled_tasks) >= self._config.task_limit:
             logger.warning('Will not schedule %s or any dependencies due to exceeded task-limit of %d', task, self._config.task_limit)
@@ -531,12 +645,12 @@ class Worker(object):
             deps = [d.task_id for d in deps]
 
         self._scheduled_tasks[task.task_id] = task
-        self._scheduler.add_task(self._id, task.task_id, status=status,
-                                 deps=deps, runnable=runnable, priority=task.priority,
-                                 resources=task.process_resources(),
-                                 params=task.to_str_params(),
-                                 family=task.task_family,
-                                 module=task.task_module)
+        self._add_task(worker=self._id, task_id=task.task_id, status=status,
+                       deps=deps, runnable=runnable, priority=task.priority,
+                       resources=task.process_resources(),
+                       params=task.to_str_params(),
+                       family=task.task_family,
+                       module=task.task_module)
 
         logger.info('Scheduled %s (%s)', task.task_id, status)
 
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+from helpers import unittest
+
+import mock
+
+import luigi
+import luigi.notifications
+import luigi.worker
+from luigi.scheduler import CentralPlannerScheduler, DONE, PENDING
+from luigi.target import FileSystemTarget
+
+luigi.notifications.DEBUG = True
+
+
+class BatchScheduler(CentralPlannerScheduler):
+    """CentralPlannerScheduler with the batch RPC, counting the calls in each batch"""
+
+    def __init__(self, *args, **kwargs):
+        super(BatchScheduler, self).__init__(*args, **kwargs)
+        self.batches = []
+
+    def batch(self, calls, **kwargs):
+        self.batches.append(len(calls))
+        return [getattr(self, call['name'])(**call['kwargs']) for call in calls]
+
+
+class Chain(luigi.Task):
+    n = luigi.IntParameter()
+    fail_at = luigi.IntParameter(default=-1)
+    exception = luigi.Parameter(default=ValueError)
+
+    def complete(self):
+        return self.n == 0
+
+    def requires(self):
+        if self.n == self.fail_at:
+            raise self.exception('requires() failed')
+        if self.n > 0:
+            return Chain(self.n - 1, self.fail_at, self.exception)
+
+    def run(self):
+        pass
+
+
+class WorkerAddTaskBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        super(WorkerAddTaskBatchTest, self).setUp()
+        self.sch = BatchScheduler(retry_delay=100, remove_delay=1000, worker_disconnect_delay=10)
+
+    def get_worker(self, **kwargs):
+        return luigi.worker.Worker(scheduler=self.sch, worker_id='X', **kwargs)
+
+    def statuses(self):
+        return dict((task_id, task['status'])
+                    for task_id, task in self.sch.task_list('', '').items())
+
+    def test_batches(self):
+        w = self.get_worker(add_task_batch_size=3)
+        self.assertTrue(w.add(Chain(6)))
+        self.assertEqual(self.sch.batches, [3, 3, 1])
+        self.assertEqual(len(self.statuses()), 7)
+        self.assertEqual(list(self.sch.task_list(DONE, '').keys()), [Chain(0).task_id])
+
+    def test_no_batches(self):
+        w = self.get_worker()
+        self.assertTrue(w.add(Chain(6)))
+        self.assertEqual(self.sch.batches, [])
+        self.assertEqual(len(self.statuses()), 7)
+
+    def test_tasks_before_error_sent(self):
+        w = self.get_worker(add_task_batch_size=100)
+        self.assertFalse(w.add(Chain(6, fail_at=4)))
+        self.assertEqual(self.sch.batches, [2])
+        self.assertEqual(set(self.sch.task_list(PENDING, '').keys()),
+                         set([Chain(6, 4).task_id, Chain(5, 4).task_id]))
+
+    def test_failing_batch_rpc(self):
+        w = self.get_worker(add_task_batch_size=100)
+        with mock.patch.object(self.sch, 'batch', side_effect=ValueError('rpc failed')) as batch, \
+                mock.patch.object(w, '_log_unexpected_error') as log_unexpected_error:
+            self.assertFalse(w.add(Chain(6)))
+        self.assertEqual(batch.call_count, 1)
+        log_unexpected_error.assert_called_once_with(Chain(6))
+        self.assertEqual(w._add_task_calls, [])
+
+        # later calls are sent
+        self.assertTrue(w.add(Chain(1)))
+        self.assertEqual(len(self.statuses()), 2)
+
+    def test_failing_batch_rpc_does_not_replace_error(self):
+        w = self.get_worker(add_task_batch_size=100)
+        with mock.patch.object(self.sch, 'batch', side_effect=ValueError('rpc failed')):
+            self.assertRaises(KeyboardInterrupt, w.add, Chain(6, fail_at=4, exception=KeyboardInterrupt))
+
+
+class BulkFileSystem(object):
+
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.bulk_calls = []
+
+    def exists(self, path):
+        return path in self.existing
+
+    def bulk_exists(self, paths):
+        self.bulk_calls.append(list(paths))
+        return [path for path in paths if path in self.existing]
+
+
+class BulkTarget(FileSystemTarget):
+
+    def __init__(self, path, fs):
+        super(BulkTarget, self).__init__(path)
+        self._fs = fs
+
+    @property
+    def fs(self):
+        return self._fs
+
+    def open(self, mode):
+        raise NotImplementedError
+
+
+FILE_SYSTEM = BulkFileSystem([])
+
+
+class Output(luigi.Task):
+    n = luigi.IntParameter()
+
+    def output(self):
+        return BulkTarget('/data/%d' % self.n, FILE_SYSTEM)
+
+
+class Outputs(luigi.Task):
+    n = luigi.IntParameter()
+
+    def complete(self):
+        return False
+
+    def requires(self):
+        return [Output(i) for i in range(self.n)]
+
+
+class Counted(luigi.Task):
+    n = luigi.IntParameter()
+    checks = []
+
+    def complete(self):
+        self.checks.append((self.n, threading.current_thread().name))
+        return self.n == 0
+
+    def requires(self):
+        return [Counted(self.n - 1)] if self.n > 0 else []
+
+
+class WorkerCompletenessTest(unittest.TestCase):
+
+    def setUp(self):
+        super(WorkerCompletenessTest, self).setUp()
+        self.sch = CentralPlannerScheduler(retry_delay=100, remove_delay=1000, worker_disconnect_delay=10)
+        Counted.checks = []
+        FILE_SYSTEM.existing = set()
+        FILE_SYSTEM.bulk_calls = []
+
+    def get_worker(self, **kwargs):
+        return luigi.worker.Worker(scheduler=self.sch, worker_id='X', **kwargs)
+
+    def pending(self):
+        return set(self.sch.task_list(PENDING, '').keys())
+
+    def test_threaded(self):
+        w = self.get_worker(check_complete_threads=3)
+        threads = threading.active_count()
+        self.assertTrue(w.add(Counted(5)))
+        # the thread pool is shut down
+        self.assertEqual(threading.active_count(), threads)
+        self.assertEqual(sorted(n for n, _ in Counted.checks), list(range(6)))
+        self.assertNotIn(threading.current_thread().name, [name for _, name in Counted.checks])
+        self.assertEqual(self.pending(), set(Counted(n).task_id for n in range(1, 6)))
+        self.assertEqual(list(self.sch.task_list(DONE, '').keys()), [Counted(0).task_id])
+
+    def test_threaded_same_as_single_threaded(self):
+        def tasks():
+            return dict((task_id, (task['status'], task['params']))
+                        for task_id, task in self.sch.task_list('', '').items())
+
+        self.assertTrue(self.get_worker(check_complete_threads=3).add(Counted(9)))
+        threaded = tasks()
+        self.setUp()
+        self.assertTrue(self.get_worker().add(Counted(9)))
+        self.assertEqual(tasks(), threaded)
+
+    def test_cached(self):
+        w = self.get_worker(cache_task_completion=True)
+        self.assertTrue(w.add(Counted(2)))
+        self.assertEqual(sorted(n for n, _ in Counted.checks), [0, 1, 2])
+        Counted.checks = []
+        self.assertTrue(w.add(Counted(3)))
+        # only Counted(0) is remembered, incomplete tasks are checked again
+        self.assertEqual(sorted(n for n, _ in Counted.checks), [1, 2, 3])
+        self.assertEqual(list(self.sch.task_list(DONE, '').keys()), [Counted(0).task_id])
+
+    def test_not_cached_by_default(self):
+        w = self.get_worker()
+        self.assertTrue(w.add(Counted(2)))
+        Counted.checks = []
+        self.assertTrue(w.add(Counted(2)))
+        self.assertEqual(sorted(n for n, _ in Counted.checks), [0, 1, 2])
+
+    def test_bulk_exists(self):
+        FILE_SYSTEM.existing = set(['/data/0', '/data/2'])
+        w = self.get_worker()
+        with mock.patch.object(FILE_SYSTEM, 'exists') as exists:
+            self.assertTrue(w.add(Outputs(4)))
+        self.assertFalse(exists.called)
+        self.assertEqual(FILE_SYSTEM.bulk_calls, [['/data/0', '/data/1', '/data/2', '/data/3']])
+        self.assertEqual(self.pending(), set([Outputs(4).task_id, Output(1).task_id, Output(3).task_id]))
+
+    def test_bulk_exists_failure(self):
+        FILE_SYSTEM.existing = set(['/data/0'])
+        w = self.get_worker()
+        with mock.patch.object(FILE_SYSTEM, 'bulk_exists', side_effect=IOError):
+            self.assertTrue(w.add(Outputs(2)))
+        self.assertEqual(self.pending(), set([Outputs(2).task_id, Output(1).task_id]))
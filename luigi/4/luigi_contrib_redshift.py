@@ -157,6 +157,13 @@ class S3CopyToTable(rdbms.CopyToTable, _CredentialsMixin):
     * You can also override the attributes provided by the
       CredentialsMixin if they are not supplied by your
       configuration or environment variables.
+
+    * Set `bulk_load` to load many small files under `s3_load_path` with
+      a single ``COPY ... MANIFEST``. The files are concatenated into a
+      number of parts that is a multiple of the cluster's slice count, so
+      each slice loads an even share. Override `bulk_load_files` to choose
+      the files explicitly. Concatenation assumes the files have no header
+      rows and end with a newline.
     """
 
     @abc.abstractmethod
@@ -251,6 +258,123 @@ class S3CopyToTable(rdbms.CopyToTable, _CredentialsMixin):
         """
         return []
 
+    @property
+    def bulk_load(self):
+        """
+        Return True to concatenate the input files into slice-aligned parts
+        and load them with a single manifest based COPY.
+        """
+        return False
+
+    @property
+    def bulk_load_parts_per_slice(self):
+        """
+        Number of parts written for each slice in the cluster when bulk loading.
+        """
+        return 1
+
+    @property
+    def slice_count(self):
+        """
+        Override to return the number of slices in the cluster.
+        By default it is queried from stv_slices.
+        """
+        return None
+
+    @property
+    def manifest_path(self):
+        """
+        Override to choose where the manifest (and the parts next to it) are written when bulk loading.
+        """
+        return '%s.manifest' % self.s3_load_path().rstrip('/')
+
+    def bulk_load_files(self):
+        """
+        Override to return the s3 paths of the files to bulk load.
+
+        By default all files under s3_load_path are loaded, except folder
+        markers, hidden files such as ``_SUCCESS`` (names starting with
+        ``_`` or ``.``), and the manifest and parts of a previous bulk load.
+        """
+        folder_path = self.s3_load_path().rstrip('/')
+        s3 = S3Target(folder_path)
+        manifest_path = self.manifest_path
+        files = []
+        for file_name in s3.fs.list(s3.path):
+            path = '%s/%s' % (folder_path, file_name)
+            if not file_name or file_name.endswith('/') or file_name.endswith('_$folder$'):
+                continue
+            if os.path.basename(file_name)[:1] in ('_', '.'):
+                continue
+            if path == manifest_path or path.startswith('%s-parts/' % manifest_path):
+                continue
+            files.append(path)
+        return files
+
+    def get_slice_count(self, connection):
+        if self.slice_count:
+            return self.slice_count
+        cursor = connection.cursor()
+        try:
+            cursor.execute("select count(*) from stv_slices")
+            return max(1, int(cursor.fetchone()[0]))
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def group_files(files, num_parts):
+        """
+        Split files into num_parts contiguous groups whose lengths differ by at most one.
+        """
+        size, extra = divmod(len(files), num_parts)
+        groups = []
+        start = 0
+        for i in range(num_parts):
+            end = start + size + (1 if i < extra else 0)
+            groups.append(files[start:end])
+            start = end
+        return groups
+
+    def write_part(self, part_path, files, chunk_size=8 * 1024 * 1024):
+        """
+        Concatenate files into a single s3 object at part_path.
+
+        The files are copied chunk_size bytes at a time, so they are never
+        held in memory as a whole.
+        """
+        with S3Target(part_path, format=luigi.format.Nop).open('w') as out:
+            for f in files:
+                with S3Target(f, format=luigi.format.Nop).open('r') as data:
+                    for chunk in iter(lambda: data.read(chunk_size), b''):
+                        out.write(chunk)
+
+    def write_manifest(self, path, urls):
+        manifest = {'entries': [{'url': url, 'mandatory': True} for url in urls]}
+        with S3Target(path).open('w') as target:
+            target.write(json.dumps(manifest))
+
+    def prepare_bulk_load(self, connection):
+        """
+        Write the parts and the manifest for a bulk load and return the manifest path.
+        """
+        files = list(self.bulk_load_files())
+        if not files:
+            raise Exception("no files to load from %s" % self.s3_load_path())
+        num_parts = self.get_slice_count(connection) * self.bulk_load_parts_per_slice
+
+        manifest_path = self.manifest_path
+        if len(files) <= num_parts:
+            urls = files
+        else:
+            urls = []
+            for i, group in enumerate(self.group_files(files, num_parts)):
+                part_path = '%s-parts/part-%05d' % (manifest_path, i)
+                self.write_part(part_path, group)
+                urls.append(part_path)
+        logger.info("Loading %d files as %d parts through %s", len(files), len(urls), manifest_path)
+        self.write_manifest(manifest_path, urls)
+        return manifest_path
+
     def truncate_table(self, connection):
         query = "truncate %s" % self.table
         cursor = connection.cursor()
@@ -329,13 +453,15 @@ class S3CopyToTable(rdbms.CopyToTable, _CredentialsMixin):
         if not (self.table):
             raise Exception("table need to be specified")
 
-        path = self.s3_load_path()
         output = self.output()
         connection = output.connect()
         cursor = connection.cursor()
 
         self.init_copy(connection)
-        self.copy(cursor, path)
+        if self.bulk_load:
+            self.copy(cursor, self.prepare_bulk_load(connection), manifest=True)
+        else:
+            self.copy(cursor, self.s3_load_path())
         self.post_copy(cursor)
 
         # update marker table
@@ -345,11 +471,12 @@ class S3CopyToTable(rdbms.CopyToTable, _CredentialsMixin):
         # commit and clean up
         connection.close()
 
-    def copy(self, cursor, f):
+    def copy(self, cursor, f, manifest=False):
         """
         Defines copying from s3 into redshift.
 
         If both key-based and role-based credentials are provided, role-based will be used.
+        If manifest is True, f is the path of a manifest listing the files to load.
         """
         logger.info("Inserting file: %s", f)
         colnames = ''
@@ -360,12 +487,14 @@ class S3CopyToTable(rdbms.CopyToTable, _CredentialsMixin):
         cursor.execute("""
          COPY {table} {colnames} from '{source}'
          CREDENTIALS '{creds}'
+         {manifest}
          {options}
          ;""".format(
             table=self.table,
             colnames=colnames,
             source=f,
             creds=self._credentials(),
+            manifest='MANIFEST' if manifest else '',
             options=self.copy_options)
         )
 
@@ -470,7 +599,7 @@ class S3CopyJSONToTable(S3CopyToTable, _CredentialsMixin):
         """
         return ''
 
-    def copy(self, cursor, f):
+    def copy(self, cursor, f, manifest=False):
         """
         Defines copying JSON from s3 into redshift.
         """
@@ -481,8 +610,10 @@ class S3CopyJSONToTable(S3CopyToTable, _CredentialsMixin):
          CREDENTIALS '%s'
          JSON AS '%s' %s
          %s
+         %s
          ;""" % (self.table, f, self._credentials(),
-                 self.jsonpath, self.copy_json_options, self.copy_options))
+                 self.jsonpath, self.copy_json_options,
+                 'MANIFEST' if manifest else '', self.copy_options))
 
 
 class RedshiftManifestTask(S3PathTask):
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import mock
+from helpers import unittest
+
+import luigi
+import luigi.notifications
+from luigi.contrib import redshift
+from luigi.mock import MockFileSystem, MockTarget
+
+
+luigi.notifications.DEBUG = True
+
+FOLDER = 's3://bucket/key'
+
+
+class FakeS3FileSystem(MockFileSystem):
+
+    def list(self, path):
+        prefix = path.rstrip('/') + '/'
+        return [p[len(prefix):] for p in self.listdir(prefix)]
+
+
+class FakeS3Target(MockTarget):
+    fs = FakeS3FileSystem()
+
+    def __init__(self, path, format=None, **kwargs):
+        super(FakeS3Target, self).__init__(path, format=format)
+
+
+class DummyS3CopyToTableBulkLoad(redshift.S3CopyToTable):
+    host = 'dummy_host'
+    database = 'dummy_database'
+    user = 'dummy_user'
+    password = 'dummy_password'
+    table = 'dummy_table'
+    columns = (('some_text', 'varchar(255)'),)
+    aws_access_key_id = 'key'
+    aws_secret_access_key = 'secret'
+    copy_options = ''
+    bulk_load = True
+
+    def s3_load_path(self):
+        return FOLDER
+
+
+@mock.patch('luigi.contrib.redshift.S3Target', FakeS3Target)
+class TestS3CopyToTableBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        FakeS3Target.fs.clear()
+        for name, data in [('a', b'1\n'), ('b', b'2\n'), ('c', b'3\n'),
+                           ('sub/d', b'4\n'), ('sub/e', b'5\n')]:
+            self.put('%s/%s' % (FOLDER, name), data)
+
+    def put(self, path, data):
+        with FakeS3Target(path, format=luigi.format.Nop).open('w') as f:
+            f.write(data)
+
+    def get(self, path):
+        with FakeS3Target(path, format=luigi.format.Nop).open('r') as f:
+            return f.read()
+
+    def test_bulk_load_files_skips_markers(self):
+        self.put(FOLDER + '/', b'')
+        self.put(FOLDER + '/sub_$folder$', b'')
+        self.put(FOLDER + '/_SUCCESS', b'')
+        self.put(FOLDER + '/sub/.part-0.crc', b'')
+        task = DummyS3CopyToTableBulkLoad()
+        self.assertEqual(sorted(task.bulk_load_files()),
+                         ['%s/%s' % (FOLDER, name) for name in ['a', 'b', 'c', 'sub/d', 'sub/e']])
+
+    def test_bulk_load_files_skips_previous_parts(self):
+        task = DummyS3CopyToTableBulkLoad()
+        with mock.patch.object(DummyS3CopyToTableBulkLoad, 'manifest_path', FOLDER + '/load.manifest'):
+            self.put(FOLDER + '/load.manifest', b'{}')
+            self.put(FOLDER + '/load.manifest-parts/part-00000', b'1\n2\n')
+            self.assertEqual(len(task.bulk_load_files()), 5)
+
+    def test_write_part_in_chunks(self):
+        self.put(FOLDER + '/big', b'x' * 10 + b'\n')
+        task = DummyS3CopyToTableBulkLoad()
+        task.write_part('s3://bucket/part', [FOLDER + '/a', FOLDER + '/big', FOLDER + '/b'], chunk_size=3)
+        self.assertEqual(self.get('s3://bucket/part'), b'1\n' + b'x' * 10 + b'\n2\n')
+
+    @mock.patch('luigi.contrib.redshift.RedshiftTarget')
+    def test_run(self, mock_redshift_target):
+        mock_cursor = mock_redshift_target.return_value.connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (2,)
+        self.put(FOLDER + '/_SUCCESS', b'')
+
+        task = DummyS3CopyToTableBulkLoad()
+        task.run()
+
+        executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertIn('select count(*) from stv_slices', executed)
+        copy = [q for q in executed if 'COPY' in q]
+        self.assertEqual(len(copy), 1)
+        self.assertIn("from '%s'" % task.manifest_path, copy[0])
+        self.assertIn('MANIFEST', copy[0])
+
+        manifest = json.loads(self.get(task.manifest_path).decode('utf8'))
+        urls = [entry['url'] for entry in manifest['entries']]
+        self.assertEqual(urls, ['%s-parts/part-%05d' % (task.manifest_path, i) for i in range(2)])
+        self.assertEqual(b''.join(self.get(url) for url in urls), b'1\n2\n3\n4\n5\n')
+        mock_redshift_target.return_value.touch.assert_called_once_with(
+            mock_redshift_target.return_value.connect.return_value)
@@ -21,7 +21,9 @@ The :py:class:`~luigi.worker.Worker` pulls tasks from the scheduler (usually ove
 See :doc:`/central_scheduler` for more info.
 """
 
+import bisect
 import collections
+import copy
 import inspect
 import json
 
@@ -33,6 +35,7 @@ except ImportError:
     import pickle
 import functools
 import hashlib
+import heapq
 import itertools
 import logging
 import os
@@ -114,8 +117,16 @@ def rpc_method(**request_args):
                     fn_name, len(all_args), len(actual_args)))
             return self._request('/api/{}'.format(fn_name), actual_args, **request_args)
 
+        @functools.wraps(fn)
+        def timed_fn(self, *args, **kwargs):
+            start = time.time()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                self._state._metrics_collector.observe_rpc(fn_name, time.time() - start)
+
         RPC_METHODS[fn_name] = rpc_func
-        return fn
+        return timed_fn
 
     return _rpc_method
 
@@ -147,6 +158,14 @@ class scheduler(Config):
 
     prune_on_get_work = parameter.BoolParameter(default=False)
 
+    state_journal = parameter.BoolParameter(
+        default=False,
+        description="Continuously append state changes to a journal next to state_path, "
+                    "in addition to the snapshot written on shutdown")
+    state_snapshot_records = parameter.IntParameter(
+        default=100000,
+        description="Number of journal records after which a new state snapshot is written")
+
     def _get_retry_policy(self):
         return RetryPolicy(self.retry_count, self.disable_hard_timeout, self.disable_window)
 
@@ -273,6 +292,72 @@ class OrderedSet(collections.MutableSet):
         return set(self) == set(other)
 
 
+class RankedTasks(object):
+    """
+    Index of tasks ordered by decreasing priority, then by increasing creation time.
+
+    This is the order in which the scheduler considers tasks in get_work. The tasks are kept in a
+    heap, so adding or removing one is O(log n), and iterating yields them in order without
+    sorting: getting the k first tasks costs O(k log k).
+    """
+
+    def __init__(self, tasks=()):
+        # heap of (-priority, time, task_id, version), including outdated entries, which are
+        # skipped when iterating
+        self._heap = []
+        self._entries = {}  # map from task id to (heap entry, Task object)
+        self._versions = itertools.count()
+        for task in tasks:
+            self._entries[task.id] = self._make_entry(task), task
+        self._compact()
+
+    def _make_entry(self, task):
+        return -task.priority, task.time, task.id, next(self._versions)
+
+    def _compact(self):
+        self._heap = [entry for entry, _ in six.itervalues(self._entries)]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, task_id):
+        return task_id in self._entries
+
+    def add(self, task):
+        current = self._entries.get(task.id)
+        if current is not None and current[0][:2] == (-task.priority, task.time):
+            return
+        entry = self._make_entry(task)
+        self._entries[task.id] = entry, task
+        heapq.heappush(self._heap, entry)
+        self._compact_if_outdated()
+
+    def discard(self, task_id):
+        if self._entries.pop(task_id, None) is not None:
+            self._compact_if_outdated()
+
+    def _compact_if_outdated(self):
+        # keeps the outdated entries below half of the heap
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def __iter__(self):
+        # Walks the heap in order without modifying it, by keeping the entries whose parent has
+        # been visited in a second heap. The index must not be modified while iterating.
+        heap = self._heap
+        entries = self._entries
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, index = heapq.heappop(frontier)
+            current = entries.get(entry[2])
+            if current is not None and current[0] is entry:
+                yield current[1]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+
 class Task(object):
     def __init__(self, task_id, status, deps, resources=None, priority=0, family='', module=None,
                  params=None, tracking_url=None, status_message=None, retry_policy='notoptional'):
@@ -416,6 +501,94 @@ class Worker(object):
         return self.id
 
 
+def _escape_label(value):
+    return six.text_type(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class SchedulerMetrics(object):
+    """
+    Collects scheduler metrics and renders them in the Prometheus text format.
+
+    RPC latencies and task status transitions are recorded as they happen using fixed
+    buckets, so recording is a couple of dict lookups. Queue depths and resource usage
+    are read from the task state indexes when the metrics are scraped.
+    """
+
+    RPC_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, state):
+        self._state = state
+        self._rpc_counts = {}  # map from method name to per bucket counts
+        self._rpc_sums = collections.defaultdict(float)
+        self._transitions = collections.defaultdict(int)
+
+    def observe_rpc(self, method, seconds):
+        counts = self._rpc_counts.get(method)
+        if counts is None:
+            counts = self._rpc_counts[method] = [0] * (len(self.RPC_BUCKETS) + 1)
+        counts[bisect.bisect_left(self.RPC_BUCKETS, seconds)] += 1
+        self._rpc_sums[method] += seconds
+
+    def observe_transition(self, old_status, new_status):
+        self._transitions[old_status, new_status] += 1
+
+    def _rpc_lines(self):
+        yield '# HELP luigi_scheduler_rpc_duration_seconds Time spent handling scheduler RPC calls.'
+        yield '# TYPE luigi_scheduler_rpc_duration_seconds histogram'
+        bounds = ['{:g}'.format(bound) for bound in self.RPC_BUCKETS] + ['+Inf']
+        for method in sorted(self._rpc_counts):
+            label = 'method="{}"'.format(_escape_label(method))
+            total = 0
+            for bound, count in zip(bounds, self._rpc_counts[method]):
+                total += count
+                yield 'luigi_scheduler_rpc_duration_seconds_bucket{{{},le="{}"}} {}'.format(label, bound, total)
+            yield 'luigi_scheduler_rpc_duration_seconds_sum{{{}}} {!r}'.format(label, self._rpc_sums[method])
+            yield 'luigi_scheduler_rpc_duration_seconds_count{{{}}} {}'.format(label, total)
+
+    def _transition_lines(self):
+        yield '# HELP luigi_scheduler_task_transitions_total Task status changes.'
+        yield '# TYPE luigi_scheduler_task_transitions_total counter'
+        for (old_status, new_status), count in sorted(six.iteritems(self._transitions)):
+            yield 'luigi_scheduler_task_transitions_total{{from="{}",to="{}"}} {}'.format(
+                _escape_label(old_status), _escape_label(new_status), count)
+
+    def _state_lines(self):
+        yield '# HELP luigi_scheduler_tasks Number of tasks known to the scheduler.'
+        yield '# TYPE luigi_scheduler_tasks gauge'
+        for status, tasks in sorted(six.iteritems(self._state._status_tasks)):
+            yield 'luigi_scheduler_tasks{{status="{}"}} {}'.format(_escape_label(status), len(tasks))
+
+        family_counts = collections.defaultdict(int)
+        used_resources = collections.defaultdict(int)
+        for task in self._state.get_active_tasks_by_status(PENDING, RUNNING):
+            family_counts[task.family, task.status] += 1
+            if task.status == RUNNING:
+                for resource, amount in six.iteritems(getattr(task, 'resources_running', task.resources) or {}):
+                    used_resources[resource] += amount
+
+        yield '# HELP luigi_scheduler_family_tasks Number of pending and running tasks per task family.'
+        yield '# TYPE luigi_scheduler_family_tasks gauge'
+        for (family, status), count in sorted(six.iteritems(family_counts)):
+            yield 'luigi_scheduler_family_tasks{{family="{}",status="{}"}} {}'.format(
+                _escape_label(family), status, count)
+
+        yield '# HELP luigi_scheduler_resources_used Resources held by running tasks.'
+        yield '# TYPE luigi_scheduler_resources_used gauge'
+        for resource, amount in sorted(six.iteritems(used_resources)):
+            yield 'luigi_scheduler_resources_used{{resource="{}"}} {}'.format(_escape_label(resource), amount)
+
+        yield '# HELP luigi_scheduler_workers Number of active workers.'
+        yield '# TYPE luigi_scheduler_workers gauge'
+        yield 'luigi_scheduler_workers {}'.format(len(self._state._active_workers))
+
+    def generate_latest(self):
+        lines = itertools.chain(self._rpc_lines(), self._transition_lines(), self._state_lines())
+        return '\n'.join(lines) + '\n'
+
+    def configure_http_handler(self, http_handler):
+        http_handler.set_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+
+
 class SimpleTaskState(object):
     """
     Keep track of the current state and handle persistance.
@@ -429,8 +602,14 @@ class SimpleTaskState(object):
         self._state_path = state_path
         self._tasks = {}  # map from id to a Task object
         self._status_tasks = collections.defaultdict(dict)
+        self._family_tasks = collections.defaultdict(dict)
+        # RUNNING tasks, and PENDING tasks with all their dependencies DONE, in scheduling order
+        self._ranked_tasks = RankedTasks()
+        self._dependents = collections.defaultdict(set)  # map from task id to ids of tasks depending on it
+        self._unfinished_deps = {}  # map from task id to the number of its dependencies not DONE
         self._active_workers = {}  # map from id to a Worker object
         self._task_batchers = {}
+        self._metrics_collector = SchedulerMetrics(self)
 
     def get_state(self):
         return self._tasks, self._active_workers, self._task_batchers
@@ -461,18 +640,45 @@ class SimpleTaskState(object):
                 return
 
             self.set_state(state)
-            self._status_tasks = collections.defaultdict(dict)
-            for task in six.itervalues(self._tasks):
-                self._status_tasks[task.status][task.id] = task
+            self._index_tasks()
         else:
             logger.info("No prior state file exists at %s. Starting with empty state", self._state_path)
 
+    def _index_tasks(self):
+        self._status_tasks = collections.defaultdict(dict)
+        self._family_tasks = collections.defaultdict(dict)
+        for task in six.itervalues(self._tasks):
+            self._status_tasks[task.status][task.id] = task
+            self._family_tasks[task.family][task.id] = task
+        self._dependents = collections.defaultdict(set)
+        self._unfinished_deps = {}
+        for task in six.itervalues(self._tasks):
+            self._link_deps(task)
+        self._ranked_tasks = RankedTasks(
+            task for task in six.itervalues(self._tasks) if self._is_ranked(task))
+
+    def flush(self):
+        """
+        Persist recent changes, called periodically by the scheduler. State is only saved on dump.
+        """
+        pass
+
     def get_active_tasks(self):
         return six.itervalues(self._tasks)
 
     def get_active_tasks_by_status(self, *statuses):
         return itertools.chain.from_iterable(six.itervalues(self._status_tasks[status]) for status in statuses)
 
+    def get_active_tasks_by_family(self, family):
+        return six.itervalues(self._family_tasks.get(family, {}))
+
+    def get_active_tasks_by_worker(self, worker_id):
+        worker = self._active_workers.get(worker_id)
+        if worker is None:
+            return iter(())
+        # worker.tasks isn't updated when tasks are inactivated
+        return (task for task in worker.tasks if self._tasks.get(task.id) is task)
+
     def get_batch_running_tasks(self, batch_id):
         assert batch_id is not None
         return [
@@ -493,10 +699,83 @@ class SimpleTaskState(object):
         """
         return len(self._status_tasks[PENDING]) + len(self._status_tasks[RUNNING])
 
+    def get_schedulable_tasks_by_rank(self):
+        """
+        Return the RUNNING tasks and the PENDING tasks whose dependencies are all DONE, highest
+        priority first and oldest first among equal priorities, without sorting them.
+
+        These are the only PENDING + RUNNING tasks that get_work may schedule or has to account
+        for.
+        """
+        return iter(self._ranked_tasks)
+
+    def _is_ranked(self, task):
+        return task.status == RUNNING or (
+            task.status == PENDING and not self._unfinished_deps.get(task.id))
+
+    def _update_rank(self, task):
+        if self._is_ranked(task):
+            self._ranked_tasks.add(task)
+        else:
+            self._ranked_tasks.discard(task.id)
+
+    def _link_deps(self, task):
+        unfinished = 0
+        for dep in task.deps or ():
+            self._dependents[dep].add(task.id)
+            dep_task = self._tasks.get(dep)
+            if dep_task is None or dep_task.status != DONE:
+                unfinished += 1
+        self._unfinished_deps[task.id] = unfinished
+
+    def _unlink_deps(self, task):
+        for dep in task.deps or ():
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(task.id)
+                if not dependents:
+                    del self._dependents[dep]
+        self._unfinished_deps.pop(task.id, None)
+
+    def _update_dependents(self, task_id, done):
+        """
+        Update the tasks depending on task_id, which just became DONE (or stopped being DONE).
+        """
+        for dependent_id in self._dependents.get(task_id, ()):
+            self._unfinished_deps[dependent_id] += -1 if done else 1
+            self._update_rank(self._tasks[dependent_id])
+
+    def set_deps(self, task, deps):
+        self._unlink_deps(task)
+        task.deps = set(deps)
+        self._link_deps(task)
+        self._update_rank(task)
+
+    def set_family(self, task, family):
+        family_tasks = self._family_tasks.get(task.family)
+        if family_tasks is not None:
+            family_tasks.pop(task.id, None)
+            if not family_tasks:
+                del self._family_tasks[task.family]
+        task.family = family
+        self._family_tasks[family][task.id] = task
+
+    def set_priority(self, task, priority):
+        task.priority = priority
+        if task.id in self._ranked_tasks:
+            self._ranked_tasks.add(task)
+
     def get_task(self, task_id, default=None, setdefault=None):
         if setdefault:
-            task = self._tasks.setdefault(task_id, setdefault)
+            task = self._tasks.get(task_id)
+            if task is None:
+                task = self._tasks[task_id] = setdefault
+                self._link_deps(task)
+                if task.status == DONE:
+                    self._update_dependents(task_id, done=True)
             self._status_tasks[task.status][task.id] = task
+            self._family_tasks[task.family][task.id] = task
+            self._update_rank(task)
             return task
         else:
             return self._tasks.get(task_id, default)
@@ -560,10 +839,15 @@ class SimpleTaskState(object):
             task.scheduler_disable_time = None
 
         if new_status != task.status:
+            self._metrics_collector.observe_transition(task.status, new_status)
             self._status_tasks[task.status].pop(task.id)
             self._status_tasks[new_status][task.id] = task
+            was_done = task.status == DONE
             task.status = new_status
             task.updated = time.time()
+            self._update_rank(task)
+            if was_done != (new_status == DONE):
+                self._update_dependents(task.id, done=not was_done)
 
         if new_status == FAILED:
             task.retry = time.time() + config.retry_delay
@@ -608,6 +892,11 @@ class SimpleTaskState(object):
         for task in delete_tasks:
             task_obj = self._tasks.pop(task)
             self._status_tasks[task_obj.status].pop(task)
+            self._family_tasks[task_obj.family].pop(task, None)
+            self._ranked_tasks.discard(task)
+            self._unlink_deps(task_obj)
+            if task_obj.status == DONE:
+                self._update_dependents(task, done=False)
 
     def get_active_workers(self, last_active_lt=None, last_get_work_gt=None):
         for worker in six.itervalues(self._active_workers):
@@ -646,6 +935,269 @@ class SimpleTaskState(object):
             self.get_worker(worker_id).disabled = True
 
 
+class JournaledTaskState(SimpleTaskState):
+    """
+    Task state that is also saved incrementally, so that restarts and crashes lose little state.
+
+    Changes are appended to journal files ``<state_path>.journal.<n>`` on each flush: the latest
+    version of each changed task and worker, and the operations removing tasks or workers.
+    Every ``snapshot_records`` records, a snapshot of the whole state is written to
+    ``state_path`` by a forked process, so that the scheduler isn't paused while it is pickled.
+    The journal is then continued in a new file, and older ones are deleted once the snapshot
+    is complete. Loading replays the journal files following the snapshot.
+    """
+
+    def __init__(self, state_path, snapshot_records=100000):
+        super(JournaledTaskState, self).__init__(state_path)
+        self._snapshot_records = snapshot_records
+        self._journal_seq = 0
+        self._journal_size = 0  # records written since the last snapshot
+        self._records = []  # records waiting to be written, in order
+        self._changed_tasks = {}
+        self._changed_workers = {}
+        self._snapshot_pid = None
+        self._snapshot_seq = None
+
+    def _journal_path(self, seq):
+        return '{}.journal.{}'.format(self._state_path, seq)
+
+    def _journal_seqs(self):
+        directory, prefix = os.path.split(self._journal_path(''))
+        seqs = []
+        for filename in os.listdir(directory or os.curdir):
+            if filename.startswith(prefix):
+                try:
+                    seqs.append(int(filename[len(prefix):]))
+                except ValueError:
+                    pass
+        return sorted(seqs)
+
+    def _task_changed(self, task):
+        self._changed_tasks[task.id] = task
+
+    def _add_record(self, *record):
+        # records of changed objects must precede operations that may remove them
+        self._queue_changes()
+        self._records.append(record)
+
+    def _queue_changes(self):
+        self._records.extend(('task', task) for task in six.itervalues(self._changed_tasks))
+        self._records.extend(('worker', worker) for worker in six.itervalues(self._changed_workers))
+        self._changed_tasks.clear()
+        self._changed_workers.clear()
+
+    def _pickle_record(self, record):
+        if record[0] == 'worker':
+            # Worker.tasks is rebuilt from the tasks when loading
+            worker = copy.copy(record[1])
+            worker.tasks = set()
+            record = ('worker', worker)
+        return pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+
+    def get_task(self, task_id, default=None, setdefault=None):
+        task = super(JournaledTaskState, self).get_task(task_id, default, setdefault)
+        if setdefault:
+            self._task_changed(task)
+        return task
+
+    def get_worker(self, worker_id):
+        worker = super(JournaledTaskState, self).get_worker(worker_id)
+        self._changed_workers[worker_id] = worker
+        return worker
+
+    def set_status(self, task, new_status, config=None):
+        super(JournaledTaskState, self).set_status(task, new_status, config)
+        self._task_changed(task)
+
+    def set_priority(self, task, priority):
+        super(JournaledTaskState, self).set_priority(task, priority)
+        self._task_changed(task)
+
+    def set_family(self, task, family):
+        super(JournaledTaskState, self).set_family(task, family)
+        self._task_changed(task)
+
+    def set_deps(self, task, deps):
+        super(JournaledTaskState, self).set_deps(task, deps)
+        self._task_changed(task)
+
+    def set_batch_running(self, task, batch_id, worker_id):
+        super(JournaledTaskState, self).set_batch_running(task, batch_id, worker_id)
+        self._task_changed(task)
+
+    def re_enable(self, task, config=None):
+        super(JournaledTaskState, self).re_enable(task, config)
+        self._task_changed(task)
+
+    def update_status(self, task, config):
+        # called for every task on each prune, only journal actual changes
+        remove = task.remove
+        super(JournaledTaskState, self).update_status(task, config)
+        if task.remove != remove:
+            self._task_changed(task)
+
+    def set_batcher(self, worker_id, family, batcher_args, max_batch_size):
+        super(JournaledTaskState, self).set_batcher(worker_id, family, batcher_args, max_batch_size)
+        self._add_record('set_batcher', worker_id, family, batcher_args, max_batch_size)
+
+    def inactivate_tasks(self, delete_tasks):
+        super(JournaledTaskState, self).inactivate_tasks(delete_tasks)
+        for task_id in delete_tasks:
+            self._changed_tasks.pop(task_id, None)
+        self._add_record('inactivate_tasks', list(delete_tasks))
+
+    def inactivate_workers(self, delete_workers):
+        super(JournaledTaskState, self).inactivate_workers(delete_workers)
+        for worker_id in delete_workers:
+            self._changed_workers.pop(worker_id, None)
+        self._add_record('inactivate_workers', list(delete_workers))
+
+    def disable_workers(self, worker_ids):
+        super(JournaledTaskState, self).disable_workers(worker_ids)
+        self._add_record('disable_workers', list(worker_ids))
+
+    def _replay(self, record):
+        kind, args = record[0], record[1:]
+        if kind == 'task':
+            self._tasks[args[0].id] = args[0]
+        elif kind == 'worker':
+            self._active_workers[args[0].id] = args[0]
+        elif kind == 'set_batcher':
+            SimpleTaskState.set_batcher(self, *args)
+        elif kind == 'inactivate_tasks':
+            for task_id in args[0]:
+                self._tasks.pop(task_id, None)
+        elif kind == 'inactivate_workers':
+            workers = set(args[0])
+            for worker_id in workers:
+                self._active_workers.pop(worker_id, None)
+            self._remove_workers_from_tasks(workers)
+        elif kind == 'disable_workers':
+            SimpleTaskState.disable_workers(self, set(args[0]))
+
+    def flush(self):
+        self._reap_snapshot()
+        self._queue_changes()
+        if not self._records:
+            return
+        records, self._records = self._records, []
+        try:
+            with open(self._journal_path(self._journal_seq), 'ab') as fobj:
+                for record in records:
+                    fobj.write(self._pickle_record(record))
+                fobj.flush()
+                os.fsync(fobj.fileno())
+        except IOError:
+            logger.warning("Failed writing scheduler state journal", exc_info=1)
+            self._records = records + self._records
+            return
+        self._journal_size += len(records)
+        if self._journal_size >= self._snapshot_records and self._snapshot_pid is None:
+            self._snapshot()
+
+    def _write_snapshot(self, seq):
+        tmp_path = '{}.{}.tmp'.format(self._state_path, os.getpid())
+        with open(tmp_path, 'wb') as fobj:
+            pickle.dump(self.get_state() + (seq,), fobj, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, self._state_path)
+
+    def _snapshot(self):
+        # the snapshot covers all journal files before the new one
+        self._journal_seq += 1
+        self._journal_size = 0
+        seq = self._journal_seq
+        if not hasattr(os, 'fork'):
+            self._write_snapshot(seq)
+            self._delete_journals(seq)
+            return
+        pid = os.fork()
+        if pid == 0:
+            # child process: works on a copy-on-write view of the state as of the fork
+            code = 0
+            try:
+                self._write_snapshot(seq)
+            except BaseException:
+                code = 1
+            os._exit(code)
+        self._snapshot_pid, self._snapshot_seq = pid, seq
+
+    def _reap_snapshot(self, wait=False):
+        if self._snapshot_pid is None:
+            return
+        pid, status = os.waitpid(self._snapshot_pid, 0 if wait else os.WNOHANG)
+        if pid == 0:
+            return
+        if status == 0:
+            logger.info("Saved state snapshot in %s", self._state_path)
+            self._delete_journals(self._snapshot_seq)
+        else:
+            logger.warning("Failed saving scheduler state snapshot")
+        self._snapshot_pid = self._snapshot_seq = None
+
+    def _delete_journals(self, before_seq):
+        for seq in self._journal_seqs():
+            if seq < before_seq:
+                os.remove(self._journal_path(seq))
+
+    def dump(self):
+        self._reap_snapshot(wait=True)
+        self._queue_changes()
+        self._records = []
+        self._journal_seq += 1
+        self._journal_size = 0
+        try:
+            self._write_snapshot(self._journal_seq)
+        except (IOError, OSError):
+            logger.warning("Failed saving scheduler state", exc_info=1)
+        else:
+            self._delete_journals(self._journal_seq)
+            logger.info("Saved state in %s", self._state_path)
+
+    def load(self):
+        seq = 0
+        if os.path.exists(self._state_path):
+            logger.info("Attempting to load state from %s", self._state_path)
+            try:
+                with open(self._state_path, 'rb') as fobj:
+                    state = pickle.load(fobj)
+            except BaseException:
+                logger.exception("Error when loading state. Starting from empty state.")
+                return
+            self.set_state(state)
+            if len(state) >= 4:
+                seq = state[3]
+
+        num_records = 0
+        seqs = [s for s in self._journal_seqs() if s >= seq]
+        for journal_seq in seqs:
+            with open(self._journal_path(journal_seq), 'rb') as fobj:
+                while True:
+                    try:
+                        record = pickle.load(fobj)
+                    except EOFError:
+                        break
+                    except BaseException:
+                        # a crash can leave a partially written record at the end
+                        logger.warning("Ignoring truncated scheduler state journal %s",
+                                       self._journal_path(journal_seq), exc_info=1)
+                        break
+                    self._replay(record)
+                    num_records += 1
+        logger.info("Replayed %d state journal records", num_records)
+
+        for worker in six.itervalues(self._active_workers):
+            worker.tasks = set()
+        for task in six.itervalues(self._tasks):
+            for worker_id in task.workers:
+                if worker_id in self._active_workers:
+                    self._active_workers[worker_id].tasks.add(task)
+        self._index_tasks()
+
+        # continue in a new journal file, so that a truncated record is never followed
+        self._journal_seq = max(seqs + [seq]) + 1
+        self._journal_size = num_records
+
+
 class Scheduler(object):
     """
     Async scheduler that can handle multiple workers, etc.
@@ -661,7 +1213,10 @@ class Scheduler(object):
         :param task_history_impl: ignore config and use this object as the task history
         """
         self._config = config or scheduler(**kwargs)
-        self._state = SimpleTaskState(self._config.state_path)
+        if self._config.state_journal:
+            self._state = JournaledTaskState(self._config.state_path, self._config.state_snapshot_records)
+        else:
+            self._state = SimpleTaskState(self._config.state_path)
 
         if task_history_impl:
             self._task_history = task_history_impl
@@ -692,6 +1247,7 @@ class Scheduler(object):
         self._prune_workers()
         self._prune_tasks()
         self._prune_emails()
+        self._state.flush()
         logger.info("Done pruning task graph")
 
     def _prune_workers(self):
@@ -734,7 +1290,9 @@ class Scheduler(object):
         Priority can only be increased.
         If the task doesn't exist, a placeholder task is created to preserve priority when the task is later scheduled.
         """
-        task.priority = prio = max(prio, task.priority)
+        prio = max(prio, task.priority)
+        if prio != task.priority:
+            self._state.set_priority(task, prio)
         for dep in task.deps or []:
             t = self._state.get_task(dep)
             if t is not None and prio > t.priority:
@@ -791,7 +1349,7 @@ class Scheduler(object):
 
         # for setting priority, we'll sometimes create tasks with unset family and params
         if not task.family:
-            task.family = family
+            self._state.set_family(task, family)
         if not getattr(task, 'module', None):
             task.module = module
         if not task.params:
@@ -854,10 +1412,10 @@ class Scheduler(object):
                     task.pretty_id, task.family, unbatched_params, owners)
 
         if deps is not None:
-            task.deps = set(deps)
+            self._state.set_deps(task, deps)
 
         if new_deps is not None:
-            task.deps.update(new_deps)
+            self._state.set_deps(task, task.deps | set(new_deps))
 
         if resources is not None:
             task.resources = resources
@@ -882,6 +1440,22 @@ class Scheduler(object):
             self._state.get_worker(worker_id).tasks.add(task)
             task.runnable = runnable
 
+    @rpc_method()
+    def batch(self, calls, **kwargs):
+        """
+        Execute several scheduler calls, in order, within a single request.
+
+        :param calls: list of dicts {'name': <rpc method name>, 'kwargs': <method kwargs>}
+        :return: list with the result of each call
+        """
+        results = []
+        for call in calls:
+            name = call['name']
+            if name not in RPC_METHODS or name == 'batch':
+                raise ValueError('Unknown scheduler method {!r} in batch'.format(name))
+            results.append(getattr(self, name)(**call.get('kwargs', {})))
+        return results
+
     @rpc_method()
     def announce_scheduling_failure(self, task_name, family, params, expl, owners, **kwargs):
         if not self._config.batch_emails:
@@ -963,6 +1537,8 @@ class Scheduler(object):
         """
         Return worker's rank function for task scheduling.
 
+        This must match the order of :py:meth:`SimpleTaskState.get_schedulable_tasks_by_rank`.
+
         :return:
         """
 
@@ -1079,19 +1655,19 @@ class Scheduler(object):
             relevant_tasks = []
         elif worker.is_trivial_worker(self._state):
             relevant_tasks = worker.get_tasks(self._state, PENDING, RUNNING)
+            relevant_tasks = sorted(relevant_tasks, key=self._rank, reverse=True)
             used_resources = collections.defaultdict(int)
             greedy_workers = dict()  # If there's no resources, then they can grab any task
         else:
-            relevant_tasks = self._state.get_active_tasks_by_status(PENDING, RUNNING)
+            # PENDING tasks with unfinished dependencies are neither scheduled nor use resources
+            relevant_tasks = self._state.get_schedulable_tasks_by_rank()
             used_resources = self._used_resources()
             activity_limit = time.time() - self._config.worker_disconnect_delay
             active_workers = self._state.get_active_workers(last_get_work_gt=activity_limit)
             greedy_workers = dict((worker.id, worker.info.get('workers', 1))
                                   for worker in active_workers)
-        tasks = list(relevant_tasks)
-        tasks.sort(key=self._rank, reverse=True)
 
-        for task in tasks:
+        for task in relevant_tasks:
             if (best_task and batched_params and task.family == best_task.family and
                     len(batched_tasks) < max_batch_size and task.is_batchable() and all(
                     task.params.get(name) == value for name, value in unbatched_params.items()) and
@@ -1100,6 +1676,9 @@ class Scheduler(object):
                     params.append(task.params.get(name))
                 batched_tasks.append(task)
             if best_task:
+                if not batched_params:
+                    # the remaining tasks can only be used to fill up a batch
+                    break
                 continue
 
             if task.status == RUNNING and (task.worker_running in greedy_workers):
@@ -1245,13 +1824,14 @@ class Scheduler(object):
             if task is None or task.status != DONE:
                 yield task_id
 
-    def _traverse_graph(self, root_task_id, seen=None, dep_func=None, include_done=True):
+    def _traverse_graph(self, root_task_id, seen=None, dep_func=None, include_done=True, max_depth=None):
         """ Returns the dependency graph rooted at task_id
 
         This does a breadth-first traversal to find the nodes closest to the
         root before hitting the scheduler.max_graph_nodes limit.
 
         :param root_task_id: the id of the graph's root
+        :param max_depth: if set, don't include nodes further than this many edges from the root
         :return: A map of task id to serialized node
         """
 
@@ -1266,9 +1846,9 @@ class Scheduler(object):
 
         seen.add(root_task_id)
         serialized = {}
-        queue = collections.deque([root_task_id])
+        queue = collections.deque([(root_task_id, 0)])
         while queue:
-            task_id = queue.popleft()
+            task_id, depth = queue.popleft()
 
             task = self._state.get_task(task_id)
             if task is None or not task.family:
@@ -1294,10 +1874,11 @@ class Scheduler(object):
                 if not include_done:
                     deps = list(self._filter_done(deps))
                 serialized[task_id] = self._serialize_task(task_id, deps=deps)
-                for dep in sorted(deps):
-                    if dep not in seen:
-                        seen.add(dep)
-                        queue.append(dep)
+                if max_depth is None or depth < max_depth:
+                    for dep in sorted(deps):
+                        if dep not in seen:
+                            seen.add(dep)
+                            queue.append((dep, depth + 1))
 
             if task_id != root_task_id:
                 del serialized[task_id]['display_name']
@@ -1307,14 +1888,14 @@ class Scheduler(object):
         return serialized
 
     @rpc_method()
-    def dep_graph(self, task_id, include_done=True, **kwargs):
+    def dep_graph(self, task_id, include_done=True, max_depth=None, **kwargs):
         self.prune()
         if not self._state.has_task(task_id):
             return {}
-        return self._traverse_graph(task_id, include_done=include_done)
+        return self._traverse_graph(task_id, include_done=include_done, max_depth=max_depth)
 
     @rpc_method()
-    def inverse_dep_graph(self, task_id, include_done=True, **kwargs):
+    def inverse_dep_graph(self, task_id, include_done=True, max_depth=None, **kwargs):
         self.prune()
         if not self._state.has_task(task_id):
             return {}
@@ -1323,31 +1904,58 @@ class Scheduler(object):
             for dep in task.deps:
                 inverse_graph[dep].add(task.id)
         return self._traverse_graph(
-            task_id, dep_func=lambda t: inverse_graph[t.id], include_done=include_done)
+            task_id, dep_func=lambda t: inverse_graph[t.id], include_done=include_done,
+            max_depth=max_depth)
 
     @rpc_method()
     def task_list(self, status='', upstream_status='', limit=True, search=None, max_shown_tasks=None,
-                  **kwargs):
+                  family=None, worker=None, cursor=None, page_size=None, **kwargs):
         """
         Query for a subset of tasks by status.
+
+        Tasks can also be filtered by family and by worker. If page_size is given, at most that
+        many tasks are returned, ordered by task id, as {'tasks': ..., 'next_cursor': ...}. Pass
+        next_cursor back as cursor to get the following page; it is None on the last page.
         """
         self.prune()
-        result = {}
         upstream_status_table = {}  # used to memoize upstream status
-        if search is None:
-            def filter_func(_):
-                return True
-        else:
+        filters = []
+        if search is not None:
             terms = search.split()
+            filters.append(lambda t: all(term in t.pretty_id for term in terms))
+
+        # start from the most selective index, and filter on the other criteria
+        if family is not None:
+            tasks = self._state.get_active_tasks_by_family(family)
+        elif worker is not None:
+            tasks = self._state.get_active_tasks_by_worker(worker)
+        elif status:
+            tasks = self._state.get_active_tasks_by_status(status)
+        else:
+            tasks = self._state.get_active_tasks()
+        if family is not None and worker is not None:
+            filters.append(lambda t: worker in t.workers)
+        if status and (family is not None or worker is not None):
+            filters.append(lambda t: t.status == status)
+        if cursor is not None:
+            filters.append(lambda t: t.id > cursor)
+        if upstream_status:
+            filters.append(lambda t: t.status != PENDING or
+                           upstream_status == self._upstream_status(t.id, upstream_status_table))
+        tasks = (t for t in tasks if all(f(t) for f in filters))
+
+        if page_size:
+            # only keep the page (and one more task to know if there is a next page) ordered,
+            # rather than sorting all the matching tasks for every page
+            page = heapq.nsmallest(page_size + 1, tasks, key=lambda t: t.id)
+            result = dict((task.id, self._serialize_task(task.id, include_deps=False))
+                          for task in page[:page_size])
+            next_cursor = page[page_size - 1].id if len(page) > page_size else None
+            return {'tasks': result, 'next_cursor': next_cursor}
 
-            def filter_func(t):
-                return all(term in t.pretty_id for term in terms)
-
-        tasks = self._state.get_active_tasks_by_status(status) if status else self._state.get_active_tasks()
-        for task in filter(filter_func, tasks):
-            if task.status != PENDING or not upstream_status or upstream_status == self._upstream_status(task.id, upstream_status_table):
-                serialized = self._serialize_task(task.id, include_deps=False)
-                result[task.id] = serialized
+        result = {}
+        for task in tasks:
+            result[task.id] = self._serialize_task(task.id, include_deps=False)
         if limit and len(result) > (max_shown_tasks or self._config.max_shown_tasks):
             return {'num_tasks': len(result)}
         return result
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import shutil
+import tempfile
+import time
+from helpers import unittest
+
+import luigi.notifications
+from luigi.scheduler import DONE, FAILED, PENDING, RUNNING, JournaledTaskState, Scheduler
+
+luigi.notifications.DEBUG = True
+WORKER = 'myworker'
+
+
+class JournaledTaskStateTest(unittest.TestCase):
+
+    def setUp(self):
+        super(JournaledTaskStateTest, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.tmpdir, 'state.pickle')
+        self.time = time.time
+
+    def tearDown(self):
+        super(JournaledTaskStateTest, self).tearDown()
+        time.time = self.time
+        shutil.rmtree(self.tmpdir)
+
+    def setTime(self, t):
+        time.time = lambda: t
+
+    def get_scheduler(self, snapshot_records=100000):
+        sch = Scheduler(state_path=self.state_path, state_journal=True,
+                        state_snapshot_records=snapshot_records,
+                        retry_delay=100, remove_delay=0.0, worker_disconnect_delay=10)
+        sch.load()
+        self.assertIsInstance(sch._state, JournaledTaskState)
+        return sch
+
+    def journal_files(self):
+        return sorted(f for f in os.listdir(self.tmpdir) if '.journal.' in f)
+
+    def statuses(self, sch):
+        return dict((task.id, task.status) for task in sch._state.get_active_tasks())
+
+    def assertSameState(self, sch, other):
+        self.assertEqual(self.statuses(sch), self.statuses(other))
+        self.assertEqual(set(sch._state.get_worker_ids()), set(other._state.get_worker_ids()))
+        for task in sch._state.get_active_tasks():
+            loaded = other._state.get_task(task.id)
+            self.assertEqual(loaded.deps, task.deps)
+            self.assertEqual(loaded.priority, task.priority)
+            self.assertEqual(set(loaded.workers), set(task.workers))
+        self.assertEqual([t.id for t in sch._state.get_schedulable_tasks_by_rank()],
+                         [t.id for t in other._state.get_schedulable_tasks_by_rank()])
+
+    def test_replay_after_crash(self):
+        sch = self.get_scheduler()
+        sch.add_task(worker=WORKER, task_id='A')
+        sch.add_task(worker=WORKER, task_id='B', deps=['A'], priority=2)
+        sch.add_task(worker=WORKER, task_id='C')
+        self.assertEqual(sch.get_work(worker=WORKER)['task_id'], 'A')
+        sch.add_task(worker=WORKER, task_id='A', status=DONE)
+        sch.add_task(worker=WORKER, task_id='C', status=FAILED)
+        sch.add_task_batcher(worker=WORKER, task_family='F', batched_args=['x'])
+        sch.prune()  # flushes the journal
+
+        # no dump, like after a crash
+        self.assertFalse(os.path.exists(self.state_path))
+        self.assertTrue(self.journal_files())
+        loaded = self.get_scheduler()
+        self.assertSameState(sch, loaded)
+        self.assertEqual(self.statuses(loaded), {'A': DONE, 'B': PENDING, 'C': FAILED})
+        self.assertEqual(loaded._state.get_batcher(WORKER, 'F'), (['x'], float('inf')))
+        self.assertEqual(loaded.get_work(worker=WORKER)['task_id'], 'B')
+
+    def test_changes_after_last_flush_lost(self):
+        sch = self.get_scheduler()
+        sch.add_task(worker=WORKER, task_id='A')
+        sch.prune()
+        sch.add_task(worker=WORKER, task_id='B')
+        self.assertEqual(self.statuses(self.get_scheduler()), {'A': PENDING})
+
+    def test_removed_tasks_and_workers(self):
+        sch = self.get_scheduler()
+        sch.add_task(worker='other', task_id='A')
+        sch.add_task(worker=WORKER, task_id='B', status=RUNNING)
+        sch.prune()
+
+        self.setTime(time.time() + 100)
+        sch.ping(worker=WORKER)
+        sch.prune()
+        self.assertEqual(self.statuses(sch), {'B': RUNNING})
+        sch.disable_worker(worker=WORKER)
+        sch.prune()
+
+        loaded = self.get_scheduler()
+        self.assertSameState(sch, loaded)
+        self.assertEqual(set(loaded._state.get_worker_ids()), {WORKER})
+        self.assertFalse(loaded._state.get_worker(WORKER).enabled)
+
+    def test_compaction(self):
+        sch = self.get_scheduler(snapshot_records=10)
+        for i in range(30):
+            sch.add_task(worker=WORKER, task_id='T%d' % i)
+            sch.prune()
+        sch._state._reap_snapshot(wait=True)
+        sch.add_task(worker=WORKER, task_id='T0', status=DONE)
+        sch.prune()
+
+        # older journal files are deleted once a snapshot covers them
+        self.assertTrue(os.path.exists(self.state_path))
+        self.assertLessEqual(len(self.journal_files()), 2)
+        loaded = self.get_scheduler(snapshot_records=10)
+        self.assertSameState(sch, loaded)
+
+        # a dump writes a full snapshot and removes the journal
+        loaded.add_task(worker=WORKER, task_id='T1', status=DONE)
+        loaded.dump()
+        self.assertEqual(self.journal_files(), [])
+        self.assertSameState(loaded, self.get_scheduler())
+
+    def test_truncated_last_record(self):
+        sch = self.get_scheduler()
+        sch.add_task(worker=WORKER, task_id='A')
+        sch.prune()
+        sch.add_task(worker=WORKER, task_id='B')
+        sch.prune()
+        journal_path = os.path.join(self.tmpdir, self.journal_files()[-1])
+        size = os.path.getsize(journal_path)
+        sch.add_task(worker=WORKER, task_id='C')
+        sch.prune()
+        # crash in the middle of writing the record of C
+        with open(journal_path, 'rb+') as fobj:
+            fobj.truncate(size + (os.path.getsize(journal_path) - size) // 2)
+
+        loaded = self.get_scheduler()
+        self.assertEqual(self.statuses(loaded), {'A': PENDING, 'B': PENDING})
+
+        # the journal continues in a new file, so that new records are read
+        loaded.add_task(worker=WORKER, task_id='D')
+        loaded.prune()
+        self.assertEqual(len(self.journal_files()), 2)
+        self.assertEqual(self.statuses(self.get_scheduler()),
+                         {'A': PENDING, 'B': PENDING, 'D': PENDING})
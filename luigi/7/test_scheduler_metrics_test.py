@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import re
+from helpers import unittest
+
+import mock
+
+import luigi.notifications
+from luigi.scheduler import DONE, FAILED, PENDING, RUNNING, Scheduler
+
+luigi.notifications.DEBUG = True
+WORKER = 'myworker'
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(,|$)')
+
+
+def parse_metrics(text):
+    """
+    Parse the Prometheus text exposition format, checking that it is well formed.
+
+    :return: dict mapping (name, frozenset of label items) to the sample value
+    """
+    assert text.endswith('\n')
+    types = {}
+    samples = {}
+    for line in text[:-1].split('\n'):
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            assert name not in types, name
+            types[name] = metric_type
+            continue
+        match = SAMPLE_RE.match(line)
+        assert match, line
+        name, labels_text, value = match.groups()
+        labels = {}
+        if labels_text:
+            end = 0
+            for label in LABEL_RE.finditer(labels_text):
+                assert label.start() == end, line
+                labels[label.group(1)] = re.sub(r'\\(.)', lambda m: {'n': '\n'}.get(m.group(1), m.group(1)),
+                                                label.group(2))
+                end = label.end()
+            assert end == len(labels_text), line
+        base_name = re.sub(r'_(bucket|sum|count)$', '', name)
+        assert name in types or base_name in types, name
+        key = name, frozenset(labels.items())
+        assert key not in samples, line
+        samples[key] = float(value)
+    return samples
+
+
+class SchedulerMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        super(SchedulerMetricsTest, self).setUp()
+        self.sch = Scheduler(retry_delay=100, remove_delay=1000, worker_disconnect_delay=10,
+                             disable_persist=10, disable_window=10, retry_count=3,
+                             resources={'r': 2})
+
+    def metrics(self):
+        return parse_metrics(self.sch._state._metrics_collector.generate_latest())
+
+    def sample(self, name, **labels):
+        return self.metrics().get((name, frozenset(labels.items())))
+
+    def test_rpc_counts(self):
+        self.sch.add_task(worker=WORKER, task_id='A')
+        self.sch.add_task(worker=WORKER, task_id='B')
+        self.sch.get_work(worker=WORKER)
+        self.sch.batch([{'name': 'add_task', 'kwargs': {'worker': WORKER, 'task_id': 'C'}}])
+        self.assertEqual(self.sample('luigi_scheduler_rpc_duration_seconds_count', method='add_task'), 3)
+        self.assertEqual(self.sample('luigi_scheduler_rpc_duration_seconds_count', method='get_work'), 1)
+        self.assertEqual(self.sample('luigi_scheduler_rpc_duration_seconds_count', method='batch'), 1)
+        # called by get_work
+        self.assertEqual(self.sample('luigi_scheduler_rpc_duration_seconds_count', method='count_pending'), 1)
+
+    def test_rpc_latency_buckets(self):
+        times = iter([10.0, 10.003, 20.0, 40.0])
+        with mock.patch('time.time', lambda: next(times)):
+            self.sch.is_paused()
+            self.sch.is_paused()
+        le = dict(('{:g}'.format(bound), bound) for bound in self.sch._state._metrics_collector.RPC_BUCKETS)
+        le['+Inf'] = float('inf')
+        metrics = self.metrics()
+        buckets = dict((dict(labels)['le'], value) for (name, labels), value in metrics.items()
+                       if name == 'luigi_scheduler_rpc_duration_seconds_bucket' and
+                       dict(labels)['method'] == 'is_paused')
+        self.assertEqual(set(buckets), set(le))
+        for bound, count in buckets.items():
+            expected = (le[bound] >= 0.003) + (le[bound] >= 20.0)
+            self.assertEqual(count, expected, bound)
+        self.assertAlmostEqual(self.sample('luigi_scheduler_rpc_duration_seconds_sum', method='is_paused'), 20.003)
+
+    def test_failing_rpc_recorded(self):
+        self.assertRaises(ValueError, self.sch.batch, [{'name': 'missing'}])
+        self.assertEqual(self.sample('luigi_scheduler_rpc_duration_seconds_count', method='batch'), 1)
+
+    def test_transitions(self):
+        self.sch.add_task(worker=WORKER, task_id='A')
+        self.sch.add_task(worker=WORKER, task_id='B')
+        self.sch.add_task(worker=WORKER, task_id='C', status=DONE)
+        self.assertEqual(self.sch.get_work(worker=WORKER)['task_id'], 'A')
+        self.sch.add_task(worker=WORKER, task_id='A', status=DONE)
+        self.assertEqual(self.sch.get_work(worker=WORKER)['task_id'], 'B')
+        self.sch.add_task(worker=WORKER, task_id='B', status=FAILED)
+        # no transition
+        self.sch.add_task(worker=WORKER, task_id='C', status=DONE)
+
+        transitions = dict(
+            ((dict(labels)['from'], dict(labels)['to']), value)
+            for (name, labels), value in self.metrics().items()
+            if name == 'luigi_scheduler_task_transitions_total')
+        self.assertEqual(transitions, {
+            (PENDING, DONE): 1,
+            (PENDING, RUNNING): 2,
+            (RUNNING, DONE): 1,
+            (RUNNING, FAILED): 1,
+        })
+
+    def test_state_gauges(self):
+        self.sch.add_task(worker=WORKER, task_id='A', family='F', resources={'r': 1})
+        self.sch.add_task(worker=WORKER, task_id='B', family='F')
+        self.sch.add_task(worker='other', task_id='C', family='a"b\\c\nd')
+        self.sch.add_task(worker=WORKER, task_id='D', status=DONE)
+        self.assertEqual(self.sch.get_work(worker=WORKER)['task_id'], 'A')
+
+        self.assertEqual(self.sample('luigi_scheduler_tasks', status=PENDING), 2)
+        self.assertEqual(self.sample('luigi_scheduler_tasks', status=RUNNING), 1)
+        self.assertEqual(self.sample('luigi_scheduler_tasks', status=DONE), 1)
+        self.assertEqual(self.sample('luigi_scheduler_family_tasks', family='F', status=RUNNING), 1)
+        self.assertEqual(self.sample('luigi_scheduler_family_tasks', family='F', status=PENDING), 1)
+        self.assertEqual(self.sample('luigi_scheduler_family_tasks', family='a"b\\c\nd', status=PENDING), 1)
+        self.assertEqual(self.sample('luigi_scheduler_resources_used', resource='r'), 1)
+        self.assertEqual(self.sample('luigi_scheduler_workers'), 2)
+
+    def test_empty(self):
+        metrics = self.metrics()
+        self.assertEqual(metrics, {('luigi_scheduler_workers', frozenset()): 0})
+
+    def test_content_type(self):
+        handler = mock.Mock()
+        self.sch._state._metrics_collector.configure_http_handler(handler)
+        handler.set_header.assert_called_once_with('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
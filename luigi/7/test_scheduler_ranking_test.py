@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import random
+import time
+from helpers import unittest
+
+import luigi.notifications
+from luigi.scheduler import DISABLED, DONE, FAILED, PENDING, RUNNING, \
+    RankedTasks, Scheduler, Task, _get_empty_retry_policy
+
+luigi.notifications.DEBUG = True
+WORKER = 'myworker'
+
+
+class RankedTasksTest(unittest.TestCase):
+
+    def make_task(self, task_id, priority, t):
+        task = Task(task_id, PENDING, [], priority=priority,
+                    retry_policy=_get_empty_retry_policy())
+        task.time = t
+        return task
+
+    def test_order(self):
+        tasks = [self.make_task('A', 0, 3), self.make_task('B', 1, 4),
+                 self.make_task('C', 1, 2), self.make_task('D', -1, 1)]
+        ranked = RankedTasks(tasks[:2])
+        for task in tasks[2:]:
+            ranked.add(task)
+        self.assertEqual([t.id for t in ranked], ['C', 'B', 'A', 'D'])
+        self.assertEqual(len(ranked), 4)
+        self.assertIn('A', ranked)
+
+    def test_update_and_discard(self):
+        tasks = [self.make_task(str(i), 0, i) for i in range(10)]
+        ranked = RankedTasks(tasks)
+        tasks[9].priority = 10
+        ranked.add(tasks[9])
+        ranked.discard('0')
+        ranked.discard('missing')
+        self.assertEqual([t.id for t in ranked], ['9'] + [str(i) for i in range(1, 9)])
+        self.assertNotIn('0', ranked)
+
+    def test_outdated_entries_compacted(self):
+        task = self.make_task('A', 0, 0)
+        ranked = RankedTasks([task])
+        for priority in range(1000):
+            task.priority = priority
+            ranked.add(task)
+        self.assertLessEqual(len(ranked._heap), 2 * len(ranked) + 64)
+        self.assertEqual(list(ranked), [task])
+
+
+class SchedulerRankingTest(unittest.TestCase):
+
+    def setUp(self):
+        super(SchedulerRankingTest, self).setUp()
+        self.sch = Scheduler(retry_delay=0.0, remove_delay=0.0, worker_disconnect_delay=10,
+                             disable_persist=10, disable_window=10, retry_count=3,
+                             resources={'r': 3})
+        self.time = time.time
+
+    def tearDown(self):
+        super(SchedulerRankingTest, self).tearDown()
+        time.time = self.time
+
+    def setTime(self, t):
+        time.time = lambda: t
+
+    def sorted_ranking(self):
+        """What get_work ranked before the index: all schedulable and RUNNING tasks, sorted"""
+        state = self.sch._state
+        tasks = [task for task in state.get_active_tasks_by_status(PENDING, RUNNING)
+                 if task.status == RUNNING or self.sch._schedulable(task)]
+        return sorted(tasks, key=self.sch._rank, reverse=True)
+
+    def assertRankingUnchanged(self):
+        ranked = list(self.sch._state.get_schedulable_tasks_by_rank())
+        expected = self.sorted_ranking()
+        self.assertEqual(set(t.id for t in ranked), set(t.id for t in expected))
+        # tasks of equal rank used to come in task creation order
+        self.assertEqual([self.sch._rank(t) for t in ranked],
+                         [self.sch._rank(t) for t in expected])
+
+    def assertCountersCorrect(self):
+        state = self.sch._state
+        for task in state.get_active_tasks():
+            unfinished = sum(1 for dep in task.deps
+                             if getattr(state.get_task(dep), 'status', None) != DONE)
+            self.assertEqual(state._unfinished_deps[task.id], unfinished, task.id)
+            for dep in task.deps:
+                self.assertIn(task.id, state._dependents[dep])
+        self.assertEqual(set(state._unfinished_deps), set(t.id for t in state.get_active_tasks()))
+        for dep, dependents in state._dependents.items():
+            self.assertTrue(dependents)
+            for task_id in dependents:
+                self.assertIn(dep, state.get_task(task_id).deps)
+
+    def test_priority_then_age(self):
+        self.setTime(1)
+        self.sch.add_task(worker=WORKER, task_id='A', priority=1)
+        self.setTime(2)
+        self.sch.add_task(worker=WORKER, task_id='B', priority=2)
+        self.sch.add_task(worker=WORKER, task_id='C', priority=1)
+        self.assertEqual([t.id for t in self.sch._state.get_schedulable_tasks_by_rank()],
+                         ['B', 'A', 'C'])
+        self.assertRankingUnchanged()
+
+        # C inherits the priority of D
+        self.sch.add_task(worker=WORKER, task_id='D', priority=3, deps=['C'])
+        self.assertEqual([t.id for t in self.sch._state.get_schedulable_tasks_by_rank()],
+                         ['C', 'B', 'A'])
+        self.assertRankingUnchanged()
+        self.assertEqual(self.sch.get_work(worker=WORKER)['task_id'], 'C')
+        self.sch.add_task(worker=WORKER, task_id='C', status=DONE)
+        self.assertRankingUnchanged()
+        self.assertEqual(self.sch.get_work(worker=WORKER)['task_id'], 'D')
+        self.assertEqual(self.sch.get_work(worker=WORKER)['task_id'], 'B')
+        self.assertEqual([t.id for t in self.sch._state.get_schedulable_tasks_by_rank()],
+                         ['D', 'B', 'A'])
+
+    def test_counters_after_status_changes(self):
+        self.sch.add_task(worker=WORKER, task_id='C', deps=['A', 'B'])
+        self.assertCountersCorrect()
+        self.sch.add_task(worker=WORKER, task_id='A', status=DONE)
+        self.assertCountersCorrect()
+        self.assertNotIn('C', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+        self.sch.add_task(worker=WORKER, task_id='B', status=DONE)
+        self.assertCountersCorrect()
+        self.assertRankingUnchanged()
+        self.assertIn('C', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+
+        # a dependency that has to run again
+        self.sch.add_task(worker=WORKER, task_id='B', status=PENDING)
+        self.assertCountersCorrect()
+        self.assertRankingUnchanged()
+        self.assertNotIn('C', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+
+        self.sch.add_task(worker=WORKER, task_id='C', new_deps=['D'])
+        self.sch.add_task(worker=WORKER, task_id='B', status=FAILED)
+        self.sch.add_task(worker=WORKER, task_id='A', status=DISABLED)
+        self.assertCountersCorrect()
+        self.assertRankingUnchanged()
+
+    def test_counters_after_task_removal(self):
+        self.sch.add_task(worker='other', task_id='B', deps=['A'])
+        self.sch.add_task(worker=WORKER, task_id='A', status=DONE)
+        self.assertIn('B', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+
+        # B is removed once its only stakeholder is gone
+        self.setTime(time.time() + 100)
+        self.sch.ping(worker=WORKER)
+        self.sch.prune()
+        self.assertFalse(self.sch._state.has_task('B'))
+        self.assertTrue(self.sch._state.has_task('A'))
+        self.assertCountersCorrect()
+        self.assertEqual(list(self.sch._state.get_schedulable_tasks_by_rank()), [])
+
+    def test_counters_after_dependency_removal(self):
+        self.sch.add_task(worker=WORKER, task_id='B', deps=['A'])
+        self.sch.add_task(worker=WORKER, task_id='A', status=DONE)
+        self.assertIn('B', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+
+        self.sch._state.inactivate_tasks(['A'])
+        self.assertCountersCorrect()
+        self.assertRankingUnchanged()
+        self.assertNotIn('B', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+
+        self.sch.add_task(worker=WORKER, task_id='A', status=DONE)
+        self.assertCountersCorrect()
+        self.assertIn('B', [t.id for t in self.sch._state.get_schedulable_tasks_by_rank()])
+
+    def test_random_operations(self):
+        rnd = random.Random(3)
+        for step in range(2000):
+            op = rnd.random()
+            task_id = 'T%d' % rnd.randrange(40)
+            worker = 'W%d' % rnd.randrange(3)
+            if op < 0.4:
+                deps = ['T%d' % rnd.randrange(40) for _ in range(rnd.randrange(3))]
+                self.sch.add_task(
+                    worker=worker, task_id=task_id,
+                    deps=deps if rnd.random() < 0.7 else None,
+                    new_deps=['T%d' % rnd.randrange(40)] if rnd.random() < 0.1 else None,
+                    priority=rnd.randrange(4),
+                    resources={'r': 1} if rnd.random() < 0.3 else None)
+            elif op < 0.6:
+                self.sch.add_task(worker=worker, task_id=task_id,
+                                  status=rnd.choice([DONE, FAILED, PENDING, DISABLED]))
+            elif op < 0.8:
+                reply = self.sch.get_work(worker=worker)
+                if reply['task_id'] and rnd.random() < 0.5:
+                    self.sch.add_task(worker=worker, task_id=reply['task_id'],
+                                      status=rnd.choice([DONE, FAILED]))
+            elif op < 0.82:
+                self.setTime(self.time() + step)
+                self.sch.prune()
+            else:
+                self.sch.forgive_failures(task_id=task_id)
+            self.assertRankingUnchanged()
+        self.assertCountersCorrect()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from helpers import unittest
+
+import luigi.notifications
+from luigi.scheduler import DONE, FAILED, PENDING, Scheduler
+
+luigi.notifications.DEBUG = True
+WORKER = 'myworker'
+
+
+class TaskListPaginationTest(unittest.TestCase):
+
+    def setUp(self):
+        super(TaskListPaginationTest, self).setUp()
+        self.sch = Scheduler(retry_delay=100, remove_delay=1000, worker_disconnect_delay=10,
+                             max_shown_tasks=10)
+        for i in range(30):
+            self.sch.add_task(worker=WORKER if i % 3 else 'other', task_id='F(%02d)' % i, family='F',
+                              status=DONE if i % 2 else PENDING)
+        for i in range(5):
+            self.sch.add_task(worker=WORKER, task_id='G(%02d)' % i, family='G')
+
+    def pages(self, page_size, **kwargs):
+        pages = []
+        cursor = None
+        while True:
+            page = self.sch.task_list(page_size=page_size, cursor=cursor, **kwargs)
+            self.assertLessEqual(len(page['tasks']), page_size)
+            pages.append(sorted(page['tasks']))
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_pages(self):
+        pages = self.pages(7)
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 7, 7])
+        self.assertEqual(sum(pages, []), sorted(self.sch.task_list(limit=False)))
+
+    def test_last_page_full(self):
+        pages = self.pages(5, family='G')
+        self.assertEqual(pages, [['G(%02d)' % i for i in range(5)]])
+
+    def test_same_tasks_as_unpaginated(self):
+        for kwargs in [{'status': PENDING}, {'family': 'F'}, {'worker': WORKER},
+                       {'family': 'F', 'worker': 'other', 'status': DONE},
+                       {'worker': WORKER, 'status': PENDING}, {'search': '1'}, {'family': 'missing'},
+                       {'worker': 'missing'}]:
+            expected = self.sch.task_list(limit=False, **kwargs)
+            pages = self.pages(4, **kwargs)
+            self.assertEqual(sum(pages, []), sorted(expected), kwargs)
+            # without page_size, long lists are still replaced by a count
+            if len(expected) > 10:
+                self.assertEqual(self.sch.task_list(**kwargs), {'num_tasks': len(expected)})
+
+    def test_serialized_like_unpaginated(self):
+        page = self.sch.task_list(family='G', page_size=2)
+        expected = self.sch.task_list(family='G')
+        for task_id, task in page['tasks'].items():
+            self.assertEqual(task, expected[task_id])
+
+    def test_family_index_follows_changes(self):
+        # dependencies are known without a family until they are added themselves
+        self.sch.add_task(worker=WORKER, task_id='G(05)', family='G', deps=['H(00)'])
+        self.assertEqual(list(self.sch.task_list(family='')), ['H(00)'])
+        self.sch.add_task(worker=WORKER, task_id='H(00)', family='H', status=FAILED)
+        self.assertEqual(self.sch.task_list(family=''), {})
+        self.assertEqual(list(self.sch.task_list(family='H', status=FAILED)), ['H(00)'])
+        self.assertEqual(len(self.sch.task_list(family='G')), 6)
+
+
+class GraphMaxDepthTest(unittest.TestCase):
+
+    def setUp(self):
+        super(GraphMaxDepthTest, self).setUp()
+        self.sch = Scheduler(retry_delay=100, remove_delay=1000, worker_disconnect_delay=10)
+        # A -> B -> C -> D, and A -> C
+        self.sch.add_task(worker=WORKER, task_id='A', family='T', deps=['B', 'C'])
+        self.sch.add_task(worker=WORKER, task_id='B', family='T', deps=['C'])
+        self.sch.add_task(worker=WORKER, task_id='C', family='T', deps=['D'], status=DONE)
+        self.sch.add_task(worker=WORKER, task_id='D', family='T', status=DONE)
+
+    def test_dep_graph(self):
+        self.assertEqual(sorted(self.sch.dep_graph('A', max_depth=0)), ['A'])
+        self.assertEqual(sorted(self.sch.dep_graph('A', max_depth=1)), ['A', 'B', 'C'])
+        self.assertEqual(sorted(self.sch.dep_graph('A', max_depth=2)), ['A', 'B', 'C', 'D'])
+        self.assertEqual(self.sch.dep_graph('A', max_depth=100), self.sch.dep_graph('A'))
+
+    def test_dep_graph_edges_kept(self):
+        graph = self.sch.dep_graph('A', max_depth=1)
+        # the nodes at the depth limit still list their dependencies
+        self.assertEqual(graph['C']['deps'], ['D'])
+
+    def test_dep_graph_include_done(self):
+        self.assertEqual(sorted(self.sch.dep_graph('A', include_done=False, max_depth=1)), ['A', 'B'])
+
+    def test_inverse_dep_graph(self):
+        self.assertEqual(sorted(self.sch.inverse_dep_graph('D', max_depth=1)), ['C', 'D'])
+        self.assertEqual(sorted(self.sch.inverse_dep_graph('D', max_depth=2)), ['A', 'B', 'C', 'D'])
+        self.assertEqual(self.sch.inverse_dep_graph('D', max_depth=3), self.sch.inverse_dep_graph('D'))
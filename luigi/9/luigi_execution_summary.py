@@ -19,11 +19,18 @@ This module provide the function :py:func:`summary` that is used for printing
 an `execution summary
 <https://github.com/spotify/luigi/blob/master/examples/execution_summary_example.py>`_
 at the end of luigi invocations.
+
+The statuses reported in the worker's ``add_task`` calls are aggregated one
+call at a time, into groups of tasks by status and family that keep their
+tasks ordered and the ranges of their parameter values. Printing the summary
+then only looks at the groups that are printed, and at the tasks left pending.
 """
 
 import textwrap
 import collections
 import functools
+import heapq
+import itertools
 
 import luigi
 
@@ -32,24 +39,220 @@ class execution_summary(luigi.Config):
     summary_length = luigi.IntParameter(default=5)
 
 
+class _ParamValues(object):
+    """
+    The distinct values of a parameter in a group of tasks, with the values starting and
+    ending their runs of consecutive values (see ``Parameter.next_in_enumeration``).
+    """
+
+    def __init__(self, param_class):
+        self._param_class = param_class
+        self._counts = collections.Counter()
+        self._next = {}  # map from value to the next value in the enumeration
+        self._prev = collections.defaultdict(set)  # map from value to the values it is next to
+        self._starts = set()
+        self._ends = set()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def add(self, value):
+        self._counts[value] += 1
+        if self._counts[value] > 1:
+            return
+        next_value = self._param_class.next_in_enumeration(value)
+        self._next[value] = next_value
+        self._prev[next_value].add(value)
+        if not self._prev.get(value):
+            self._starts.add(value)
+        self._starts.discard(next_value)
+        if next_value not in self._counts:
+            self._ends.add(value)
+        self._ends.difference_update(self._prev.get(value, ()))
+
+    def discard(self, value):
+        self._counts[value] -= 1
+        if self._counts[value] > 0:
+            return
+        del self._counts[value]
+        next_value = self._next.pop(value)
+        self._prev[next_value].discard(value)
+        if not self._prev[next_value]:
+            del self._prev[next_value]
+        self._starts.discard(value)
+        self._ends.discard(value)
+        if next_value in self._counts and not self._prev.get(next_value):
+            self._starts.add(next_value)
+        self._ends.update(self._prev.get(value, ()))
+
+    def range(self):
+        """
+        Returns the first and last values if they form a continuous range, else (None, None)
+        """
+        if len(self._starts) != 1:
+            return None, None
+        # values are usually followed by different values, so this stops early if
+        # there are several runs
+        missing = set()
+        for value in self._ends:
+            missing.add(self._next[value])
+            if len(missing) > 1:
+                return None, None
+        if not missing:
+            return None, None
+        return next(iter(self._starts)), next(iter(self._ends))
+
+
+class _TaskGroup(object):
+    """
+    The tasks of a family that have the same status, ordered by their string
+    representation, and the values of each of their parameters.
+    """
+
+    def __init__(self):
+        self._tasks = {}  # map from task to the sequence number of its heap entry
+        self._heap = []  # may also contain entries of tasks that were removed
+        self._sequence = itertools.count()
+        self.params = None  # list of (param_name, param_obj, _ParamValues) set by the first task
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def add(self, task, name=None):
+        """
+        Adds the task, whose string representation can be given if it is already known
+        """
+        if task in self._tasks:
+            return
+        if self.params is None:
+            self.params = [(param_name, param_obj, _ParamValues(param_obj))
+                           for param_name, param_obj in task.get_params()]
+        sequence = next(self._sequence)
+        self._tasks[task] = sequence
+        heapq.heappush(self._heap, (str(task) if name is None else name, sequence, task))
+        for param_name, _, values in self.params:
+            values.add(getattr(task, param_name))
+
+    def discard(self, task):
+        if self._tasks.pop(task, None) is None:
+            return
+        for param_name, _, values in self.params:
+            values.discard(getattr(task, param_name))
+        if len(self._heap) > 2 * len(self._tasks) + 64:
+            self._heap = [entry for entry in self._heap if self._tasks.get(entry[2]) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def first(self, n):
+        """
+        Returns the first n tasks, ordered by their string representation
+        """
+        tasks, entries = [], []
+        while self._heap and len(tasks) < n:
+            entry = heapq.heappop(self._heap)
+            if self._tasks.get(entry[2]) == entry[1]:
+                entries.append(entry)
+                tasks.append(entry[2])
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+        return tasks
+
+
+class _TaskStatuses(object):
+    """
+    Aggregates the statuses reported for each task, one add_task call at a time.
+
+    Each task is kept in the sets of the statuses it has so far, and in the groups
+    of these statuses by task family.
+    """
+
+    STATUSES = ("already_done", "completed", "ever_failed", "failed", "scheduling_error",
+                "still_pending_ext", "still_pending_not_ext")
+
+    def __init__(self):
+        self._reported = {}  # map from task to the set of reported statuses
+        self._names = {}  # map from task to its string representation, used to order the groups
+        self.tasks = dict((status, set()) for status in self.STATUSES)
+        self.groups = dict((status, {}) for status in self.STATUSES)
+        self.num_calls = 0
+
+    def add(self, task, status, runnable):
+        if status == 'PENDING':
+            # tasks that aren't runnable are external dependencies that are missing
+            status = 'PENDING' if runnable else 'PENDING_EXT'
+        elif status not in ('DONE', 'FAILED', 'UNKNOWN'):
+            return
+        reported = self._reported.setdefault(task, set())
+        if status in reported:
+            return
+        before = self._statuses(reported)
+        reported.add(status)
+        after = self._statuses(reported)
+        for name in before - after:
+            self.tasks[name].discard(task)
+            group = self.groups[name][task.task_family]
+            group.discard(task)
+            if not group:
+                del self.groups[name][task.task_family]
+        for name in after - before:
+            self.tasks[name].add(task)
+            if task not in self._names:
+                self._names[task] = str(task)
+            self.groups[name].setdefault(task.task_family, _TaskGroup()).add(task, self._names[task])
+
+    @staticmethod
+    def _statuses(reported):
+        pending = 'PENDING' in reported or 'PENDING_EXT' in reported
+        completed = 'DONE' in reported and pending
+        statuses = set()
+        if completed:
+            statuses.add("completed")
+        elif 'DONE' in reported:
+            statuses.add("already_done")
+        if 'FAILED' in reported:
+            statuses.add("ever_failed")
+            if not completed:
+                statuses.add("failed")
+        if 'UNKNOWN' in reported:
+            statuses.add("scheduling_error")
+        if not completed and 'FAILED' not in reported:
+            if 'PENDING_EXT' in reported:
+                statuses.add("still_pending_ext")
+            if 'PENDING' in reported:
+                statuses.add("still_pending_not_ext")
+        return statuses
+
+
+def _task_statuses(worker):
+    """
+    Returns the _TaskStatuses of the worker, with the add_task calls the worker made
+    since the last time added to it.
+
+    It can also be called while the worker runs, so that only the last calls are left
+    to add when the summary is printed.
+    """
+    statuses = getattr(worker, '_task_statuses', None)
+    if statuses is None:
+        statuses = worker._task_statuses = _TaskStatuses()
+    history = worker._add_task_history
+    for i in range(statuses.num_calls, len(history)):
+        task, status, runnable = history[i]
+        statuses.add(task, status, runnable)
+    statuses.num_calls = len(history)
+    return statuses
+
+
 def _partition_tasks(worker):
     """
     Takes a worker and sorts out tasks based on their status.
     Still_pending_not_ext is only used to get upstream_failure, upstream_missing_dependency and run_by_other_worker
+
+    The sets of the reported statuses are the ones kept up to date by the worker's
+    _TaskStatuses, and must not be modified.
     """
-    task_history = worker._add_task_history
-    pending_tasks = {task for(task, status, ext) in task_history if status == 'PENDING'}
-    set_tasks = {}
-    set_tasks["completed"] = {task for (task, status, ext) in task_history if status == 'DONE' and task in pending_tasks}
-    set_tasks["already_done"] = {task for (task, status, ext) in task_history
-                                 if status == 'DONE' and task not in pending_tasks and task not in set_tasks["completed"]}
-    set_tasks["ever_failed"] = {task for (task, status, ext) in task_history if status == 'FAILED'}
-    set_tasks["failed"] = set_tasks["ever_failed"] - set_tasks["completed"]
-    set_tasks["scheduling_error"] = {task for(task, status, ext) in task_history if status == 'UNKNOWN'}
-    set_tasks["still_pending_ext"] = {task for (task, status, ext) in task_history
-                                      if status == 'PENDING' and task not in set_tasks["ever_failed"] and task not in set_tasks["completed"] and not ext}
-    set_tasks["still_pending_not_ext"] = {task for (task, status, ext) in task_history
-                                          if status == 'PENDING' and task not in set_tasks["ever_failed"] and task not in set_tasks["completed"] and ext}
+    set_tasks = dict(_task_statuses(worker).tasks)
     set_tasks["run_by_other_worker"] = set()
     set_tasks["upstream_failure"] = set()
     set_tasks["upstream_missing_dependency"] = set()
@@ -78,32 +281,55 @@ def _populate_unknown_statuses(set_tasks):
 def _depth_first_search(set_tasks, current_task, visited):
     """
     This dfs checks why tasks are still pending.
+
+    It keeps its own stack so that long dependency chains don't hit the recursion limit.
     """
-    visited.add(current_task)
-    if current_task in set_tasks["still_pending_not_ext"]:
-        upstream_failure = False
-        upstream_missing_dependency = False
-        upstream_run_by_other_worker = False
-        upstream_scheduling_error = False
-        for task in current_task._requires():
-            if task not in visited:
-                _depth_first_search(set_tasks, task, visited)
-            if task in set_tasks["ever_failed"] or task in set_tasks["upstream_failure"]:
-                set_tasks["upstream_failure"].add(current_task)
-                upstream_failure = True
-            if task in set_tasks["still_pending_ext"] or task in set_tasks["upstream_missing_dependency"]:
-                set_tasks["upstream_missing_dependency"].add(current_task)
-                upstream_missing_dependency = True
-            if task in set_tasks["run_by_other_worker"] or task in set_tasks["upstream_run_by_other_worker"]:
-                set_tasks["upstream_run_by_other_worker"].add(current_task)
-                upstream_run_by_other_worker = True
-            if task in set_tasks["scheduling_error"]:
-                set_tasks["upstream_scheduling_error"].add(current_task)
-                upstream_scheduling_error = True
-        if not upstream_failure and not upstream_missing_dependency and \
-                not upstream_run_by_other_worker and not upstream_scheduling_error and \
-                current_task not in set_tasks["run_by_other_worker"]:
-            set_tasks["not_run"].add(current_task)
+    def push(task):
+        visited.add(task)
+        if task in set_tasks["still_pending_not_ext"]:
+            deps = iter(task._requires())
+        else:
+            deps = iter(())
+        stack.append((task, deps, [False]))
+
+    stack = []
+    push(current_task)
+    while stack:
+        task, deps, upstream = stack[-1]
+        for dep in deps:
+            if dep not in visited:
+                push(dep)
+                break
+            upstream[0] |= _mark_upstream(set_tasks, task, dep)
+        else:
+            stack.pop()
+            if task in set_tasks["still_pending_not_ext"] and not upstream[0] and \
+                    task not in set_tasks["run_by_other_worker"]:
+                set_tasks["not_run"].add(task)
+            if stack:
+                parent, _, parent_upstream = stack[-1]
+                parent_upstream[0] |= _mark_upstream(set_tasks, parent, task)
+
+
+def _mark_upstream(set_tasks, current_task, task):
+    """
+    Adds current_task to the upstream_* sets explained by its dependency task.
+    Returns True if any of them applied.
+    """
+    marked = False
+    if task in set_tasks["ever_failed"] or task in set_tasks["upstream_failure"]:
+        set_tasks["upstream_failure"].add(current_task)
+        marked = True
+    if task in set_tasks["still_pending_ext"] or task in set_tasks["upstream_missing_dependency"]:
+        set_tasks["upstream_missing_dependency"].add(current_task)
+        marked = True
+    if task in set_tasks["run_by_other_worker"] or task in set_tasks["upstream_run_by_other_worker"]:
+        set_tasks["upstream_run_by_other_worker"].add(current_task)
+        marked = True
+    if task in set_tasks["scheduling_error"]:
+        set_tasks["upstream_scheduling_error"].add(current_task)
+        marked = True
+    return marked
 
 
 def _get_str(task_dict, extra_indent):
@@ -113,10 +339,11 @@ def _get_str(task_dict, extra_indent):
     summary_length = execution_summary().summary_length
 
     lines = []
-    task_names = sorted(task_dict.keys())
+    if summary_length > 0:
+        task_names = heapq.nsmallest(summary_length + 1, task_dict.keys())
+    else:
+        task_names = sorted(task_dict.keys())
     for task_family in task_names:
-        tasks = task_dict[task_family]
-        tasks = sorted(tasks, key=lambda x: str(x))
         prefix_size = 8 if extra_indent else 4
         prefix = ' ' * prefix_size
 
@@ -126,42 +353,40 @@ def _get_str(task_dict, extra_indent):
             line = prefix + "..."
             lines.append(line)
             break
+        group = task_dict[task_family]
+        tasks = group.first(2)
         if len(tasks[0].get_params()) == 0:
-            line = prefix + '- {0} {1}()'.format(len(tasks), str(task_family))
+            line = prefix + '- {0} {1}()'.format(len(group), str(task_family))
         elif _get_len_of_params(tasks[0]) > 60 or len(str(tasks[0])) > 200 or \
-                (len(tasks) == 2 and len(tasks[0].get_params()) > 1 and (_get_len_of_params(tasks[0]) > 40 or len(str(tasks[0])) > 100)):
+                (len(group) == 2 and len(tasks[0].get_params()) > 1 and (_get_len_of_params(tasks[0]) > 40 or len(str(tasks[0])) > 100)):
             """
             This is to make sure that there is no really long task in the output
             """
-            line = prefix + '- {0} {1}(...)'.format(len(tasks), task_family)
+            line = prefix + '- {0} {1}(...)'.format(len(group), task_family)
         elif len((tasks[0].get_params())) == 1:
-            attributes = {getattr(task, tasks[0].get_params()[0][0]) for task in tasks}
-            param_class = tasks[0].get_params()[0][1]
-            first, last = _ranging_attributes(attributes, param_class)
+            param_name, param_class, attributes = group.params[0]
+            first, last = attributes.range()
             if first is not None and last is not None and len(attributes) > 3:
                 param_str = '{0}...{1}'.format(param_class.serialize(first), param_class.serialize(last))
             else:
-                param_str = '{0}'.format(_get_str_one_parameter(tasks))
-            line = prefix + '- {0} {1}({2}={3})'.format(len(tasks), task_family, tasks[0].get_params()[0][0], param_str)
+                param_str = '{0}'.format(_get_str_one_parameter(group))
+            line = prefix + '- {0} {1}({2}={3})'.format(len(group), task_family, param_name, param_str)
         else:
             ranging = False
-            params = _get_set_of_params(tasks)
-            unique_param_keys = list(_get_unique_param_keys(params))
-            if len(unique_param_keys) == 1:
-                unique_param, = unique_param_keys
-                attributes = params[unique_param]
-                param_class = unique_param[1]
-                first, last = _ranging_attributes(attributes, param_class)
+            unique_params = [param for param in group.params if len(param[2]) > 1]
+            if len(unique_params) == 1:
+                (param_name, param_class, attributes), = unique_params
+                first, last = attributes.range()
                 if first is not None and last is not None and len(attributes) > 2:
                     ranging = True
-                    line = prefix + '- {0} {1}({2}'.format(len(tasks), task_family, _get_str_ranging_multiple_parameters(first, last, tasks, unique_param))
+                    line = prefix + '- {0} {1}({2}'.format(len(group), task_family, _get_str_ranging_multiple_parameters(first, last, tasks, (param_name, param_class)))
             if not ranging:
-                if len(tasks) == 1:
-                    line = prefix + '- {0} {1}'.format(len(tasks), tasks[0])
-                if len(tasks) == 2:
-                    line = prefix + '- {0} {1} and {2}'.format(len(tasks), tasks[0], tasks[1])
-                if len(tasks) > 2:
-                    line = prefix + '- {0} {1} ...'.format(len(tasks), tasks[0])
+                if len(group) == 1:
+                    line = prefix + '- {0} {1}'.format(len(group), tasks[0])
+                if len(group) == 2:
+                    line = prefix + '- {0} {1} and {2}'.format(len(group), tasks[0], tasks[1])
+                if len(group) > 2:
+                    line = prefix + '- {0} {1} ...'.format(len(group), tasks[0])
         lines.append(line)
     return '\n'.join(lines)
 
@@ -185,43 +410,17 @@ def _get_str_ranging_multiple_parameters(first, last, tasks, unique_param):
     return row
 
 
-def _get_set_of_params(tasks):
-    params = {}
-    for param in tasks[0].get_params():
-        params[param] = {getattr(task, param[0]) for task in tasks}
-    return params
-
-
-def _get_unique_param_keys(params):
-    for param_key, param_values in params.items():
-        if len(param_values) > 1:
-            yield param_key
-
-
-def _ranging_attributes(attributes, param_class):
-    """
-    Checks if there is a continuous range
-    """
-    next_attributes = {param_class.next_in_enumeration(attribute) for attribute in attributes}
-    in_first = attributes.difference(next_attributes)
-    in_second = next_attributes.difference(attributes)
-    if len(in_first) == 1 and len(in_second) == 1:
-        for x in attributes:
-            if {param_class.next_in_enumeration(x)} == in_second:
-                return next(iter(in_first)), x
-    return None, None
-
-
-def _get_str_one_parameter(tasks):
+def _get_str_one_parameter(group):
     row = ''
     count = 0
-    for task in tasks:
-        if (len(row) >= 30 and count > 2 and count != len(tasks) - 1) or len(row) > 200:
+    # the row is cut after 200 characters, and every task but the last adds a comma to it
+    for task in group.first(202):
+        if (len(row) >= 30 and count > 2 and count != len(group) - 1) or len(row) > 200:
             row += '...'
             break
         param = task.get_params()[0]
         row += '{0}'.format(param[1].serialize(getattr(task, param[0])))
-        if count < len(tasks) - 1:
+        if count < len(group) - 1:
             row += ','
         count += 1
     return row
@@ -319,15 +518,14 @@ def _get_external_workers(worker):
 
 def _group_tasks_by_name_and_status(task_dict):
     """
-    Takes a dictionary with sets of tasks grouped by their status and
-    returns a dictionary with dictionaries with an array of tasks grouped by
-    their status and task name
+    Takes a set of tasks with the same status and returns a dictionary
+    with the _TaskGroup of each task name
     """
     group_status = {}
     for task in task_dict:
         if task.task_family not in group_status:
-            group_status[task.task_family] = []
-        group_status[task.task_family].append(task)
+            group_status[task.task_family] = _TaskGroup()
+        group_status[task.task_family].add(task)
     return group_status
 
 
@@ -339,9 +537,13 @@ def _summary_dict(worker):
 
 
 def _summary_format(set_tasks, worker):
+    statuses = _task_statuses(worker)
     group_tasks = {}
     for status, task_dict in set_tasks.items():
-        group_tasks[status] = _group_tasks_by_name_and_status(task_dict)
+        if task_dict is statuses.tasks.get(status):
+            group_tasks[status] = statuses.groups[status]
+        else:
+            group_tasks[status] = _group_tasks_by_name_and_status(task_dict)
     comments = _get_comments(group_tasks)
     num_all_tasks = sum([len(set_tasks["already_done"]),
                          len(set_tasks["completed"]), len(set_tasks["failed"]),
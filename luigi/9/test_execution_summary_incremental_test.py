@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2015-2015 Spotify AB
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import datetime
+import random
+import time
+
+from helpers import LuigiTestCase
+import luigi
+import luigi.execution_summary
+from luigi.execution_summary import _ParamValues, _TaskGroup, _TaskStatuses
+
+
+class Numbered(luigi.Task):
+    num = luigi.IntParameter()
+
+
+class Dated(luigi.Task):
+    date = luigi.DateParameter()
+    name = luigi.Parameter(default='bar')
+
+
+class NoParams(luigi.Task):
+    pass
+
+
+class HistoryWorker(object):
+    """
+    Has what the execution summary uses of a worker
+    """
+
+    def __init__(self):
+        self._id = 'worker'
+        self._add_task_history = []
+        self._get_work_response_history = []
+        self._scheduled_tasks = {}
+
+
+def _ranging_attributes(attributes, param_class):
+    """
+    How the ranges used to be found, by going over all the values
+    """
+    next_attributes = {param_class.next_in_enumeration(attribute) for attribute in attributes}
+    in_first = attributes.difference(next_attributes)
+    in_second = next_attributes.difference(attributes)
+    if len(in_first) == 1 and len(in_second) == 1:
+        for x in attributes:
+            if {param_class.next_in_enumeration(x)} == in_second:
+                return next(iter(in_first)), x
+    return None, None
+
+
+def _partition(history):
+    """
+    How the tasks used to be partitioned, by going over the whole history
+    """
+    pending = {task for (task, status, runnable) in history if status == 'PENDING'}
+    set_tasks = {}
+    set_tasks["completed"] = {task for (task, status, runnable) in history if status == 'DONE' and task in pending}
+    set_tasks["already_done"] = {task for (task, status, runnable) in history if status == 'DONE' and task not in pending}
+    set_tasks["ever_failed"] = {task for (task, status, runnable) in history if status == 'FAILED'}
+    set_tasks["failed"] = set_tasks["ever_failed"] - set_tasks["completed"]
+    set_tasks["scheduling_error"] = {task for (task, status, runnable) in history if status == 'UNKNOWN'}
+    still_pending = pending - set_tasks["ever_failed"] - set_tasks["completed"]
+    set_tasks["still_pending_ext"] = {task for (task, status, runnable) in history
+                                      if status == 'PENDING' and not runnable and task in still_pending}
+    set_tasks["still_pending_not_ext"] = {task for (task, status, runnable) in history
+                                          if status == 'PENDING' and runnable and task in still_pending}
+    return set_tasks
+
+
+class ParamValuesTest(LuigiTestCase):
+
+    def test_range(self):
+        values = _ParamValues(luigi.IntParameter())
+        for i in [3, 1, 2, 5, 4]:
+            values.add(i)
+        self.assertEqual(values.range(), (1, 5))
+        self.assertEqual(len(values), 5)
+        values.discard(3)
+        self.assertEqual(values.range(), (None, None))
+        values.add(3)
+        self.assertEqual(values.range(), (1, 5))
+
+    def test_counts_duplicates(self):
+        values = _ParamValues(luigi.IntParameter())
+        for i in [1, 2, 2, 3]:
+            values.add(i)
+        values.discard(2)
+        self.assertEqual(values.range(), (1, 3))
+        values.discard(2)
+        self.assertEqual(values.range(), (None, None))
+        self.assertEqual(len(values), 2)
+
+    def test_not_enumerable(self):
+        values = _ParamValues(luigi.Parameter())
+        values.add('a')
+        self.assertEqual(values.range(), ('a', 'a'))
+        values.add('b')
+        self.assertEqual(values.range(), (None, None))
+
+    def test_same_as_scanning_values(self):
+        rnd = random.Random(5)
+        for param_class, make_value in [
+                (luigi.IntParameter(), int),
+                (luigi.DateParameter(), lambda i: datetime.date(2015, 1, 1) + datetime.timedelta(days=i)),
+                (luigi.Parameter(), str)]:
+            values = _ParamValues(param_class)
+            counts = {}
+            for _ in range(3000):
+                value = make_value(rnd.randrange(12))
+                if counts.get(value) and rnd.random() < 0.5:
+                    values.discard(value)
+                    counts[value] -= 1
+                else:
+                    values.add(value)
+                    counts[value] = counts.get(value, 0) + 1
+                attributes = {v for v, count in counts.items() if count}
+                self.assertEqual(len(values), len(attributes))
+                first, last = _ranging_attributes(attributes, param_class)
+                self.assertEqual(values.range(), (first, last))
+
+
+class TaskGroupTest(LuigiTestCase):
+
+    def test_first(self):
+        group = _TaskGroup()
+        for i in [3, 10, 1, 2]:
+            group.add(Numbered(num=i))
+        self.assertEqual(group.first(3), [Numbered(num=1), Numbered(num=10), Numbered(num=2)])
+        # first() doesn't remove the tasks
+        self.assertEqual(group.first(10), [Numbered(num=1), Numbered(num=10), Numbered(num=2), Numbered(num=3)])
+        group.discard(Numbered(num=10))
+        self.assertEqual(group.first(2), [Numbered(num=1), Numbered(num=2)])
+        self.assertEqual(len(group), 3)
+
+    def test_readded(self):
+        group = _TaskGroup()
+        group.add(Numbered(num=1))
+        group.discard(Numbered(num=1))
+        group.add(Numbered(num=1))
+        group.add(Numbered(num=1))
+        self.assertEqual(group.first(5), [Numbered(num=1)])
+        self.assertEqual(group.params[0][2].range(), (1, 1))
+
+    def test_removed_entries_compacted(self):
+        group = _TaskGroup()
+        group.add(Numbered(num=-1))
+        for i in range(1000):
+            group.add(Numbered(num=i))
+            group.discard(Numbered(num=i))
+        self.assertLessEqual(len(group._heap), 2 * len(group) + 64)
+        self.assertEqual(group.first(5), [Numbered(num=-1)])
+
+
+class TaskStatusesTest(LuigiTestCase):
+
+    def test_not_runnable_pending_is_missing_external_dependency(self):
+        statuses = _TaskStatuses()
+        statuses.add(Numbered(num=1), 'PENDING', False)
+        statuses.add(Numbered(num=2), 'PENDING', True)
+        self.assertEqual(statuses.tasks['still_pending_ext'], {Numbered(num=1)})
+        self.assertEqual(statuses.tasks['still_pending_not_ext'], {Numbered(num=2)})
+
+    def test_moved_between_groups(self):
+        statuses = _TaskStatuses()
+        statuses.add(Numbered(num=1), 'PENDING', True)
+        statuses.add(Numbered(num=2), 'PENDING', True)
+        statuses.add(Dated(date=datetime.date(2015, 1, 1)), 'PENDING', True)
+        statuses.add(Numbered(num=1), 'DONE', True)
+        self.assertEqual(list(statuses.groups['completed']['Numbered']), [Numbered(num=1)])
+        self.assertEqual(list(statuses.groups['still_pending_not_ext']['Numbered']), [Numbered(num=2)])
+        statuses.add(Numbered(num=2), 'FAILED', True)
+        self.assertEqual(sorted(statuses.groups['still_pending_not_ext']), ['Dated'])
+        statuses.add(Numbered(num=2), 'DONE', True)
+        self.assertEqual(statuses.tasks['completed'], {Numbered(num=1), Numbered(num=2)})
+        self.assertEqual(statuses.tasks['ever_failed'], {Numbered(num=2)})
+        self.assertEqual(statuses.tasks['failed'], set())
+        self.assertEqual(statuses.groups['failed'], {})
+
+    def test_same_as_partitioning_history(self):
+        rnd = random.Random(3)
+        tasks = [Numbered(num=i) for i in range(10)] + \
+            [Dated(date=datetime.date(2015, 1, 1) + datetime.timedelta(days=i)) for i in range(10)] + [NoParams()]
+        for _ in range(50):
+            history = [(rnd.choice(tasks), rnd.choice(['PENDING', 'DONE', 'FAILED', 'UNKNOWN', 'RUNNING']),
+                        rnd.random() < 0.7) for _ in range(rnd.randrange(60))]
+            statuses = _TaskStatuses()
+            for task, status, runnable in history:
+                statuses.add(task, status, runnable)
+            expected = _partition(history)
+            self.assertEqual(statuses.tasks, expected)
+            for status, task_set in expected.items():
+                families = {}
+                for task in task_set:
+                    families.setdefault(task.task_family, set()).add(task)
+                self.assertEqual(dict((family, set(group)) for family, group in statuses.groups[status].items()),
+                                 families)
+
+
+class IncrementalSummaryTest(LuigiTestCase):
+
+    def test_only_new_calls_added(self):
+        worker = HistoryWorker()
+        worker._add_task_history.append((Numbered(num=1), 'PENDING', True))
+        self.assertEqual(luigi.execution_summary._summary_dict(worker)['still_pending_not_ext'], {Numbered(num=1)})
+        self.assertEqual(worker._task_statuses.num_calls, 1)
+
+        worker._add_task_history.append((Numbered(num=1), 'DONE', True))
+        worker._add_task_history.append((Numbered(num=2), 'DONE', True))
+        d = luigi.execution_summary._summary_dict(worker)
+        self.assertEqual(d['completed'], {Numbered(num=1)})
+        self.assertEqual(d['already_done'], {Numbered(num=2)})
+        self.assertEqual(d['still_pending_not_ext'], set())
+        self.assertEqual(worker._task_statuses.num_calls, 3)
+
+    def test_summary_of_large_run(self):
+        worker = HistoryWorker()
+        n = 20000
+        for i in range(n):
+            worker._add_task_history.append((Numbered(num=i), 'PENDING', True))
+        for i in range(n):
+            worker._add_task_history.append((Numbered(num=i), 'DONE', True))
+        start = time.time()
+        summary = luigi.execution_summary.summary(worker)
+        self.assertIn('* {0} ran successfully:\n    - {0} Numbered(num=0...{1})\n'.format(n, n - 1), summary)
+        # printed again without going over the tasks
+        statuses = worker._task_statuses
+        self.assertEqual(luigi.execution_summary.summary(worker), summary)
+        self.assertIs(worker._task_statuses, statuses)
+        self.assertLess(time.time() - start, 60)
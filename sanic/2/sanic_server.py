@@ -3,14 +3,13 @@ import os
 import sys
 import traceback
 
-from collections import deque
 from functools import partial
 from inspect import isawaitable
-from multiprocessing import Process
+from multiprocessing import Event, Process, RawValue
 from signal import SIG_IGN, SIGINT, SIGTERM, Signals
 from signal import signal as signal_func
 from socket import SO_REUSEADDR, SOL_SOCKET, socket
-from time import time
+from time import sleep, time
 
 from httptools import HttpRequestParser  # type: ignore
 from httptools.parser.errors import HttpParserError  # type: ignore
@@ -83,12 +82,10 @@ class HttpProtocol(asyncio.Protocol):
         "_is_stream_handler",
         "_not_paused",
         "_request_handler_task",
-        "_request_stream_task",
         "_keep_alive",
         "_header_fragment",
         "state",
         "_debug",
-        "_body_chunks",
     )
 
     def __init__(
@@ -146,7 +143,6 @@ class HttpProtocol(asyncio.Protocol):
         self._last_request_time = None
         self._last_response_time = None
         self._request_handler_task = None
-        self._request_stream_task = None
         self._keep_alive = keep_alive
         self._header_fragment = b""
         self.state = state if state else {}
@@ -154,7 +150,6 @@ class HttpProtocol(asyncio.Protocol):
             self.state["requests_count"] = 0
         self._debug = debug
         self._not_paused.set()
-        self._body_chunks = deque()
 
     @property
     def keep_alive(self):
@@ -187,8 +182,6 @@ class HttpProtocol(asyncio.Protocol):
         self.connections.discard(self)
         if self._request_handler_task:
             self._request_handler_task.cancel()
-        if self._request_stream_task:
-            self._request_stream_task.cancel()
         if self._request_timeout_handler:
             self._request_timeout_handler.cancel()
         if self._response_timeout_handler:
@@ -214,8 +207,6 @@ class HttpProtocol(asyncio.Protocol):
                 time_left, self.request_timeout_callback
             )
         else:
-            if self._request_stream_task:
-                self._request_stream_task.cancel()
             if self._request_handler_task:
                 self._request_handler_task.cancel()
             self.write_error(RequestTimeout("Request Timeout"))
@@ -230,8 +221,6 @@ class HttpProtocol(asyncio.Protocol):
                 time_left, self.response_timeout_callback
             )
         else:
-            if self._request_stream_task:
-                self._request_stream_task.cancel()
             if self._request_handler_task:
                 self._request_handler_task.cancel()
             self.write_error(ServiceUnavailable("Response Timeout"))
@@ -333,7 +322,7 @@ class HttpProtocol(asyncio.Protocol):
             )
             if self._is_stream_handler:
                 self.request.stream = StreamBuffer(
-                    self.request_buffer_queue_size
+                    self.request_buffer_queue_size, self.transport
                 )
                 self.execute_request_handler()
 
@@ -354,46 +343,12 @@ class HttpProtocol(asyncio.Protocol):
 
     def on_body(self, body):
         if self.is_request_stream and self._is_stream_handler:
-            # body chunks can be put into asyncio.Queue out of order if
-            # multiple tasks put concurrently and the queue is full in python
-            # 3.7. so we should not create more than one task putting into the
-            # queue simultaneously.
-            self._body_chunks.append(body)
-            if (
-                not self._request_stream_task
-                or self._request_stream_task.done()
-            ):
-                self._request_stream_task = self.loop.create_task(
-                    self.stream_append()
-                )
+            # Feeding is synchronous and pauses reading from the transport
+            # when the buffer is full, so chunks stay in order.
+            self.request.stream.feed(body)
         else:
             self.request.body_push(body)
 
-    async def body_append(self, body):
-        if (
-            self.request is None
-            or self._request_stream_task is None
-            or self._request_stream_task.cancelled()
-        ):
-            return
-
-        if self.request.stream.is_full():
-            self.transport.pause_reading()
-            await self.request.stream.put(body)
-            self.transport.resume_reading()
-        else:
-            await self.request.stream.put(body)
-
-    async def stream_append(self):
-        while self._body_chunks:
-            body = self._body_chunks.popleft()
-            if self.request.stream.is_full():
-                self.transport.pause_reading()
-                await self.request.stream.put(body)
-                self.transport.resume_reading()
-            else:
-                await self.request.stream.put(body)
-
     def on_message_complete(self):
         # Entire request (headers and whole body) is received.
         # We can cancel and remove the request timeout handler now.
@@ -401,14 +356,7 @@ class HttpProtocol(asyncio.Protocol):
             self._request_timeout_handler.cancel()
             self._request_timeout_handler = None
         if self.is_request_stream and self._is_stream_handler:
-            self._body_chunks.append(None)
-            if (
-                not self._request_stream_task
-                or self._request_stream_task.done()
-            ):
-                self._request_stream_task = self.loop.create_task(
-                    self.stream_append()
-                )
+            self.request.stream.feed(None)
             return
         self.request.body_finish()
         self.execute_request_handler()
@@ -637,7 +585,6 @@ class HttpProtocol(asyncio.Protocol):
         self.url = None
         self.headers = None
         self._request_handler_task = None
-        self._request_stream_task = None
         self._total_request_size = 0
         self._is_stream_handler = False
 
@@ -986,12 +933,15 @@ def serve(
         loop.close()
 
 
-def serve_multiple(server_settings, workers):
+def serve_multiple(server_settings, workers, supervise=False):
     """Start multiple server processes simultaneously.  Stop on interrupt
     and terminate signals, and drain connections when complete.
 
     :param server_settings: kw arguments to be passed to the serve function
     :param workers: number of workers to launch
+    :param supervise: run the workers under a :class:`WorkerSupervisor`,
+                      which pins them to cores, replaces crashed workers
+                      and recycles them one at a time on SIGHUP
     :param stop_event: if provided, is used as a stop signal
     :return:
     """
@@ -1008,6 +958,11 @@ def serve_multiple(server_settings, workers):
         server_settings["host"] = None
         server_settings["port"] = None
 
+    if supervise:
+        WorkerSupervisor(server_settings, workers).run()
+        server_settings.get("sock").close()
+        return
+
     processes = []
 
     def sig_handler(signal, frame):
@@ -1031,3 +986,220 @@ def serve_multiple(server_settings, workers):
     for process in processes:
         process.terminate()
     server_settings.get("sock").close()
+
+
+class WorkerState(dict):
+    """Worker wide state whose ``requests_count`` is mirrored into shared
+    memory, so the supervisor can read it without asking the worker.
+    """
+
+    def __init__(self, counter):
+        super().__init__(requests_count=0)
+        self._counter = counter
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key == "requests_count":
+            self._counter.value = value
+
+
+class WorkerProcess:
+    __slots__ = ("process", "cpu", "counter", "ready", "started_at")
+
+    def __init__(self, process, cpu, counter, ready):
+        self.process = process
+        self.cpu = cpu
+        self.counter = counter
+        self.ready = ready
+        self.started_at = time()
+
+    @property
+    def requests_count(self):
+        return self.counter.value
+
+
+def _available_cpus():
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on this platform
+        return []
+
+
+def _serve_worker(server_settings, cpu, counter, ready):
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    server_settings = dict(server_settings)
+    server_settings["state"] = WorkerState(counter)
+    server_settings["after_start"] = list(
+        server_settings.get("after_start") or ()
+    ) + [lambda loop: ready.set()]
+    serve(**server_settings)
+
+
+class WorkerSupervisor:
+    """
+    Keeps `workers` server processes running on the shared socket.
+
+    * Each worker is pinned to one of the available cores.
+    * A worker that dies is replaced on the same core, after a delay that
+      doubles with every consecutive crash of that slot up to
+      `max_backoff` seconds. A worker that ran for `stable_after` seconds
+      resets the delay.
+    * SIGHUP recycles the workers one at a time, e.g. to release the
+      memory they have built up: a new worker is started and once it
+      listens the old one gets SIGTERM, so it stops accepting and drains
+      its connections through `HttpProtocol.close_if_idle`. New workers
+      are forked from the supervisor, so they run the code it was started
+      with. Deploying new code takes a restart of the supervisor.
+    * SIGUSR1 logs the number of requests handled by each worker, which
+      is also available from :meth:`request_counts`.
+    """
+
+    def __init__(
+        self,
+        server_settings,
+        workers,
+        pin_workers=True,
+        max_backoff=30.0,
+        stable_after=30.0,
+        start_timeout=30.0,
+        check_interval=0.5,
+    ):
+        self.server_settings = server_settings
+        self.workers = workers
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.start_timeout = start_timeout
+        self.check_interval = check_interval
+        self.drain_timeout = (
+            server_settings.get("graceful_shutdown_timeout", 15.0) + 5.0
+        )
+        cpus = _available_cpus() if pin_workers else []
+        self._cpus = [cpus[i % len(cpus)] if cpus else None for i in range(workers)]
+        self._slots = [None] * workers
+        self._failures = [0] * workers
+        self._restart_at = [0.0] * workers
+        self._stopping = False
+        self._recycle_requested = False
+
+    def request_counts(self):
+        """Return a dict of worker pid to the number of requests it handled"""
+        return {
+            worker.process.pid: worker.requests_count
+            for worker in self._slots
+            if worker is not None
+        }
+
+    def log_request_counts(self):
+        for pid, count in sorted(self.request_counts().items()):
+            logger.info("Worker [%s] handled %s requests", pid, count)
+
+    def run(self):
+        signal_func(SIGINT, self._stop_handler)
+        signal_func(SIGTERM, self._stop_handler)
+        # Not available on Windows
+        for name, handler in (
+            ("SIGHUP", self._recycle_handler),
+            ("SIGUSR1", lambda s, f: self.log_request_counts()),
+        ):
+            if hasattr(Signals, name):
+                signal_func(getattr(Signals, name), handler)
+
+        for slot in range(self.workers):
+            self._slots[slot] = self._spawn(slot)
+        try:
+            while not self._stopping:
+                if self._recycle_requested:
+                    self._recycle_requested = False
+                    self.recycle_workers()
+                self._check_workers()
+                sleep(self.check_interval)
+        finally:
+            self.log_request_counts()
+            workers = [worker for worker in self._slots if worker is not None]
+            for worker in workers:
+                self._signal(worker, SIGTERM)
+            for worker in workers:
+                self._join(worker)
+
+    def recycle_workers(self):
+        """
+        Replace the workers with new processes one at a time, without
+        closing the socket. The new workers don't reload any code.
+        """
+        logger.info("Recycling workers")
+        for slot, old in enumerate(self._slots):
+            if self._stopping:
+                return
+            new = self._spawn(slot)
+            if not new.ready.wait(self.start_timeout):
+                logger.error(
+                    "Worker [%s] did not start within %ss, "
+                    "aborting the recycling",
+                    new.process.pid,
+                    self.start_timeout,
+                )
+                self._signal(new, SIGTERM)
+                self._join(new)
+                return
+            self._slots[slot] = new
+            if old is not None:
+                self._signal(old, SIGTERM)
+                self._join(old)
+        logger.info("Workers recycled")
+
+    def _stop_handler(self, signum, frame):
+        logger.info("Received signal %s. Shutting down.", Signals(signum).name)
+        self._stopping = True
+
+    def _recycle_handler(self, signum, frame):
+        self._recycle_requested = True
+
+    def _spawn(self, slot):
+        counter = RawValue("Q", 0)
+        ready = Event()
+        process = Process(
+            target=_serve_worker,
+            args=(self.server_settings, self._cpus[slot], counter, ready),
+        )
+        process.daemon = True
+        process.start()
+        return WorkerProcess(process, self._cpus[slot], counter, ready)
+
+    def _check_workers(self):
+        now = time()
+        for slot, worker in enumerate(self._slots):
+            if worker is not None:
+                if worker.process.is_alive():
+                    if now - worker.started_at >= self.stable_after:
+                        self._failures[slot] = 0
+                    continue
+                if now - worker.started_at >= self.stable_after:
+                    self._failures[slot] = 0
+                self._failures[slot] += 1
+                delay = min(
+                    self.max_backoff, 0.5 * 2 ** (self._failures[slot] - 1)
+                )
+                logger.warning(
+                    "Worker [%s] exited with code %s, restarting in %.1fs",
+                    worker.process.pid,
+                    worker.process.exitcode,
+                    delay,
+                )
+                self._slots[slot] = None
+                self._restart_at[slot] = now + delay
+            if now >= self._restart_at[slot] and not self._stopping:
+                self._slots[slot] = self._spawn(slot)
+
+    def _signal(self, worker, signum):
+        try:
+            os.kill(worker.process.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _join(self, worker):
+        worker.process.join(self.drain_timeout)
+        if worker.process.is_alive():
+            self._signal(worker, getattr(Signals, "SIGKILL", SIGTERM))
+            worker.process.join()
@@ -0,0 +1,173 @@
+import asyncio
+import os
+
+from io import BytesIO
+
+import pytest
+
+import sanic.server
+
+from sanic import Sanic
+from sanic.request import Request, StreamBuffer
+from sanic.response import json, text
+
+
+SPOOL_SIZE = 1024
+
+
+@pytest.fixture
+def app():
+    return Sanic("test_request_body")
+
+
+class RecordingTransport:
+    def __init__(self, transport=None):
+        self.transport = transport
+        self.calls = []
+
+    def pause_reading(self):
+        self.calls.append("pause")
+        if self.transport is not None:
+            self.transport.pause_reading()
+
+    def resume_reading(self):
+        self.calls.append("resume")
+        if self.transport is not None:
+            self.transport.resume_reading()
+
+
+@pytest.fixture
+def spool_app(app, monkeypatch):
+    monkeypatch.setattr(Request, "body_spool_size", SPOOL_SIZE)
+
+    @app.post("/")
+    def handler(request):
+        return json(
+            {
+                "spooled": not isinstance(request.body_file, BytesIO),
+                "body": request.body == request.app.expected,
+                "body_file": request.body_file.read() == request.app.expected,
+                "body_view": bytes(request.body_view) == request.app.expected,
+            }
+        )
+
+    return app
+
+
+@pytest.mark.parametrize("size", [SPOOL_SIZE + 1, SPOOL_SIZE * 64])
+def test_body_spooled_with_content_length(spool_app, size):
+    spool_app.expected = os.urandom(size)
+    request, response = spool_app.test_client.post(
+        "/", data=spool_app.expected
+    )
+    assert response.json == {
+        "spooled": True,
+        "body": True,
+        "body_file": True,
+        "body_view": True,
+    }
+
+
+def test_body_spooled_once_past_threshold(spool_app):
+    # Without a Content-Length the body is only spooled once it is large.
+    spool_app.expected = os.urandom(SPOOL_SIZE * 64)
+
+    async def chunks():
+        for start in range(0, len(spool_app.expected), 100):
+            yield spool_app.expected[start : start + 100]
+
+    request, response = spool_app.test_client.post("/", data=chunks())
+    assert request.headers.get("content-length") is None
+    assert response.json == {
+        "spooled": True,
+        "body": True,
+        "body_file": True,
+        "body_view": True,
+    }
+
+
+@pytest.mark.parametrize("size", [0, SPOOL_SIZE])
+def test_body_not_spooled(spool_app, size):
+    spool_app.expected = os.urandom(size)
+    request, response = spool_app.test_client.post(
+        "/", data=spool_app.expected
+    )
+    assert response.json == {
+        "spooled": False,
+        "body": True,
+        "body_file": True,
+        "body_view": True,
+    }
+
+
+def test_stream_buffer_pauses_and_resumes_reading():
+    loop = asyncio.new_event_loop()
+    transport = RecordingTransport()
+    buffer = StreamBuffer(4, transport)
+
+    for chunk in range(3):
+        buffer.feed(chunk)
+    assert transport.calls == []
+    buffer.feed(3)
+    assert transport.calls == ["pause"]
+    buffer.feed(4)
+    assert transport.calls == ["pause"]
+
+    # Resumed once no more than half of the buffer is waiting.
+    assert loop.run_until_complete(buffer.read()) == 0
+    assert loop.run_until_complete(buffer.read()) == 1
+    assert transport.calls == ["pause"]
+    assert loop.run_until_complete(buffer.read()) == 2
+    assert transport.calls == ["pause", "resume"]
+
+    for chunk in range(5, 7):
+        buffer.feed(chunk)
+    assert transport.calls == ["pause", "resume", "pause"]
+    loop.close()
+
+
+def test_stream_buffer_read_waits_for_feed():
+    loop = asyncio.new_event_loop()
+    buffer = StreamBuffer(4)
+    read = loop.create_task(buffer.read())
+    loop.run_until_complete(asyncio.sleep(0.01))
+    assert not read.done()
+    loop.call_soon(buffer.feed, b"chunk")
+    assert loop.run_until_complete(read) == b"chunk"
+    loop.close()
+
+
+def test_stream_handler_back_pressure(app, monkeypatch):
+    transports = []
+
+    class RecordingStreamBuffer(StreamBuffer):
+        def __init__(self, buffer_size=100, transport=None):
+            transports.append(RecordingTransport(transport))
+            super().__init__(buffer_size, transports[-1])
+
+    monkeypatch.setattr(sanic.server, "StreamBuffer", RecordingStreamBuffer)
+    app.config.REQUEST_BUFFER_QUEUE_SIZE = 2
+    expected = os.urandom(1024 * 1024)
+
+    @app.post("/", stream=True)
+    async def handler(request):
+        body = b""
+        while True:
+            # A slow handler, so the chunks pile up.
+            await asyncio.sleep(0.001)
+            chunk = await request.stream.read()
+            if chunk is None:
+                break
+            body += chunk
+        return text(str(body == expected))
+
+    async def chunks():
+        for start in range(0, len(expected), 4096):
+            yield expected[start : start + 4096]
+
+    request, response = app.test_client.post("/", data=chunks())
+    assert response.text == "True"
+    calls = transports[0].calls
+    assert "pause" in calls
+    # Paused and resumed in turn, ending up reading.
+    assert calls == ["pause", "resume"] * (len(calls) // 2)
@@ -0,0 +1,125 @@
+import os
+import socket
+import sys
+
+from signal import SIG_DFL, SIGTERM, signal
+from time import sleep, time
+from urllib.request import urlopen
+
+import pytest
+
+import sanic.server
+
+from sanic import Sanic
+from sanic.response import text
+from sanic.server import WorkerSupervisor
+
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="workers are forked"
+)
+
+VERSION = "1"
+
+
+def get_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture
+def supervisor():
+    app = Sanic("test_worker_supervisor")
+
+    @app.route("/")
+    def handler(request):
+        return text("{} {}".format(os.getpid(), VERSION))
+
+    port = get_port()
+    server_settings = app._helper(host="127.0.0.1", port=port, workers=2)
+    server_settings["reuse_port"] = True
+    server_settings["run_multiple"] = True
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    sock.set_inheritable(True)
+    server_settings.update(sock=sock, host=None, port=None)
+
+    supervisor = WorkerSupervisor(
+        server_settings, 2, pin_workers=False, start_timeout=10.0
+    )
+    supervisor.url = "http://127.0.0.1:{}/".format(port)
+    supervisor._slots = [supervisor._spawn(slot) for slot in range(2)]
+    for worker in supervisor._slots:
+        assert worker.ready.wait(10)
+    yield supervisor
+    for worker in supervisor._slots:
+        if worker is not None:
+            supervisor._signal(worker, SIGTERM)
+            supervisor._join(worker)
+    sock.close()
+
+
+def get(url):
+    with urlopen(url, timeout=10) as response:
+        pid, version = response.read().decode().split()
+    return int(pid), version
+
+
+def test_recycle_workers(supervisor):
+    global VERSION
+    old = list(supervisor._slots)
+    old_pids = {worker.process.pid for worker in old}
+    assert get(supervisor.url)[0] in old_pids
+
+    VERSION = "2"
+    try:
+        supervisor.recycle_workers()
+    finally:
+        VERSION = "1"
+
+    new_pids = set(supervisor.request_counts())
+    assert len(new_pids) == 2
+    assert not new_pids & old_pids
+    for worker in old:
+        # The old workers drained and stopped on SIGTERM.
+        assert worker.process.exitcode == 0
+    for _ in range(10):
+        pid, version = get(supervisor.url)
+        assert pid in new_pids
+        # The new workers are forked from the supervisor as it is now,
+        # nothing is reloaded.
+        assert version == "2"
+
+
+def test_recycle_aborted_when_worker_does_not_start(
+    supervisor, monkeypatch
+):
+    old = list(supervisor._slots)
+    supervisor.start_timeout = 0.5
+
+    def never_ready(*args):
+        # Handlers installed by earlier servers in this process are
+        # inherited, and wouldn't stop the worker.
+        signal(SIGTERM, SIG_DFL)
+        sleep(60)
+
+    monkeypatch.setattr(sanic.server, "_serve_worker", never_ready)
+
+    start = time()
+    supervisor.recycle_workers()
+
+    assert time() - start < 10
+    assert supervisor._slots == old
+    assert all(worker.process.is_alive() for worker in old)
+    assert get(supervisor.url)[0] in {worker.process.pid for worker in old}
+
+
+def test_recycle_stops_when_stopping(supervisor):
+    old = list(supervisor._slots)
+    supervisor._stopping = True
+    supervisor.recycle_workers()
+    assert supervisor._slots == old
@@ -1096,6 +1096,7 @@ class Sanic:
         stop_event: Any = None,
         register_sys_signals: bool = True,
         access_log: Optional[bool] = None,
+        supervise: bool = False,
         **kwargs: Any
     ) -> None:
         """Run the HTTP Server and listen until keyboard interrupt or term
@@ -1126,6 +1127,10 @@ class Sanic:
         :type register_sys_signals: bool
         :param access_log: Enables writing access logs (slows server)
         :type access_log: bool
+        :param supervise: With multiple workers, pin them to cores, replace
+                          crashed ones and recycle them one at a time on
+                          SIGHUP (without reloading the code)
+        :type supervise: bool
         :return: Nothing
         """
         if "loop" in kwargs:
@@ -1191,7 +1196,7 @@ class Sanic:
                 else:
                     serve(**server_settings)
             else:
-                serve_multiple(server_settings, workers)
+                serve_multiple(server_settings, workers, supervise=supervise)
         except BaseException:
             error_logger.exception(
                 "Experienced exception while trying to serve"
@@ -0,0 +1,57 @@
+from pytest import mark
+
+from sanic.compiled_router import CompiledRouter
+from sanic.router import Router
+
+
+ROUTE_COUNT = 3000
+STATIC_ROUTE_COUNT = 200
+
+
+def handler(request):
+    return 1
+
+
+def make_router(router_class):
+    router = router_class()
+    for i in range(ROUTE_COUNT):
+        router.add(
+            "/api/v{}/resource{}/<id:int>/<name>".format(i % 3, i),
+            ["GET"],
+            handler,
+        )
+    for i in range(STATIC_ROUTE_COUNT):
+        router.add("/static{}".format(i), ["GET"], handler)
+    return router
+
+
+def resolve(router, urls):
+    # Bypass the (url, method, host) cache, so every lookup is resolved
+    get = router._get.__wrapped__
+    return [get(router, url, "GET", "") for url in urls]
+
+
+@mark.benchmark(group="typed-route-resolution")
+@mark.parametrize("router_class", [Router, CompiledRouter])
+def test_resolve_typed_route(benchmark, router_class):
+    router = make_router(router_class)
+    urls = [
+        "/api/v{}/resource{}/{}/name".format(i % 3, i, i)
+        for i in range(0, ROUTE_COUNT, 30)
+    ]
+
+    results = benchmark(resolve, router, urls)
+
+    assert [result[0] for result in results] == [handler] * len(urls)
+    assert results[-1][2] == {"id": ROUTE_COUNT - 30, "name": "name"}
+
+
+@mark.benchmark(group="static-route-resolution")
+@mark.parametrize("router_class", [Router, CompiledRouter])
+def test_resolve_static_route(benchmark, router_class):
+    router = make_router(router_class)
+    urls = ["/static{}".format(i) for i in range(STATIC_ROUTE_COUNT)]
+
+    results = benchmark(resolve, router, urls)
+
+    assert [result[0] for result in results] == [handler] * len(urls)
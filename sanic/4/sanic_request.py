@@ -1,9 +1,13 @@
 import asyncio
 import email.utils
+import mmap
+import os
 import warnings
 
-from collections import defaultdict, namedtuple
+from collections import defaultdict, deque, namedtuple
 from http.cookies import SimpleCookie
+from io import BytesIO
+from tempfile import TemporaryFile
 from types import SimpleNamespace
 from urllib.parse import parse_qs, parse_qsl, unquote, urlunparse
 
@@ -47,25 +51,68 @@ class RequestParameters(dict):
 
 
 class StreamBuffer:
-    def __init__(self, buffer_size=100):
-        self._queue = asyncio.Queue(buffer_size)
+    """Bounded buffer between the protocol and a streaming handler.
+
+    The protocol feeds body chunks synchronously; once `buffer_size` chunks
+    are waiting, reading from the transport is paused until the handler has
+    consumed half of them, so no task is needed per chunk or burst.
+    """
+
+    def __init__(self, buffer_size=100, transport=None):
+        self._chunks = deque()
+        self._buffer_size = buffer_size
+        self._transport = transport
+        self._reading_paused = False
+        self._waiter = None
 
     async def read(self):
         """ Stop reading when gets None """
-        payload = await self._queue.get()
-        self._queue.task_done()
+        while not self._chunks:
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        payload = self._chunks.popleft()
+        if (
+            self._reading_paused
+            and len(self._chunks) <= self._buffer_size // 2
+        ):
+            self._reading_paused = False
+            self._transport.resume_reading()
         return payload
 
+    def feed(self, payload):
+        self._chunks.append(payload)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        if (
+            self._transport is not None
+            and not self._reading_paused
+            and self.is_full()
+        ):
+            self._reading_paused = True
+            self._transport.pause_reading()
+
     async def put(self, payload):
-        await self._queue.put(payload)
+        self.feed(payload)
 
     def is_full(self):
-        return self._queue.full()
+        return len(self._chunks) >= self._buffer_size
 
 
 class Request:
     """Properties of an HTTP request such as URL, headers, etc."""
 
+    # Bodies larger than this are written to a temporary file instead of
+    # being kept in memory, see `body_file` and `body_view`. The writes are
+    # made on the event loop without an executor: they go to the page
+    # cache, so each costs about a copy of the chunk read from the transport
+    # (at most 256 KiB), plus one copy of `body_spool_size` bytes when a body
+    # without a Content-Length starts to be spooled. They only wait for the
+    # disk when the kernel throttles writeback.
+    body_spool_size = 1024 * 1024 * 10
+
     __slots__ = (
         "__weakref__",
         "_cookies",
@@ -74,8 +121,10 @@ class Request:
         "_port",
         "_remote_addr",
         "_socket",
+        "_body",
+        "_body_file",
+        "_body_size",
         "app",
-        "body",
         "ctx",
         "endpoint",
         "headers",
@@ -149,13 +198,74 @@ class Request:
         setattr(self.ctx, key, value)
 
     def body_init(self):
-        self.body = []
+        self._body = []
+        self._body_size = 0
+        self._body_file = None
+        try:
+            content_length = int(self.headers.get("content-length", 0))
+        except ValueError:
+            content_length = 0
+        if content_length > self.body_spool_size:
+            self._spool_body()
 
     def body_push(self, data):
-        self.body.append(data)
+        if self._body_file is not None:
+            self._body_file.write(data)
+            return
+        self._body.append(data)
+        self._body_size += len(data)
+        if self._body_size > self.body_spool_size:
+            self._spool_body()
 
     def body_finish(self):
-        self.body = b"".join(self.body)
+        if self._body_file is not None:
+            self._body_file.seek(0)
+            # Only read into memory if `body` is accessed
+            self._body = None
+        else:
+            self._body = b"".join(self._body)
+
+    def _spool_body(self):
+        self._body_file = TemporaryFile()
+        self._body_file.writelines(self._body)
+        self._body = []
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._body_file.seek(0)
+            self._body = self._body_file.read()
+            self._body_file.seek(0)
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body = value
+
+    @property
+    def body_file(self):
+        """File object positioned at the start of the request body.
+        Large bodies are read from the temporary file they were spooled to.
+        """
+        if self._body_file is None:
+            return BytesIO(self.body)
+        self._body_file.seek(0)
+        return self._body_file
+
+    @property
+    def body_view(self):
+        """:class:`memoryview` of the request body, without copying it.
+        Bodies that were spooled to a temporary file are memory mapped.
+        """
+        if self._body_file is None or self._body_file_size() == 0:
+            return memoryview(self.body)
+        return memoryview(
+            mmap.mmap(self._body_file.fileno(), 0, access=mmap.ACCESS_READ)
+        )
+
+    def _body_file_size(self):
+        self._body_file.flush()
+        return os.fstat(self._body_file.fileno()).st_size
 
     @property
     def json(self):
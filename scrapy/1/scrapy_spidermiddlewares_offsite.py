@@ -9,6 +9,7 @@ import warnings
 
 from scrapy import signals
 from scrapy.http import Request
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.httpobj import urlparse_cached
 
 logger = logging.getLogger(__name__)
@@ -49,7 +50,11 @@ class OffsiteMiddleware(object):
         return bool(regex.search(host))
 
     def get_host_regex(self, spider):
-        """Override this method to implement a different offsite policy"""
+        """Override this method to implement a different offsite policy
+
+        The returned object only needs a ``search(host)`` method whose result
+        is true for allowed hosts, such as a compiled regex or a DomainMatcher.
+        """
         allowed_domains = getattr(spider, 'allowed_domains', None)
         if not allowed_domains:
             return re.compile('')  # allow all by default
@@ -63,14 +68,49 @@ class OffsiteMiddleware(object):
                            "Ignoring URL entry %s in allowed_domains." % domain)
                 warnings.warn(message, URLWarning)
             else:
-                domains.append(re.escape(domain))
-        regex = r'^(.*\.)?(%s)$' % '|'.join(domains)
-        return re.compile(regex)
+                domains.append(domain)
+        return DomainMatcher(domains)
 
     def spider_opened(self, spider):
         self.host_regex = self.get_host_regex(spider)
         self.domains_seen = set()
 
 
+class DomainMatcher(object):
+    r"""Match hostnames against a list of domains and their subdomains
+
+    It matches the same hosts as the ``^(.*\.)?(domain1|domain2|...)$`` regex
+    it replaces, but looks up each suffix of the host in a set, so matching
+    costs one lookup per label regardless of the number of domains.
+    Decisions are cached per host.
+
+    Only ``search()`` and ``pattern`` are provided, and ``search()`` returns
+    True or False instead of a match object or None.
+    """
+
+    def __init__(self, domains, cache_size=10000):
+        self.domains = frozenset(domains) or frozenset([''])
+        self._cache = LocalCache(limit=cache_size)
+
+    @property
+    def pattern(self):
+        return r'^(.*\.)?(%s)$' % '|'.join(
+            re.escape(d) for d in sorted(self.domains))
+
+    def search(self, host):
+        try:
+            return self._cache[host]
+        except KeyError:
+            pass
+        domains = self.domains
+        matched = host in domains
+        dot = host.find('.')
+        while not matched and dot != -1:
+            matched = host[dot + 1:] in domains
+            dot = host.find('.', dot + 1)
+        self._cache[host] = matched
+        return matched
+
+
 class URLWarning(Warning):
     pass
@@ -18,6 +18,7 @@ if not six.PY2:
 # move doesn't break old code
 from w3lib.url import *
 from w3lib.url import _safe_chars
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.python import to_bytes, to_native_str, to_unicode
 
 
@@ -63,6 +64,26 @@ def _safe_ParseResult(parts, encoding='utf8', path_encoding='utf8'):
     )
 
 
+# characters left untouched by quote(..., _safe_chars); an ASCII url made only
+# of these needs no percent-encoding in any of its components
+_canonical_chars_re = re.compile(r'^[%s]*\Z' % re.escape(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789' +
+    to_unicode(_safe_chars)))
+
+_canonicalize_url_cache = None
+
+
+def set_canonicalize_url_cache(limit):
+    """Enable a least-recently-used cache of ``limit`` entries for
+    canonicalize_url() results, keyed on the url and the passed flags.
+
+    The cache is disabled by default; pass a false ``limit`` (0 or None)
+    to disable it again.
+    """
+    global _canonicalize_url_cache
+    _canonicalize_url_cache = LocalCache(limit=limit) if limit else None
+
+
 def canonicalize_url(url, keep_blank_values=True, keep_fragments=False,
                      encoding=None):
     """Canonicalize the given url by applying the following procedures:
@@ -82,6 +103,28 @@ def canonicalize_url(url, keep_blank_values=True, keep_fragments=False,
 
     For examples see the tests in tests/test_utils_url.py
     """
+    cache = _canonicalize_url_cache
+    if cache is None:
+        return _canonicalize_url(url, keep_blank_values, keep_fragments,
+                                 encoding)
+    key = (url, keep_blank_values, keep_fragments, encoding)
+    try:
+        # re-insert on hit so that the least recently used entry expires first
+        result = cache.pop(key)
+    except KeyError:
+        result = _canonicalize_url(url, keep_blank_values, keep_fragments,
+                                   encoding)
+    cache[key] = result
+    return result
+
+
+def _canonicalize_url(url, keep_blank_values, keep_fragments, encoding):
+    if encoding is None and isinstance(url, str):
+        canonical = _canonicalize_safe_url(url, keep_blank_values,
+                                           keep_fragments)
+        if canonical is not None:
+            return canonical
+
     # If supplied `encoding` is not compatible with all characters in `url`,
     # fallback to UTF-8 as safety net.
     # UTF-8 can handle all Unicode characters,
@@ -138,6 +181,30 @@ def canonicalize_url(url, keep_blank_values=True, keep_fragments=False,
     return urlunparse((scheme, netloc.lower(), path, params, query, fragment))
 
 
+def _canonicalize_safe_url(url, keep_blank_values, keep_fragments):
+    """Fast path of canonicalize_url() for the common case of an ASCII url
+    whose components are already percent-encoded.
+
+    Such components are left unchanged by _safe_ParseResult() (ASCII netlocs
+    survive the IDNA round-trip as-is), so only the query needs to be sorted
+    and re-encoded. Return None when the url does not qualify, in which case
+    the full normalisation has to be applied.
+    """
+    if six.PY2 or not _canonical_chars_re.match(url):
+        return None
+    scheme, netloc, path, params, query, fragment = urlparse(url)
+    if '%' in path:
+        # percent-encodings in the path need their case normalized
+        return None
+    if query:
+        keyvals = parse_qsl_to_bytes(query, keep_blank_values)
+        keyvals.sort()
+        query = urlencode(keyvals)
+    fragment = '' if not keep_fragments else fragment
+    return urlunparse((scheme, netloc.lower(), path or '/', params, query,
+                       fragment))
+
+
 def _unquotepath(path):
     for reserved in ('2f', '2F', '3f', '3F'):
         path = path.replace('%' + reserved, '%25' + reserved.upper())
@@ -1,3 +1,4 @@
+import heapq
 import time
 from six.moves.http_cookiejar import (
     CookieJar as _CookieJar, DefaultCookiePolicy, IPV4_RE
@@ -9,7 +10,7 @@ from scrapy.utils.python import to_native_str
 class CookieJar(object):
     def __init__(self, policy=None, check_expired_frequency=10000):
         self.policy = policy or DefaultCookiePolicy()
-        self.jar = _CookieJar(self.policy)
+        self.jar = _CookieStore(self.policy)
         self.jar._cookies_lock = _DummyLock()
         self.check_expired_frequency = check_expired_frequency
         self.processed = 0
@@ -48,7 +49,7 @@ class CookieJar(object):
 
         self.processed += 1
         if self.processed % self.check_expired_frequency == 0:
-            # This is still quite inefficient for large number of cookies
+            # only cookies that actually expired are visited, see _CookieStore
             self.jar.clear_expired_cookies()
 
     @property
@@ -101,6 +102,60 @@ def potential_domain_matches(domain):
     return matches + ['.' + d for d in matches]
 
 
+class _CookieStore(_CookieJar):
+    """CookieJar keeping a heap of cookie expiration times
+
+    The standard CookieJar.clear_expired_cookies() walks every stored cookie.
+    Here each cookie with an expiration time is indexed by (expires, domain,
+    path, name) when it is set, so clearing expired cookies only pops the
+    entries that are due, in time order.
+
+    Heap entries are invalidated lazily: an entry is ignored when the stored
+    cookie was since removed or replaced with a different expiration time.
+    """
+
+    def __init__(self, policy=None):
+        _CookieJar.__init__(self, policy)
+        self._expires = {}
+        self._expires_heap = []
+
+    def set_cookie(self, cookie):
+        _CookieJar.set_cookie(self, cookie)
+        key = (cookie.domain, cookie.path, cookie.name)
+        if cookie.expires is None:
+            self._expires.pop(key, None)
+            return
+        self._expires[key] = cookie.expires
+        heapq.heappush(self._expires_heap, (cookie.expires,) + key)
+        if len(self._expires_heap) > 2 * len(self._expires) + 64:
+            # cookies refreshed on every response leave stale entries behind
+            self._expires_heap = [(expires,) + key
+                                  for key, expires in self._expires.items()]
+            heapq.heapify(self._expires_heap)
+
+    def clear_expired_cookies(self):
+        now = time.time()
+        heap = self._expires_heap
+        while heap and heap[0][0] <= now:
+            expires, domain, path, name = heapq.heappop(heap)
+            key = (domain, path, name)
+            if self._expires.get(key) != expires:
+                continue
+            del self._expires[key]
+            try:
+                cookie = self._cookies[domain][path][name]
+            except KeyError:
+                continue
+            if cookie.expires == expires:
+                self.clear(domain, path, name)
+
+    def clear(self, domain=None, path=None, name=None):
+        _CookieJar.clear(self, domain, path, name)
+        if domain is None:
+            self._expires.clear()
+            self._expires_heap = []
+
+
 class _DummyLock(object):
     def acquire(self):
         pass
@@ -0,0 +1,91 @@
+import time
+from unittest import TestCase
+
+from six.moves.http_cookiejar import Cookie, CookieJar as _CookieJar
+
+from scrapy.http import Request
+from scrapy.http.cookies import CookieJar
+
+
+def make_cookie(name, expires=None, domain='www.example.com', path='/'):
+    return Cookie(0, name, 'value', None, False, domain, False, False, path,
+                  True, False, expires, expires is None, None, None, {})
+
+
+class CookieExpirationTest(TestCase):
+
+    def setUp(self):
+        self.jar = CookieJar()
+        self.now = int(time.time())
+
+    def names(self):
+        return sorted(cookie.name for cookie in self.jar)
+
+    def test_expired_cookies_dropped(self):
+        self.jar.set_cookie(make_cookie('expired', self.now - 10))
+        self.jar.set_cookie(make_cookie('live', self.now + 1000))
+        self.jar.set_cookie(make_cookie('session'))
+        self.jar.set_cookie(make_cookie('other', self.now - 5,
+                                        domain='.example.org'))
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(self.names(), ['live', 'session'])
+
+    def test_expired_cookies_dropped_on_requests(self):
+        self.jar = CookieJar(check_expired_frequency=2)
+        self.jar.set_cookie(make_cookie('expired', self.now - 10))
+        self.jar.set_cookie(make_cookie('live', self.now + 1000))
+        request = Request('http://www.example.com/')
+        self.jar.add_cookie_header(request)
+        self.assertEqual(self.names(), ['expired', 'live'])
+        self.jar.add_cookie_header(Request('http://www.example.com/'))
+        self.assertEqual(self.names(), ['live'])
+        self.assertEqual(request.headers.get('Cookie'), b'live=value')
+
+    def test_reset_with_later_expiration(self):
+        self.jar.set_cookie(make_cookie('a', self.now - 10))
+        self.jar.set_cookie(make_cookie('a', self.now + 1000))
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(self.names(), ['a'])
+
+    def test_reset_as_session_cookie(self):
+        self.jar.set_cookie(make_cookie('a', self.now - 10))
+        self.jar.set_cookie(make_cookie('a'))
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(self.names(), ['a'])
+
+    def test_reset_after_clear(self):
+        self.jar.set_cookie(make_cookie('a', self.now - 10))
+        self.jar.jar.clear('www.example.com', '/', 'a')
+        self.jar.set_cookie(make_cookie('a', self.now + 1000))
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(self.names(), ['a'])
+
+        self.jar.set_cookie(make_cookie('b', self.now - 10))
+        self.jar.clear()
+        self.jar.set_cookie(make_cookie('b', self.now + 1000))
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(self.names(), ['b'])
+
+    def test_stale_entries_compacted(self):
+        for i in range(1000):
+            self.jar.set_cookie(make_cookie('a', self.now - 1000 + i))
+            self.jar.set_cookie(make_cookie('b', self.now + i))
+        heap = self.jar.jar._expires_heap
+        self.assertLessEqual(len(heap), 2 * 2 + 64)
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(self.names(), ['b'])
+
+    def test_same_as_cookiejar(self):
+        jar = _CookieJar()
+        for i in range(200):
+            expires = None if i % 7 == 0 else self.now + (i * 37) % 200 - 100
+            cookie = make_cookie('c%d' % (i % 50), expires,
+                                 domain='www%d.example.com' % (i % 3),
+                                 path='/%d' % (i % 2))
+            jar.set_cookie(cookie)
+            self.jar.set_cookie(cookie)
+        jar.clear_expired_cookies()
+        self.jar.jar.clear_expired_cookies()
+        self.assertEqual(
+            sorted((c.domain, c.path, c.name) for c in self.jar),
+            sorted((c.domain, c.path, c.name) for c in jar))
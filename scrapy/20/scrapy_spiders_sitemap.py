@@ -1,5 +1,8 @@
 import re
 import logging
+import zlib
+
+import lxml.etree
 import six
 
 from scrapy.spiders import Spider
@@ -16,6 +19,9 @@ class SitemapSpider(Spider):
     sitemap_rules = [('', 'parse')]
     sitemap_follow = ['']
     sitemap_alternate_links = False
+    sitemap_streaming = False
+    sitemap_max_size = 0
+    sitemap_chunk_size = 64 * 1024
 
     def __init__(self, *a, **kw):
         super(SitemapSpider, self).__init__(*a, **kw)
@@ -34,6 +40,16 @@ class SitemapSpider(Spider):
         if response.url.endswith('/robots.txt'):
             for url in sitemap_urls_from_robots(response.text):
                 yield Request(url, callback=self._parse_sitemap)
+        elif self.sitemap_streaming:
+            chunks = self._get_sitemap_body_chunks(response)
+            if chunks is None:
+                logger.warning("Ignoring invalid sitemap: %(response)s",
+                               {'response': response}, extra={'spider': self})
+                return
+
+            s = StreamingSitemap(chunks)
+            for request in self._sitemap_requests(s):
+                yield request
         else:
             body = self._get_sitemap_body(response)
             if body is None:
@@ -42,16 +58,20 @@ class SitemapSpider(Spider):
                 return
 
             s = Sitemap(body)
-            if s.type == 'sitemapindex':
-                for loc in iterloc(s, self.sitemap_alternate_links):
-                    if any(x.search(loc) for x in self._follow):
-                        yield Request(loc, callback=self._parse_sitemap)
-            elif s.type == 'urlset':
-                for loc in iterloc(s):
-                    for r, c in self._cbs:
-                        if r.search(loc):
-                            yield Request(loc, callback=c)
-                            break
+            for request in self._sitemap_requests(s):
+                yield request
+
+    def _sitemap_requests(self, s):
+        if s.type == 'sitemapindex':
+            for loc in iterloc(s, self.sitemap_alternate_links):
+                if any(x.search(loc) for x in self._follow):
+                    yield Request(loc, callback=self._parse_sitemap)
+        elif s.type == 'urlset':
+            for loc in iterloc(s):
+                for r, c in self._cbs:
+                    if r.search(loc):
+                        yield Request(loc, callback=c)
+                        break
 
     def _get_sitemap_body(self, response):
         """Return the sitemap body contained in the given response,
@@ -66,6 +86,130 @@ class SitemapSpider(Spider):
         elif response.url.endswith('.xml.gz'):
             return gunzip(response.body)
 
+    def _get_sitemap_body_chunks(self, response):
+        """Return an iterator over the uncompressed sitemap body contained in
+        the given response, or None if the response is not a sitemap.
+
+        The body is decompressed ``sitemap_chunk_size`` bytes at a time and
+        iteration stops, with a warning, once more than ``sitemap_max_size``
+        uncompressed bytes were produced (when it is set).
+        """
+        if isinstance(response, XmlResponse):
+            gzipped = False
+        elif is_gzipped(response):
+            gzipped = True
+        elif response.url.endswith('.xml'):
+            gzipped = False
+        elif response.url.endswith('.xml.gz'):
+            gzipped = True
+        else:
+            return None
+        chunks = iterchunks(response.body, self.sitemap_chunk_size, gzipped)
+        return self._limit_sitemap_size(chunks, response)
+
+    def _limit_sitemap_size(self, chunks, response):
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            if self.sitemap_max_size and size > self.sitemap_max_size:
+                logger.warning("Sitemap exceeds the maximum size of %(size)d "
+                               "bytes, ignoring the rest: %(response)s",
+                               {'size': self.sitemap_max_size,
+                                'response': response},
+                               extra={'spider': self})
+                return
+            yield chunk
+
+
+class StreamingSitemap(object):
+    """Incremental counterpart of scrapy.utils.sitemap.Sitemap
+
+    It is built from an iterable of XML body chunks and parses them as it is
+    iterated, so that entries are available before the whole document is
+    read and already processed entries are freed.
+    """
+
+    def __init__(self, chunks):
+        self._parser = lxml.etree.XMLPullParser(
+            events=('start', 'end'), recover=True, remove_comments=True,
+            resolve_entities=False)
+        self._events = self._iterevents(chunks)
+        self.type = None
+        for event, elem in self._events:
+            # the first start event is the root element
+            if event == 'start':
+                self.type = _localname(elem.tag)
+                break
+
+    def _iterevents(self, chunks):
+        for chunk in chunks:
+            self._parser.feed(chunk)
+            for event in self._parser.read_events():
+                yield event
+        try:
+            self._parser.close()
+        except lxml.etree.XMLSyntaxError:
+            pass
+        for event in self._parser.read_events():
+            yield event
+
+    def __iter__(self):
+        depth = 1
+        for event, elem in self._events:
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            d = {}
+            for el in elem:
+                name = _localname(el.tag)
+                if name == 'link':
+                    if 'href' in el.attrib:
+                        d.setdefault('alternate', []).append(el.get('href'))
+                else:
+                    d[name] = el.text.strip() if el.text else ''
+            # free the entries processed so far
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+            if 'loc' in d:
+                yield d
+
+
+def _localname(tag):
+    return tag.split('}', 1)[1] if '}' in tag else tag
+
+
+def iterchunks(body, chunk_size, gzipped=False):
+    """Iterate over ``body`` in chunks of at most ``chunk_size`` bytes,
+    decompressing it on the fly if ``gzipped`` is True.
+
+    Truncated or corrupted gzip data ends the iteration, like gunzip() does.
+    """
+    body = memoryview(body)
+    if not gzipped:
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size].tobytes()
+        return
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for start in range(0, len(body), chunk_size):
+        data = body[start:start + chunk_size].tobytes()
+        while data:
+            try:
+                chunk = d.decompress(data, chunk_size)
+            except zlib.error:
+                return
+            if chunk:
+                yield chunk
+            data = d.unconsumed_tail
+        if d.eof:
+            return
+    chunk = d.flush()
+    if chunk:
+        yield chunk
+
 
 def regex(x):
     if isinstance(x, six.string_types):
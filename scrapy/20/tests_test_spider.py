@@ -0,0 +1,164 @@
+import gzip
+from io import BytesIO
+from unittest import TestCase
+
+from scrapy.http import Response, TextResponse, XmlResponse
+from scrapy.spiders import SitemapSpider
+from scrapy.spiders.sitemap import StreamingSitemap, iterchunks
+from scrapy.utils.sitemap import Sitemap
+
+
+def gzip_body(body):
+    f = BytesIO()
+    g = gzip.GzipFile(fileobj=f, mode='w+b')
+    g.write(body)
+    g.close()
+    return f.getvalue()
+
+
+class ExampleSitemapSpider(SitemapSpider):
+    sitemap_streaming = True
+    sitemap_chunk_size = 7
+    sitemap_rules = [('/about', 'parse_about'), ('', 'parse')]
+    sitemap_follow = ['/sitemap-other']
+
+    def parse_about(self, response):
+        pass
+
+
+class StreamingSitemapSpiderTest(TestCase):
+
+    URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:xhtml="http://www.w3.org/1999/xhtml">
+  <!-- a comment -->
+  <url>
+    <loc>http://www.example.com/english/</loc>
+    <lastmod>2009-08-16</lastmod>
+    <xhtml:link rel="alternate" hreflang="de"
+                href="http://www.example.com/deutsch/"/>
+  </url>
+  <url><loc> http://www.example.com/about </loc><priority>0.8</priority></url>
+  <url><lastmod>2009-08-16</lastmod></url>
+  <url><loc>http://www.example.com/other/page</loc></url>
+</urlset>"""
+
+    SITEMAPINDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap>
+    <loc>http://www.example.com/sitemap-about.xml</loc>
+    <lastmod>2004-10-01T18:23:17+00:00</lastmod>
+  </sitemap>
+  <sitemap>
+    <loc>http://www.example.com/sitemap-other.xml.gz</loc>
+  </sitemap>
+</sitemapindex>"""
+
+    def make_spider(self, **kwargs):
+        spider_class = type('TestSpider', (ExampleSitemapSpider,), kwargs)
+        return spider_class('example.com')
+
+    def request_urls(self, spider, response):
+        return [(r.url, r.callback.__name__)
+                for r in spider._parse_sitemap(response)]
+
+    def assertSameAsSitemap(self, body):
+        chunks = iterchunks(body, 5)
+        self.assertEqual(list(StreamingSitemap(chunks)), list(Sitemap(body)))
+        self.assertEqual(StreamingSitemap(iterchunks(body, 5)).type,
+                         Sitemap(body).type)
+
+    def test_urlset(self):
+        spider = self.make_spider()
+        response = XmlResponse(url='http://www.example.com/sitemap.xml',
+                               body=self.URLSET)
+        self.assertEqual(self.request_urls(spider, response), [
+            ('http://www.example.com/english/', 'parse'),
+            ('http://www.example.com/about', 'parse_about'),
+            ('http://www.example.com/other/page', 'parse'),
+        ])
+        self.assertSameAsSitemap(self.URLSET)
+
+    def test_same_requests_as_without_streaming(self):
+        for body in [self.URLSET, self.SITEMAPINDEX]:
+            response = XmlResponse(url='http://www.example.com/sitemap.xml',
+                                   body=body)
+            self.assertEqual(
+                self.request_urls(self.make_spider(), response),
+                self.request_urls(self.make_spider(sitemap_streaming=False),
+                                  response))
+
+    def test_sitemapindex(self):
+        spider = self.make_spider()
+        response = XmlResponse(url='http://www.example.com/sitemap.xml',
+                               body=self.SITEMAPINDEX)
+        self.assertEqual(self.request_urls(spider, response), [
+            ('http://www.example.com/sitemap-other.xml.gz', '_parse_sitemap'),
+        ])
+        self.assertSameAsSitemap(self.SITEMAPINDEX)
+
+    def test_alternate_links(self):
+        spider = self.make_spider(sitemap_alternate_links=True,
+                                  sitemap_follow=[''])
+        body = self.SITEMAPINDEX.replace(
+            b'</loc>\n  </sitemap>',
+            b'</loc>\n    <link rel="alternate" '
+            b'href="http://www.example.com/sitemap-alt.xml"/>\n  </sitemap>')
+        response = XmlResponse(url='http://www.example.com/sitemap.xml',
+                               body=body)
+        self.assertEqual([url for url, _ in self.request_urls(spider, response)], [
+            'http://www.example.com/sitemap-about.xml',
+            'http://www.example.com/sitemap-other.xml.gz',
+            'http://www.example.com/sitemap-alt.xml',
+        ])
+        self.assertSameAsSitemap(body)
+
+    def test_gzip(self):
+        spider = self.make_spider()
+        for url, response_class in [
+                ('http://www.example.com/sitemap.xml.gz', Response),
+                ('http://www.example.com/sitemap', TextResponse)]:
+            headers = {}
+            if response_class is TextResponse:
+                headers['Content-Type'] = 'application/x-gzip'
+            response = response_class(url=url, body=gzip_body(self.URLSET),
+                                      headers=headers)
+            self.assertEqual([u for u, _ in self.request_urls(spider, response)], [
+                'http://www.example.com/english/',
+                'http://www.example.com/about',
+                'http://www.example.com/other/page',
+            ])
+
+    def test_max_size(self):
+        spider = self.make_spider(sitemap_max_size=len(self.URLSET) // 2)
+        response = Response(url='http://www.example.com/sitemap.xml.gz',
+                            body=gzip_body(self.URLSET))
+        self.assertEqual([u for u, _ in self.request_urls(spider, response)],
+                         ['http://www.example.com/english/'])
+
+    def test_not_a_sitemap(self):
+        spider = self.make_spider()
+        response = TextResponse(url='http://www.example.com/sitemap',
+                                body=self.URLSET)
+        self.assertEqual(list(spider._parse_sitemap(response)), [])
+
+
+class IterChunksTest(TestCase):
+
+    body = b''.join(b'line %d\n' % i for i in range(1000))
+
+    def test_plain(self):
+        chunks = list(iterchunks(self.body, 100))
+        self.assertEqual(b''.join(chunks), self.body)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+
+    def test_gzip(self):
+        chunks = list(iterchunks(gzip_body(self.body), 100, gzipped=True))
+        self.assertEqual(b''.join(chunks), self.body)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+
+    def test_truncated_gzip(self):
+        body = gzip_body(self.body)
+        data = b''.join(iterchunks(body[:len(body) // 2], 100, gzipped=True))
+        self.assertTrue(self.body.startswith(data))
+        self.assertEqual(list(iterchunks(b'not gzip', 100, gzipped=True)), [])
@@ -20,11 +20,20 @@ import warnings
 
 __all__ = ['BaseItemExporter', 'PprintItemExporter', 'PickleItemExporter',
            'CsvItemExporter', 'XmlItemExporter', 'JsonLinesItemExporter',
-           'JsonItemExporter', 'MarshalItemExporter']
+           'JsonItemExporter', 'MarshalItemExporter',
+           'ColumnarItemExporter']
 
 
 class BaseItemExporter(object):
 
+    # Exporters that can buffer items in batches of ``batch_size`` items set
+    # this, call _add_to_batch() from export_item() and implement
+    # _export_rows()
+    supports_batching = False
+    batch_size = 0
+    _batch = None
+    _batch_field_lists = None
+
     def __init__(self, **kwargs):
         self._configure(kwargs)
 
@@ -36,6 +45,11 @@ class BaseItemExporter(object):
         self.fields_to_export = options.pop('fields_to_export', None)
         self.export_empty_fields = options.pop('export_empty_fields', False)
         self.encoding = options.pop('encoding', 'utf-8')
+        batch_size = options.pop('batch_size', 0)
+        if batch_size and not self.supports_batching:
+            raise TypeError("%s does not support the batch_size option"
+                            % type(self).__name__)
+        self.batch_size = batch_size
         if not dont_fail and options:
             raise TypeError("Unexpected options: %s" % ', '.join(options.keys()))
 
@@ -50,7 +64,46 @@ class BaseItemExporter(object):
         pass
 
     def finish_exporting(self):
-        pass
+        self._flush_batch()
+
+    def export_batch(self, items):
+        """Export a list of items at once. Exporters supporting batching
+        (see the ``batch_size`` option) override this to serialize and write
+        the whole batch in one go.
+        """
+        for item in items:
+            self.export_item(item)
+
+    def _add_to_batch(self, item, **options):
+        """Add the item to the current batch, exporting the batch once it
+        holds ``batch_size`` items. Return False if batching is disabled.
+
+        The item is serialized right away, with the _get_serialized_fields()
+        ``options``, so that changes made to it after export_item() are not
+        exported.
+        """
+        if not self.batch_size:
+            return False
+        if self._batch is None:
+            self._batch = []
+            self._batch_field_lists = {}
+        self._batch.append(self._get_serialized_row(
+            item, self._batch_field_lists, **options))
+        if len(self._batch) >= self.batch_size:
+            self._flush_batch()
+        return True
+
+    def _flush_batch(self):
+        if self._batch:
+            rows = self._batch
+            self._batch = self._batch_field_lists = None
+            self._export_rows(rows)
+
+    def _export_rows(self, rows):
+        """Write a batch of serialized items, as returned by
+        _get_serialized_batch()
+        """
+        raise NotImplementedError
 
     def _get_serialized_fields(self, item, default_value=None, include_empty=None):
         """Return the fields to export as an iterable of tuples
@@ -78,18 +131,81 @@ class BaseItemExporter(object):
 
             yield field_name, value
 
+    def _get_serialized_batch(self, items, default_value=None, include_empty=None):
+        """Return the fields to export of each item in ``items``, as lists of
+        tuples (name, serialized_value).
+
+        Unlike calling _get_serialized_fields() for each item, the field names
+        and field metadata are only resolved once per item class.
+        """
+        field_lists = {}
+        return [self._get_serialized_row(item, field_lists, default_value,
+                                         include_empty)
+                for item in items]
+
+    def _get_serialized_row(self, item, field_lists, default_value=None,
+                            include_empty=None):
+        """Return the fields to export of ``item`` as a list of tuples
+        (name, serialized_value), resolving its field names through the
+        ``field_lists`` cache of the batch.
+        """
+        if include_empty is None:
+            include_empty = self.export_empty_fields
+        item_class = type(item)
+        try:
+            field_names, fields = field_lists[item_class]
+        except KeyError:
+            fields = None if isinstance(item, dict) else item.fields
+            if self.fields_to_export is not None and include_empty:
+                field_names = list(self.fields_to_export)
+            elif self.fields_to_export is None and include_empty and fields is not None:
+                field_names = list(fields)
+            else:
+                # depends on the keys of each item
+                field_names = None
+            field_lists[item_class] = field_names, fields
+
+        if field_names is None:
+            if self.fields_to_export is None:
+                names = list(item)
+            else:
+                names = [x for x in self.fields_to_export if x in item]
+        else:
+            names = field_names
+        row = []
+        for field_name in names:
+            if field_name in item:
+                field = {} if fields is None else fields[field_name]
+                value = self.serialize_field(field, field_name, item[field_name])
+            else:
+                value = default_value
+            row.append((field_name, value))
+        return row
+
 
 class JsonLinesItemExporter(BaseItemExporter):
 
+    supports_batching = True
+
     def __init__(self, file, **kwargs):
         self._configure(kwargs, dont_fail=True)
         self.file = file
         self.encoder = ScrapyJSONEncoder(**kwargs)
 
     def export_item(self, item):
+        if self._add_to_batch(item):
+            return
         itemdict = dict(self._get_serialized_fields(item))
         self.file.write(to_bytes(self.encoder.encode(itemdict) + '\n'))
 
+    def export_batch(self, items):
+        self._flush_batch()
+        self._export_rows(self._get_serialized_batch(items))
+
+    def _export_rows(self, rows):
+        lines = [self.encoder.encode(dict(fields)) + '\n' for fields in rows]
+        self.file.write(to_bytes(''.join(lines)))
+
 
 class JsonItemExporter(BaseItemExporter):
 
@@ -165,10 +281,15 @@ class XmlItemExporter(BaseItemExporter):
 
 class CsvItemExporter(BaseItemExporter):
 
+    supports_batching = True
+
     def __init__(self, file, include_headers_line=True, join_multivalued=',', **kwargs):
         self._configure(kwargs, dont_fail=True)
         self.include_headers_line = include_headers_line
-        file = file if six.PY2 else io.TextIOWrapper(file, line_buffering=True)
+        if not six.PY2:
+            # batches are flushed explicitly, see export_batch()
+            file = io.TextIOWrapper(file, line_buffering=not self.batch_size)
+        self.stream = file
         self.csv_writer = csv.writer(file, **kwargs)
         self._headers_not_written = True
         self._join_multivalued = join_multivalued
@@ -189,12 +310,27 @@ class CsvItemExporter(BaseItemExporter):
         if self._headers_not_written:
             self._headers_not_written = False
             self._write_headers_and_set_fields_to_export(item)
+        if self._add_to_batch(item, default_value='', include_empty=True):
+            return
 
         fields = self._get_serialized_fields(item, default_value='',
                                              include_empty=True)
         values = list(self._build_row(x for _, x in fields))
         self.csv_writer.writerow(values)
 
+    def export_batch(self, items):
+        if items and self._headers_not_written:
+            self._headers_not_written = False
+            self._write_headers_and_set_fields_to_export(items[0])
+        self._flush_batch()
+        self._export_rows(self._get_serialized_batch(
+            items, default_value='', include_empty=True))
+
+    def _export_rows(self, rows):
+        self.csv_writer.writerows(
+            list(self._build_row(x for _, x in fields)) for fields in rows)
+        self.stream.flush()
+
     def _build_row(self, values):
         for s in values:
             try:
@@ -237,6 +373,47 @@ class MarshalItemExporter(BaseItemExporter):
         marshal.dump(dict(self._get_serialized_fields(item)), self.file)
 
 
+class ColumnarItemExporter(BaseItemExporter):
+    """Export items in a compact binary columnar format, suited for loading
+    into analytics tools.
+
+    Items are exported in batches of ``batch_size`` items (1000 by default).
+    Each batch is written as one marshal-serialized tuple
+    ``(count, names, columns)``, where ``columns[i]`` is the list of the
+    ``count`` values of field ``names[i]``, None standing for missing values.
+    The file can be read back by calling ``marshal.load`` until EOFError.
+    """
+
+    supports_batching = True
+
+    def __init__(self, file, **kwargs):
+        kwargs.setdefault('batch_size', 1000)
+        self._configure(kwargs)
+        self.file = file
+
+    def export_item(self, item):
+        if not self._add_to_batch(item):
+            self.export_batch([item])
+
+    def export_batch(self, items):
+        self._flush_batch()
+        self._export_rows(self._get_serialized_batch(items))
+
+    def _export_rows(self, rows):
+        names = []
+        columns = {}
+        for index, fields in enumerate(rows):
+            for name, value in fields:
+                try:
+                    column = columns[name]
+                except KeyError:
+                    names.append(name)
+                    column = columns[name] = [None] * len(rows)
+                column[index] = value
+        marshal.dump((len(rows), names, [columns[n] for n in names]),
+                     self.file)
+
+
 class PprintItemExporter(BaseItemExporter):
 
     def __init__(self, file, **kwargs):
@@ -0,0 +1,154 @@
+import marshal
+import unittest
+from io import BytesIO
+
+from scrapy.item import Item, Field
+from scrapy.exporters import (
+    CsvItemExporter, JsonLinesItemExporter, XmlItemExporter,
+    ColumnarItemExporter
+)
+
+
+class TestItem(Item):
+    name = Field()
+    age = Field()
+
+
+def load_batches(data):
+    f = BytesIO(data)
+    batches = []
+    while True:
+        try:
+            batches.append(marshal.load(f))
+        except EOFError:
+            return batches
+
+
+class BatchedExporterTest(unittest.TestCase):
+
+    exporter_class = JsonLinesItemExporter
+    items = [TestItem(name=u'John%d' % i, age=str(i)) for i in range(7)]
+
+    def export(self, items, **kwargs):
+        output = BytesIO()
+        exporter = self.exporter_class(output, **kwargs)
+        exporter.start_exporting()
+        for item in items:
+            exporter.export_item(item)
+        exporter.finish_exporting()
+        return output.getvalue()
+
+    def test_same_output_as_unbatched(self):
+        for batch_size in [1, 3, 7, 100]:
+            self.assertEqual(self.export(self.items, batch_size=batch_size),
+                             self.export(self.items))
+
+    def test_flush_at_batch_size(self):
+        output = BytesIO()
+        exporter = self.exporter_class(output, batch_size=3)
+        exporter.start_exporting()
+        start = output.getvalue()
+        sizes = []
+        for item in self.items:
+            exporter.export_item(item)
+            sizes.append(len(output.getvalue()))
+        self.assertEqual(sizes[0], len(start))
+        self.assertEqual(sizes[1], len(start))
+        self.assertGreater(sizes[2], sizes[1])
+        self.assertEqual(sizes[3:5], [sizes[2]] * 2)
+        self.assertGreater(sizes[5], sizes[4])
+        # the final partial batch is written by finish_exporting()
+        self.assertEqual(sizes[6], sizes[5])
+        exporter.finish_exporting()
+        self.assertEqual(output.getvalue(), self.export(self.items))
+
+    def test_item_changed_after_export(self):
+        item = TestItem(name=u'John', age='22')
+        output = BytesIO()
+        exporter = self.exporter_class(output, batch_size=3)
+        exporter.start_exporting()
+        exporter.export_item(item)
+        item['age'] = '23'
+        exporter.finish_exporting()
+        self.assertEqual(output.getvalue(),
+                         self.export([TestItem(name=u'John', age='22')]))
+
+    def test_export_batch(self):
+        output = BytesIO()
+        exporter = self.exporter_class(output, batch_size=3)
+        exporter.start_exporting()
+        exporter.export_item(self.items[0])
+        exporter.export_batch(self.items[1:6])
+        exporter.export_item(self.items[6])
+        exporter.finish_exporting()
+        self.assertEqual(output.getvalue(), self.export(self.items))
+
+
+class BatchedCsvExporterTest(BatchedExporterTest):
+
+    exporter_class = CsvItemExporter
+
+
+class BatchSizeNotSupportedTest(unittest.TestCase):
+
+    def test_batch_size_rejected(self):
+        self.assertRaises(TypeError, XmlItemExporter, BytesIO(), batch_size=2)
+
+
+class ColumnarItemExporterTest(unittest.TestCase):
+
+    def export(self, items, **kwargs):
+        output = BytesIO()
+        exporter = ColumnarItemExporter(output, **kwargs)
+        exporter.start_exporting()
+        for item in items:
+            exporter.export_item(item)
+        exporter.finish_exporting()
+        return output.getvalue()
+
+    def test_columns(self):
+        items = [TestItem(name=u'John', age='22'), TestItem(name=u'Maria'),
+                 {'name': u'Jesus', 'city': u'Nazareth'}]
+        self.assertEqual(load_batches(self.export(items)), [
+            (3, ['name', 'age', 'city'], [
+                [u'John', u'Maria', u'Jesus'],
+                ['22', None, None],
+                [None, None, u'Nazareth'],
+            ]),
+        ])
+
+    def test_batches(self):
+        items = [{'n': i} for i in range(5)]
+        self.assertEqual(load_batches(self.export(items, batch_size=2)), [
+            (2, ['n'], [[0, 1]]),
+            (2, ['n'], [[2, 3]]),
+            (1, ['n'], [[4]]),
+        ])
+
+    def test_without_batching(self):
+        items = [{'n': i} for i in range(3)]
+        self.assertEqual(load_batches(self.export(items, batch_size=0)), [
+            (1, ['n'], [[0]]),
+            (1, ['n'], [[1]]),
+            (1, ['n'], [[2]]),
+        ])
+
+    def test_fields_to_export(self):
+        items = [TestItem(name=u'John', age='22'), TestItem(age='33')]
+        data = self.export(items, fields_to_export=['age', 'name'],
+                           export_empty_fields=True)
+        self.assertEqual(load_batches(data), [
+            (2, ['age', 'name'], [['22', '33'], [u'John', None]]),
+        ])
+
+    def test_serializer(self):
+        class CustomItem(Item):
+            name = Field()
+            age = Field(serializer=lambda age: int(age) + 1)
+
+        data = self.export([CustomItem(name=u'John', age='22')])
+        self.assertEqual(load_batches(data),
+                         [(1, ['name', 'age'], [[u'John'], [23]])])
+
+    def test_empty(self):
+        self.assertEqual(self.export([]), b'')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import shutil
+import tempfile
+
+from youtube_dl.archive import DownloadArchive, SQLiteDownloadArchive
+
+
+class TestDownloadArchive(unittest.TestCase):
+    archive_class = DownloadArchive
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'archive.txt')
+        self._mtime = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, data, mode='w'):
+        with io.open(self.filename, mode, encoding='utf-8') as f:
+            f.write(data)
+        # Modification times may be too coarse to tell two writes apart
+        self._mtime += 1
+        os.utime(self.filename, (self._mtime, self._mtime))
+
+    def make_archive(self):
+        return self.archive_class(self.filename)
+
+    def test_missing_file(self):
+        archive = self.make_archive()
+        self.assertFalse('youtube a' in archive)
+        archive.add('youtube a')
+        self.assertTrue('youtube a' in archive)
+
+    def test_appended_lines(self):
+        self.write('youtube a\nyoutube b\n')
+        archive = self.make_archive()
+        self.assertTrue('youtube a' in archive)
+        self.assertFalse('youtube c' in archive)
+        self.write('youtube c\nyoutube ü\n', 'a')
+        self.assertTrue('youtube c' in archive)
+        self.assertTrue('youtube ü' in archive)
+        archive.add('youtube d')
+        self.assertTrue('youtube d' in self.make_archive())
+
+    def test_incomplete_last_line(self):
+        self.write('youtube a\nyoutube b')
+        archive = self.make_archive()
+        self.assertTrue('youtube a' in archive)
+        self.assertFalse('youtube b' in archive)
+        self.write('c\n', 'a')
+        self.assertTrue('youtube bc' in archive)
+        self.assertFalse('youtube b' in archive)
+
+    def test_rewritten_same_size(self):
+        self.write('youtube a\nyoutube b\n')
+        archive = self.make_archive()
+        self.assertTrue('youtube a' in archive)
+        self.write('youtube c\nyoutube d\n')
+        self.assertFalse('youtube a' in archive)
+        self.assertTrue('youtube c' in archive)
+        self.assertTrue('youtube d' in archive)
+
+    def test_rewritten_larger(self):
+        self.write('youtube a\n')
+        archive = self.make_archive()
+        self.assertTrue('youtube a' in archive)
+        self.write('youtube b\nyoutube c\n')
+        self.assertFalse('youtube a' in archive)
+        self.assertTrue('youtube b' in archive)
+        self.assertTrue('youtube c' in archive)
+
+    def test_truncated(self):
+        self.write('youtube a\nyoutube b\n')
+        archive = self.make_archive()
+        self.assertTrue('youtube b' in archive)
+        self.write('youtube c\n')
+        self.assertFalse('youtube b' in archive)
+        self.assertTrue('youtube c' in archive)
+
+    def test_replaced(self):
+        self.write('youtube a\n')
+        archive = self.make_archive()
+        self.assertTrue('youtube a' in archive)
+        new_filename = self.filename + '.new'
+        with io.open(new_filename, 'w', encoding='utf-8') as f:
+            f.write('youtube b\n')
+        os.rename(new_filename, self.filename)
+        self.assertFalse('youtube a' in archive)
+        self.assertTrue('youtube b' in archive)
+
+
+class TestSQLiteDownloadArchive(TestDownloadArchive):
+    archive_class = SQLiteDownloadArchive
+
+    def test_index_reused(self):
+        self.write('youtube a\nyoutube b')
+        self.assertTrue('youtube a' in self.make_archive())
+        self.write('\nyoutube c\n', 'a')
+        archive = self.make_archive()
+        self.assertTrue('youtube b' in archive)
+        self.assertTrue('youtube c' in archive)
+        # Only the lines appended since the last run are read
+        self.assertEqual(archive._offset, os.path.getsize(self.filename))
+
+    def test_rewritten_between_runs(self):
+        self.write('youtube a\nyoutube b\n')
+        self.assertTrue('youtube a' in self.make_archive())
+        self.write('youtube c\nyoutube d\n')
+        archive = self.make_archive()
+        self.assertFalse('youtube a' in archive)
+        self.assertTrue('youtube c' in archive)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,7 +62,6 @@ from .utils import (
     GeoRestrictedError,
     int_or_none,
     ISO3166Utils,
-    locked_file,
     make_HTTPS_handler,
     MaxDownloadsReached,
     orderedSet,
@@ -92,8 +91,10 @@ from .utils import (
     YoutubeDLCookieProcessor,
     YoutubeDLHandler,
 )
+from .archive import DownloadArchive, SQLiteDownloadArchive
 from .cache import Cache
 from .extractor import get_info_extractor, gen_extractor_classes, _LAZY_LOADER
+from .extractor.index import ExtractorIndex
 from .extractor.openload import PhantomJSwrapper
 from .downloader import get_suitable_downloader
 from .downloader.rtmp import rtmpdump_version
@@ -206,6 +207,9 @@ class YoutubeDL(object):
     download_archive:  File name of a file where all downloads are recorded.
                        Videos already present in the file are not downloaded
                        again.
+    download_archive_sqlite: Look up download_archive through an SQLite index
+                       kept next to it (download_archive + '.sqlite'), for
+                       archives too large to be read on every run.
     cookiefile:        File name where cookies should be read from and dumped to.
     nocheckcertificate:Do not verify SSL certificates
     prefer_insecure:   Use HTTP instead of HTTPS to retrieve information.
@@ -342,10 +346,12 @@ class YoutubeDL(object):
             params = {}
         self._ies = []
         self._ies_instances = {}
+        self._extractor_index = None
         self._pps = []
         self._progress_hooks = []
         self._download_retcode = 0
         self._num_downloads = 0
+        self._download_archive = None
         self._screen_file = [sys.stdout, sys.stderr][params.get('logtostderr', False)]
         self._err_file = sys.stderr
         self.params = {
@@ -449,10 +455,20 @@ class YoutubeDL(object):
     def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         self._ies.append(ie)
+        self._extractor_index = None
         if not isinstance(ie, type):
             self._ies_instances[ie.ie_key()] = ie
             ie.set_downloader(self)
 
+    def _get_extractor_index(self):
+        if self._extractor_index is None:
+            index = ExtractorIndex(
+                self._ies, self.cache.load('extractor-index', __version__))
+            if index.new_keys:
+                self.cache.store('extractor-index', __version__, index.known_keys)
+            self._extractor_index = index
+        return self._extractor_index
+
     def get_info_extractor(self, ie_key):
         """
         Get an instance of an IE with name ie_key, it will try to get one from
@@ -778,7 +794,7 @@ class YoutubeDL(object):
         if ie_key:
             ies = [self.get_info_extractor(ie_key)]
         else:
-            ies = self._ies
+            ies = self._get_extractor_index().candidates(url)
 
         for ie in ies:
             if not ie.suitable(url):
@@ -2070,33 +2086,41 @@ class YoutubeDL(object):
             return None  # Incomplete video information
         return extractor.lower() + ' ' + info_dict['id']
 
-    def in_download_archive(self, info_dict):
+    def _get_download_archive(self):
         fn = self.params.get('download_archive')
         if fn is None:
+            return None
+        archive = self._download_archive
+        if archive is None or archive.filename != fn:
+            archive = None
+            if self.params.get('download_archive_sqlite'):
+                try:
+                    archive = SQLiteDownloadArchive(fn)
+                except ImportError:
+                    self.report_warning(
+                        'sqlite3 is not available, reading the download archive '
+                        'without an index')
+            self._download_archive = archive or DownloadArchive(fn)
+        return self._download_archive
+
+    def in_download_archive(self, info_dict):
+        archive = self._get_download_archive()
+        if archive is None:
             return False
 
         vid_id = self._make_archive_id(info_dict)
         if vid_id is None:
             return False  # Incomplete video information
 
-        try:
-            with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                for line in archive_file:
-                    if line.strip() == vid_id:
-                        return True
-        except IOError as ioe:
-            if ioe.errno != errno.ENOENT:
-                raise
-        return False
+        return vid_id in archive
 
     def record_download_archive(self, info_dict):
-        fn = self.params.get('download_archive')
-        if fn is None:
+        archive = self._get_download_archive()
+        if archive is None:
             return
         vid_id = self._make_archive_id(info_dict)
         assert vid_id
-        with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-            archive_file.write(vid_id + '\n')
+        archive.add(vid_id)
 
     @staticmethod
     def format_resolution(format, default='unknown'):
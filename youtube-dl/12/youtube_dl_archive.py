@@ -0,0 +1,148 @@
+from __future__ import unicode_literals
+
+import errno
+import os
+
+from .utils import locked_file
+
+
+class DownloadArchive(object):
+    """Lookups in a download archive file
+
+    The archive file is a plain text file with one archive id per line, see
+    YoutubeDL._make_archive_id. It is read once and then only the lines
+    appended since the last lookup, by this or any other process, are read.
+    Writers append under the file lock, like before.
+
+    A file that gets smaller, is replaced, or whose last read bytes have
+    changed is read again from the start.
+    """
+
+    # Number of bytes at the end of the read part of the file that are
+    # checked for changes before reading further
+    _TAIL_SIZE = 4096
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._ids = set()
+        # Bytes of the file that have been read, the file they belong to,
+        # its modification time and the last bytes read
+        self._offset = 0
+        self._file_id = None
+        self._mtime = None
+        self._tail = b''
+
+    def _reset(self):
+        self._ids = set()
+        self._offset = 0
+        self._tail = b''
+
+    def _add_ids(self, ids):
+        self._ids.update(ids)
+
+    def _contains(self, vid_id):
+        return vid_id in self._ids
+
+    def _update(self):
+        try:
+            st = os.stat(self.filename)
+        except OSError as ose:
+            if ose.errno != errno.ENOENT:
+                raise
+            return
+        file_id = (st.st_dev, st.st_ino)
+        # st_mtime_ns is not available in python 2
+        mtime = getattr(st, 'st_mtime_ns', st.st_mtime)
+        if file_id != self._file_id or st.st_size < self._offset:
+            self._reset()
+            self._file_id = file_id
+        elif st.st_size == self._offset and mtime == self._mtime:
+            return
+        try:
+            with locked_file(self.filename, 'r', encoding='utf-8') as archive_file:
+                # Read bytes, so that offsets are byte offsets
+                f = archive_file.f.buffer
+                f.seek(self._offset - len(self._tail))
+                if f.read(len(self._tail)) != self._tail:
+                    # Rewritten in place, the ids read so far may be gone
+                    self._reset()
+                    f.seek(0)
+                data = f.read()
+        except IOError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+            return
+        # The last line may still be being written, it is read once complete
+        data = data[:data.rfind(b'\n') + 1]
+        self._add_ids(
+            line.strip() for line in data.decode('utf-8').splitlines()
+            if line.strip())
+        self._offset += len(data)
+        self._tail = (self._tail + data)[-self._TAIL_SIZE:]
+        self._mtime = mtime
+
+    def __contains__(self, vid_id):
+        self._update()
+        return self._contains(vid_id)
+
+    def add(self, vid_id):
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.write(vid_id + '\n')
+        self._add_ids([vid_id])
+
+
+class SQLiteDownloadArchive(DownloadArchive):
+    """Lookups in a download archive file, through an SQLite index
+
+    The index is kept in FILENAME.sqlite and is updated with the lines
+    appended to the archive file since it was last used, so only new lines
+    are read even across runs. The archive file stays the reference and the
+    index can be deleted at any time.
+    """
+
+    def __init__(self, filename):
+        super(SQLiteDownloadArchive, self).__init__(filename)
+        import sqlite3
+        self._db = sqlite3.connect(filename + '.sqlite', timeout=60)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY)')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value)')
+        state = dict(self._db.execute('SELECT key, value FROM state'))
+        if 'tail' in state:
+            self._file_id = (state['dev'], state['ino'])
+            self._offset = state['offset']
+            self._mtime = state['mtime']
+            self._tail = bytes(state['tail'])
+
+    def _reset(self):
+        self._offset = 0
+        self._tail = b''
+        with self._db:
+            self._db.execute('DELETE FROM archive')
+
+    def _add_ids(self, ids):
+        with self._db:
+            self._db.executemany(
+                'INSERT OR IGNORE INTO archive (id) VALUES (?)',
+                ((vid_id,) for vid_id in ids))
+
+    def _contains(self, vid_id):
+        return self._db.execute(
+            'SELECT 1 FROM archive WHERE id = ?', (vid_id,)).fetchone() is not None
+
+    def _update(self):
+        state = (self._file_id, self._offset, self._mtime)
+        super(SQLiteDownloadArchive, self)._update()
+        if (self._file_id, self._offset, self._mtime) != state:
+            import sqlite3
+            with self._db:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (
+                        ('dev', self._file_id[0]),
+                        ('ino', self._file_id[1]),
+                        ('offset', self._offset),
+                        ('mtime', self._mtime),
+                        ('tail', sqlite3.Binary(self._tail)),
+                    ))
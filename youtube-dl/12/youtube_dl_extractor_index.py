@@ -0,0 +1,294 @@
+from __future__ import unicode_literals
+
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from .common import InfoExtractor
+from ..compat import (
+    compat_basestring,
+    compat_chr,
+)
+
+try:
+    from .lazy_extractors import LazyLoadExtractor
+except ImportError:
+    LazyLoadExtractor = None
+
+
+_DEFAULT_SUITABLE = tuple(
+    klass.suitable.__func__
+    for klass in (InfoExtractor, LazyLoadExtractor) if klass is not None)
+
+# Past this many states a _VALID_URL is not worth analysing
+_MAX_STATES = 64
+
+# Start of an URL up to the end of its host, as seen by _KeysParser
+_URL_HOST_RE = re.compile(r'[^/]*//([^/]*)')
+
+
+def _may_match_slash(items):
+    """Whether the parsed regular expression items may match a '/'"""
+    slash = ord('/')
+    for op, av in items:
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            continue
+        if op == sre_parse.LITERAL:
+            if av == slash:
+                return True
+        elif op == sre_parse.NOT_LITERAL:
+            if av != slash:
+                return True
+        elif op == sre_parse.IN:
+            if re.match(
+                    '[%s%s]' % (
+                        '^' if any(o == sre_parse.NEGATE for o, _ in av) else '',
+                        ''.join(_class_item_regex(o, a) for o, a in av)), '/'):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _may_match_slash(av[-1]):
+                return True
+        elif op == sre_parse.BRANCH:
+            if any(_may_match_slash(branch) for branch in av[1]):
+                return True
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            if _may_match_slash(av[2]):
+                return True
+        else:
+            return True
+    return False
+
+
+def _class_item_regex(op, av):
+    if op == sre_parse.NEGATE:
+        return ''
+    if op == sre_parse.LITERAL:
+        return re.escape(compat_chr(av))
+    if op == sre_parse.RANGE:
+        return '%s-%s' % (
+            re.escape(compat_chr(av[0])), re.escape(compat_chr(av[1])))
+    if op == sre_parse.CATEGORY:
+        return {
+            sre_parse.CATEGORY_DIGIT: r'\d',
+            sre_parse.CATEGORY_NOT_DIGIT: r'\D',
+            sre_parse.CATEGORY_SPACE: r'\s',
+            sre_parse.CATEGORY_NOT_SPACE: r'\S',
+            sre_parse.CATEGORY_WORD: r'\w',
+            sre_parse.CATEGORY_NOT_WORD: r'\W',
+        }.get(av, '/')
+    return '/'
+
+
+class _KeysParser(object):
+    """Find what an URL must contain to match a _VALID_URL
+
+    The result is a set of keys, one of which an URL matching the _VALID_URL
+    has, or None if there are URLs without any of them. A key is either:
+
+    ('label', label): label is one of the dot separated labels of the host,
+        e.g. 'youtube' for 'https://www.youtube.com/watch?v=...'
+    ('scheme', scheme): the URL starts with scheme, e.g. 'ytsearch:'
+
+    The parsed regular expression is followed with a set of states, one for
+    each distinct way of matching it so far, up to the end of the host:
+
+    ('scheme', text): literal text matched before the '//' of the host
+    ('host', labels, label, known): labels matched in full so far in the
+        host, and the label being matched, known if no variable part of the
+        regular expression is in it
+    ('done', key): the key for this state, None if there is none
+
+    Anything not understood ends in ('done', None), so that keys are only
+    found where re.match(_VALID_URL, url) requires them.
+    """
+
+    _ANY = ('done', None)
+
+    def parse(self, valid_url):
+        try:
+            items = sre_parse.parse(valid_url)
+        except Exception:
+            return None
+        states = self._items({('scheme', '')}, items)
+        if states is None:
+            return None
+        keys = set()
+        for state in states:
+            # What follows is not needed to match the start of the URL
+            key = self._end(state)[1]
+            if key is None:
+                return None
+            keys.add(key)
+        return keys
+
+    def _items(self, states, items):
+        for op, av in items:
+            if states is None or all(state[0] == 'done' for state in states):
+                break
+            states = self._item(states, op, av)
+            if states is not None and len(states) > _MAX_STATES:
+                return None
+        return states
+
+    def _item(self, states, op, av):
+        if op == sre_parse.LITERAL:
+            return set(self._char(state, compat_chr(av)) for state in states)
+        if op == sre_parse.IN and len(av) <= 8 and all(
+                o == sre_parse.LITERAL for o, _ in av):
+            return set(
+                self._char(state, compat_chr(a))
+                for state in states for _, a in av)
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if op == sre_parse.AT and av in (
+                    sre_parse.AT_END, sre_parse.AT_END_STRING):
+                return set(self._end(state) for state in states)
+            # Only restricts what matches
+            return states
+        if op == sre_parse.SUBPATTERN:
+            return self._items(states, av[-1])
+        if op == sre_parse.BRANCH:
+            result = set()
+            for branch in av[1]:
+                branch_states = self._items(states, branch)
+                if branch_states is None:
+                    return None
+                result |= branch_states
+            return result
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            min_count, max_count, sub_items = av
+            if max_count <= 1:
+                repeated = self._items(states, sub_items)
+                if repeated is None:
+                    return None
+                return repeated | states if min_count == 0 else repeated
+        # Some variable text
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, sre_parse.IN,
+                  sre_parse.NOT_LITERAL, sre_parse.ANY):
+            may_match_slash = _may_match_slash([(op, av)])
+        else:
+            may_match_slash = True
+        return set(self._variable(state, may_match_slash) for state in states)
+
+    def _char(self, state, c):
+        c = c.lower()
+        if state[0] == 'scheme':
+            text = state[1]
+            if text.endswith('/'):
+                if c == '/':
+                    return ('host', frozenset(), '', True)
+                return self._ANY
+            return ('scheme', text + c)
+        if state[0] == 'host':
+            _, labels, label, known = state
+            if c == '/':
+                return self._end(('host', labels | self._label(label, known)))
+            if c == '.':
+                return ('host', labels | self._label(label, known), '', True)
+            return ('host', labels, label + c, known)
+        return state
+
+    def _variable(self, state, may_match_slash):
+        if state[0] == 'host' and not may_match_slash:
+            return ('host', state[1], state[2], False)
+        return self._end(state)
+
+    @staticmethod
+    def _label(label, known):
+        return frozenset([label]) if label and known else frozenset()
+
+    def _end(self, state):
+        if state[0] == 'scheme':
+            text = state[1]
+            if ':' in text and '/' not in text:
+                return ('done', ('scheme', text[:text.index(':') + 1]))
+            return self._ANY
+        if state[0] == 'host':
+            # The longest label is likely the most specific one
+            labels = sorted(state[1], key=lambda label: (-len(label), label))
+            return ('done', ('label', labels[0])) if labels else self._ANY
+        return state
+
+
+def _indexed_valid_url(ie):
+    """_VALID_URL of an extractor (class or instance), or None if suitable()
+    doesn't only match it"""
+    suitable = getattr(getattr(ie, 'suitable', None), '__func__', None)
+    valid_url = getattr(ie, '_VALID_URL', None)
+    if (suitable not in _DEFAULT_SUITABLE
+            or not isinstance(valid_url, compat_basestring)):
+        return None
+    return valid_url
+
+
+def _valid_known_keys(keys):
+    """Whether keys of known_keys are like the ones ExtractorIndex stores"""
+    return keys is None or (
+        isinstance(keys, list) and keys and all(
+            isinstance(key, list) and len(key) == 2
+            and key[0] in ('label', 'scheme')
+            and isinstance(key[1], compat_basestring)
+            for key in keys))
+
+
+class ExtractorIndex(object):
+    """Narrow down the extractors that may be suitable for an URL
+
+    Extractors are indexed by what their _VALID_URL requires an URL to have,
+    see _KeysParser. candidates() returns, in their original order, the
+    extractors whose suitable() may return True for an URL: the ones with a
+    key of the URL and the ones that can't be indexed. Those are the ones
+    that override suitable() or have a _VALID_URL not tied to a host or a
+    scheme. Only _VALID_URL is read, so lazy extractors are not loaded.
+
+    Parsing every _VALID_URL takes longer than matching a few URLs, so the
+    keys can be saved and passed back in known_keys, a dict of _VALID_URL
+    to lists of keys (or None) that can be stored as JSON. Entries that are
+    malformed are parsed again, and the ones of no extractor are dropped.
+    new_keys tells whether known_keys changed.
+    """
+
+    def __init__(self, ies, known_keys=None):
+        self._ies = list(ies)
+        self._by_key = {}
+        self._unindexed = []
+        if not isinstance(known_keys, dict):
+            known_keys = {}
+        self.known_keys = {}
+        parser = _KeysParser()
+        for index, ie in enumerate(self._ies):
+            valid_url = _indexed_valid_url(ie)
+            if valid_url is None:
+                self._unindexed.append(index)
+                continue
+            if valid_url not in self.known_keys:
+                keys = known_keys.get(valid_url)
+                if valid_url not in known_keys or not _valid_known_keys(keys):
+                    keys = parser.parse(valid_url)
+                    keys = None if keys is None else [
+                        list(key) for key in sorted(keys)]
+                self.known_keys[valid_url] = keys
+            keys = self.known_keys[valid_url]
+            if keys is None:
+                self._unindexed.append(index)
+                continue
+            for kind, value in keys:
+                self._by_key.setdefault((kind, value), []).append(index)
+        self.new_keys = self.known_keys != known_keys
+
+    def _url_keys(self, url):
+        url = url.lower()
+        if ':' in url:
+            yield ('scheme', url[:url.index(':') + 1])
+        m = _URL_HOST_RE.match(url)
+        if m:
+            for label in m.group(1).split('.'):
+                yield ('label', label)
+
+    def candidates(self, url):
+        found = set(self._unindexed)
+        for key in self._url_keys(url):
+            found.update(self._by_key.get(key, ()))
+        return [self._ies[index] for index in sorted(found)]